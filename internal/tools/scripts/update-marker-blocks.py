@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""Incrementally regenerate and check marker-delimited blocks in AREAS.md and docs/.
+
+A marker block is the text between ``<!-- <kind> <arg> -->`` and
+``<!-- end<kind> ... -->``. For every block we hash its inputs (the slice of
+areas.yaml or of the model it is generated from) and its current content, and
+keep both hashes in a cache file. A block whose inputs and content match the
+cache is skipped without rendering anything; only dirty blocks are rendered,
+in a worker pool.
+
+Supported kinds:
+
+- ``areas``: the SIG table of AREAS.md, rendered here from areas.yaml.
+- ``semconv``: tables generated by weaver from model/. Their inputs are the
+  group, the groups it references (``extends``, entity associations...) and
+  the attribute definitions it references, plus the markdown templates and
+  the weaver version. They cannot be rendered here, so dirty blocks are only
+  reported; after weaver regenerated or checked them, ``--record`` stores the
+  current state in the cache.
+
+Model files are only parsed when their content changed since the last run.
+
+Exit status with --check: 0 when everything is up to date, 1 on the first
+block that differs from its rendering (remaining work is cancelled) and 2 when
+the only dirty blocks are weaver blocks, meaning `make table-check` must run.
+
+Usage:
+  python internal/tools/scripts/update-marker-blocks.py [--check] [--record] [--jobs N] [FILE_OR_DIR ...]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# in the Makefile we use a unmodified python container to run this script, so we need to install pyyaml if it's not already installed
+if (len(sys.argv) > 1) and (sys.argv[1] == "--install"):
+    subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pyyaml', '--root-user-action=ignore'])
+    sys.argv = sys.argv[1:]
+
+import yaml
+
+# Use the libyaml-backed loader when available, it is considerably faster
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_FILE = os.path.join(".cache", "marker-blocks.json")
+DEFAULT_PATHS = ["AREAS.md", "docs"]
+AREAS_FILE = "areas.yaml"
+MODEL_DIR = "model"
+TEMPLATES_DIR = os.path.join("templates", "registry", "markdown")
+DEPENDENCIES_FILE = "dependencies.Dockerfile"
+
+BLOCK_RE = re.compile(r"<!-- (areas|semconv)(?: ([^ >]+))? -->(.*?)<!-- end\1\b[^>]*-->", re.DOTALL)
+# Identifiers inside a group that may point to another group or attribute
+IDENTIFIER_RE = re.compile(r"^[a-z][a-z0-9_.\-]*$")
+SEMCONV_ARG_RE = re.compile(r"^([^(]+)(?:\((.*)\))?$")
+
+EXIT_OUTDATED = 1
+EXIT_NEEDS_WEAVER = 2
+
+
+def sha256(data):
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def canonical_hash(value):
+    return sha256(json.dumps(value, sort_keys=True, default=str))
+
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {'format': CACHE_FORMAT_VERSION, 'model': {}, 'blocks': {}}
+    if cache.get('format') != CACHE_FORMAT_VERSION:
+        return {'format': CACHE_FORMAT_VERSION, 'model': {}, 'blocks': {}}
+    return cache
+
+
+def save_cache(cache_file, cache):
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as file:
+        json.dump(cache, file, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+
+# --- areas ------------------------------------------------------------------
+
+def render_areas(areas):
+    """The AREAS.md table, i.e. the text between ``<!-- areas -->`` and ``<!-- endareas -->``."""
+    markdown_content = '\n'
+    markdown_content += "| Name | Owners | Project | Board | Labels | Status | Notes |\n"
+    markdown_content += "|------|--------|---------|-------|-------|--------|-------|\n"
+
+    for area in areas:
+        name = area['name']
+        project = area['project']
+        board = area['board']
+
+        owners = ",<br/>".join(
+            [
+                f"[{owner['name']}](https://github.com/orgs/open-telemetry/teams/{owner['github']})"
+                for owner in area.get('owner', [])
+                if owner.get('name') and owner.get('github')
+            ]
+        )
+
+        labels = ", ".join(
+            [f"`{label}`"
+             for label in area.get('labels', [])
+             if label]
+        )
+
+        status = ", ".join(
+            [f"`{s}`"
+             for s in area.get('status', [])
+             if s]
+        )
+
+        # Add a default note for common states
+        notes = ""
+        if area.get('notes'):
+            notes = " ".join(area['notes'].split())
+        elif not area.get('notes') and 'inactive' in status:
+            notes = "The SIG is inactive. Bugs and bugfixes are welcome. For substantial changes, follow the [new project process](https://github.com/open-telemetry/community/blob/main/project-management.md)"
+        elif not area.get('notes') and 'accepting_contributions' in status:
+            notes = "The SIG is looking for contributions!"
+
+        markdown_content += f"| {name} | {owners} | {project} | {board} | {labels} | {status} | {notes} |\n"
+
+    return markdown_content
+
+
+def load_areas(areas_file=AREAS_FILE):
+    with open(areas_file, 'r') as file:
+        return (yaml.load(file, Loader=Loader) or {}).get('areas') or []
+
+
+# --- model index ------------------------------------------------------------
+
+def collect_identifiers(node, found):
+    if isinstance(node, dict):
+        for value in node.values():
+            collect_identifiers(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            collect_identifiers(value, found)
+    elif isinstance(node, str) and IDENTIFIER_RE.match(node):
+        found.add(node)
+
+
+def index_model_file(path):
+    """Hashes of the groups and attribute definitions of one model file."""
+    with open(path, 'r') as file:
+        data = yaml.load(file, Loader=Loader) or {}
+    groups = {}
+    attributes = {}
+    for group in data.get('groups') or []:
+        if not isinstance(group, dict) or 'id' not in group:
+            continue
+        refs = set()
+        collect_identifiers(group, refs)
+        refs.discard(group['id'])
+        groups[group['id']] = {'hash': canonical_hash(group), 'refs': sorted(refs)}
+        for attribute in group.get('attributes') or []:
+            if isinstance(attribute, dict) and 'id' in attribute:
+                attributes[attribute['id']] = canonical_hash(attribute)
+    return {'groups': groups, 'attributes': attributes}
+
+
+def model_files(model_dir=MODEL_DIR):
+    files = []
+    for root, _, names in sorted(os.walk(model_dir)):
+        files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(('.yaml', '.yml')))
+    return files
+
+
+def update_model_index(cache, executor, model_dir=MODEL_DIR):
+    """Re-index only the model files whose content changed; returns (groups, attributes)."""
+    previous = cache.get('model') or {}
+    current = {}
+    changed = {}
+    for path in model_files(model_dir):
+        with open(path, 'rb') as file:
+            digest = sha256(file.read())
+        entry = previous.get(path)
+        if entry is not None and entry['sha'] == digest:
+            current[path] = entry
+        else:
+            changed[path] = digest
+    if changed:
+        paths = list(changed)
+        for path, index in zip(paths, executor.map(index_model_file, paths)):
+            current[path] = dict(index, sha=changed[path])
+    cache['model'] = current
+
+    groups = {}
+    attributes = {}
+    for entry in current.values():
+        groups.update(entry['groups'])
+        attributes.update(entry['attributes'])
+    return groups, attributes
+
+
+def weaver_inputs_hash():
+    """Inputs shared by every weaver block: the markdown templates and the weaver image."""
+    digest = hashlib.sha256()
+    for root, _, names in sorted(os.walk(TEMPLATES_DIR)):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            digest.update(path.encode())
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+    if os.path.exists(DEPENDENCIES_FILE):
+        with open(DEPENDENCIES_FILE, 'r') as file:
+            digest.update("".join(line for line in file if " AS weaver" in line).encode())
+    return digest.hexdigest()
+
+
+def semconv_inputs_hash(arg, groups, attributes, shared_hash):
+    """Hash of the group in a ``semconv`` marker and everything it references, transitively."""
+    match = SEMCONV_ARG_RE.match(arg or "")
+    group_id = match.group(1) if match else arg
+    parts = [shared_hash, f"arg:{arg}"]
+    seen = set()
+    stack = [group_id]
+    while stack:
+        ident = stack.pop()
+        if ident in seen:
+            continue
+        seen.add(ident)
+        group = groups.get(ident)
+        if group is not None:
+            parts.append(f"g:{ident}:{group['hash']}")
+            stack.extend(ref for ref in group['refs'] if ref not in seen)
+        elif ident in attributes:
+            parts.append(f"a:{ident}:{attributes[ident]}")
+        elif ident == group_id:
+            parts.append(f"missing:{ident}")
+    return sha256("\n".join(sorted(parts)))
+
+
+# --- blocks -----------------------------------------------------------------
+
+def markdown_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith('.md'))
+        elif os.path.exists(path):
+            files.append(path)
+    return files
+
+
+def find_blocks(content):
+    """``(kind, arg, start, end)`` of each block body, in document order."""
+    return [(match.group(1), match.group(2), match.start(3), match.end(3)) for match in BLOCK_RE.finditer(content)]
+
+
+def block_key(path, kind, arg, ordinal):
+    return f"{path}#{kind}:{arg or ''}#{ordinal}"
+
+
+RENDERERS = {
+    'areas': lambda arg, context: render_areas(context['areas']),
+}
+
+
+def render_file(path, items, context):
+    """Render the dirty blocks of a file.
+
+    ``items`` are ``(kind, arg, start, end)``; returns the rendered bodies, the
+    new content of the file and the offset of the first block that changed.
+    """
+    with open(path, 'r') as file:
+        content = file.read()
+    pieces = []
+    rendered_blocks = []
+    position = 0
+    mismatch = None
+    for kind, arg, start, end in items:
+        rendered = RENDERERS[kind](arg, context)
+        rendered_blocks.append(rendered)
+        pieces.append(content[position:start])
+        pieces.append(rendered)
+        if mismatch is None and content[start:end] != rendered:
+            mismatch = start
+        position = end
+    pieces.append(content[position:])
+    return rendered_blocks, "".join(pieces), mismatch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally regenerate marker-delimited blocks in markdown files.")
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS,
+                        help="Markdown files or directories (default: AREAS.md docs)")
+    parser.add_argument('--check', action='store_true',
+                        help="Do not write files; fail on the first block that is outdated")
+    parser.add_argument('--record', action='store_true',
+                        help="Record the current weaver blocks as up to date (run after make table-check/table-generation)")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help="Cache of block hashes")
+    args = parser.parse_args()
+
+    cache = load_cache(args.cache_file)
+    cached_blocks = cache.get('blocks') or {}
+    blocks = {}
+    context = {}
+    # path -> [(kind, arg, start, end, key, inputs)] of the dirty blocks rendered here
+    dirty = {}
+    needs_weaver = []
+    outdated = []
+
+    files = markdown_files(args.paths)
+    # Blocks of files outside this run keep their cached state
+    scanned = set(files)
+    blocks.update((key, state) for key, state in cached_blocks.items()
+                  if key.split('#', 1)[0] not in scanned and os.path.exists(key.split('#', 1)[0]))
+
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        groups = attributes = shared_hash = areas_hash = None
+        for path in files:
+            with open(path, 'r') as file:
+                content = file.read()
+            ordinals = {}
+            for kind, arg, start, end in find_blocks(content):
+                ordinal = ordinals[(kind, arg)] = ordinals.get((kind, arg), -1) + 1
+                key = block_key(path, kind, arg, ordinal)
+                if kind == 'areas':
+                    if areas_hash is None:
+                        context['areas'] = load_areas()
+                        areas_hash = canonical_hash(context['areas'])
+                    inputs = areas_hash
+                else:
+                    if groups is None:
+                        groups, attributes = update_model_index(cache, executor)
+                        shared_hash = weaver_inputs_hash()
+                    inputs = semconv_inputs_hash(arg, groups, attributes, shared_hash)
+                state = {'inputs': inputs, 'content': sha256(content[start:end])}
+                if cached_blocks.get(key) == state or (args.record and kind not in RENDERERS):
+                    blocks[key] = state
+                elif kind in RENDERERS:
+                    dirty.setdefault(path, []).append((kind, arg, start, end, key, inputs))
+                else:
+                    needs_weaver.append(key)
+                    if key in cached_blocks:
+                        blocks[key] = cached_blocks[key]
+
+        futures = {executor.submit(render_file, path, [item[:4] for item in items], context): path
+                   for path, items in dirty.items()}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                rendered_blocks, new_content, mismatch = future.result()
+                if mismatch is not None and args.check:
+                    line = new_content.count('\n', 0, mismatch) + 1
+                    print(f"{path}:{line}: generated block is outdated. Run make areas-table-generation to update")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    # Keep the re-indexed model for the next run
+                    save_cache(args.cache_file, dict(cache, blocks=cached_blocks))
+                    sys.exit(EXIT_OUTDATED)
+                if mismatch is not None:
+                    with open(path, 'w') as file:
+                        file.write(new_content)
+                    outdated.append(path)
+                for item, rendered in zip(dirty[path], rendered_blocks):
+                    blocks[item[4]] = {'inputs': item[5], 'content': sha256(rendered)}
+
+    cache['blocks'] = blocks
+    save_cache(args.cache_file, cache)
+
+    for path in outdated:
+        print(f"Updated {path}")
+    if needs_weaver:
+        print(f"{len(needs_weaver)} weaver block(s) changed since the last recorded check, e.g. {needs_weaver[0]}")
+        print("Run make table-check (or make table-generation), then this script with --record")
+        if args.check:
+            sys.exit(EXIT_NEEDS_WEAVER)
+    elif not outdated:
+        print("All marker blocks are up to date.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Estado persistente del análisis de spans para acumular capturas entre ejecuciones.
+
+El estado guarda el análisis combinado (contadores de tipos, ejemplos o
+reservorios, kinds y firmas por patrón) en un pickle comprimido con gzip,
+junto con las opciones con que se generó y la huella (ruta, tamaño y mtime)
+de cada captura ya incorporada. Así una captura nueva se suma al estado en
+tiempo proporcional a sus propios datos y las ya vistas no se reprocesan.
+
+En modo exacto los ejemplos de cada atributo crecen sin límite; para perfilar
+tráfico durante días conviene usar --compact.
+"""
+
+import gzip
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+STATE_FORMAT_VERSION = 1
+
+# Opciones que cambian la forma del estado y deben coincidir entre ejecuciones
+STATE_OPTIONS = ('compact', 'max_examples', 'max_span_contexts',
+                 'sample_rate', 'min_samples', 'confidence', 'margin')
+
+
+class StateError(ValueError):
+    """Estado ilegible o generado con opciones incompatibles."""
+
+
+def capture_fingerprint(path: str) -> Optional[str]:
+    """Huella de una captura; ``None`` para stdin, que nunca se considera vista."""
+    if path == '-':
+        return None
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def new_state(options: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'format': STATE_FORMAT_VERSION,
+        'options': {name: options.get(name) for name in STATE_OPTIONS},
+        'captures': {},
+        'analysis': None,
+    }
+
+
+def load_state(state_file: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Carga el estado, o uno vacío si el archivo no existe.
+
+    Lanza ``StateError`` si el archivo no es un estado válido o se generó con
+    opciones incompatibles: descartarlo en silencio perdería lo acumulado.
+    """
+    if not os.path.exists(state_file):
+        return new_state(options)
+    try:
+        with gzip.open(state_file, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        raise StateError(f"{state_file}: estado no válido ({e})") from None
+    if not isinstance(state, dict) or state.get('format') != STATE_FORMAT_VERSION:
+        raise StateError(f"{state_file}: formato de estado no soportado")
+
+    expected = {name: options.get(name) for name in STATE_OPTIONS}
+    mismatched = [name for name in STATE_OPTIONS if state['options'].get(name) != expected[name]]
+    if mismatched:
+        details = ', '.join(f"{name}={state['options'].get(name)!r}" for name in mismatched)
+        raise StateError(f"{state_file}: el estado se generó con otras opciones ({details})")
+    return state
+
+
+def save_state(state_file: str, state: Dict[str, Any]) -> None:
+    """Escribe el estado de forma atómica."""
+    directory = os.path.dirname(os.path.abspath(state_file))
+    os.makedirs(directory, exist_ok=True)
+    tmp_file = f'{state_file}.{os.getpid()}.tmp'
+    with gzip.open(tmp_file, 'wb', compresslevel=6) as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, state_file)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Clasificador de atributos por área (directorio de ``model/``) y SIG responsable.
+
+Se construye un trie de namespaces a partir de los atributos del modelo: cada
+nodo (``db``, ``db.cassandra``...) guarda el directorio de ``model/`` que
+define la mayoría de los atributos bajo ese prefijo. Un atributo, esté o no en
+el modelo, se clasifica por el namespace más largo que coincide, recorriendo
+sus segmentos una sola vez. El área se cruza con las etiquetas ``area:*`` de
+``areas.yaml`` para obtener el SIG y los equipos responsables.
+
+El índice se serializa a JSON en el directorio de caché, con el hash del
+modelo y de areas.yaml en el nombre, igual que deprecation_index.py.
+
+Uso:
+  python area_index.py [--model-dir model] [--rebuild] [atributo ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from semconv_model import (DEFAULT_CACHE_DIR, DEFAULT_MODEL_DIR, REPO_ROOT, load_registry, load_yaml,
+                           model_dir_key)
+
+DEFAULT_AREAS_FILE = os.path.join(REPO_ROOT, 'areas.yaml')
+UNKNOWN_AREA = 'other'
+
+INDEX_FORMAT_VERSION = 2
+
+def index_key(model_hash: str, areas_file: str = DEFAULT_AREAS_FILE) -> str:
+    """Clave de caché: hash del modelo más el contenido de areas.yaml."""
+    digest = hashlib.sha256(f'v{INDEX_FORMAT_VERSION}:{model_hash}'.encode())
+    if os.path.exists(areas_file):
+        with open(areas_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_owners(areas_file: str = DEFAULT_AREAS_FILE) -> Dict[str, List[Dict[str, Any]]]:
+    """Etiqueta (``db``) → SIGs que la tienen en areas.yaml, con sus equipos."""
+    if not os.path.exists(areas_file):
+        return {}
+    owners = defaultdict(list)
+    for area in (load_yaml(areas_file) or {}).get('areas') or []:
+        sig = {
+            'sig': area.get('name'),
+            'teams': [owner['github'] for owner in area.get('owner') or [] if owner.get('github')],
+        }
+        for label in area.get('labels') or []:
+            if label and label.startswith('area:'):
+                owners[label[len('area:'):]].append(sig)
+    return dict(owners)
+
+
+def label_variants(name: str) -> List[str]:
+    """Formas de un nombre que pueden aparecer como etiqueta (``onc_rpc``, ``exceptions``...)."""
+    variants = [name, name.replace('_', '-'), name.replace('-', '_')]
+    return variants + [variant[:-1] for variant in variants if variant.endswith('s')]
+
+
+def match_label(names: List[str], labels: Dict[str, Any]) -> Optional[str]:
+    """Primera etiqueta de areas.yaml que coincide con alguno de los nombres.
+
+    Se prueban primero los nombres completos, en orden, y después cada uno de
+    sus segmentos (``security-rule`` → ``security``, ``onc_rpc`` → ``rpc``).
+    """
+    for name in names:
+        for variant in label_variants(name):
+            if variant in labels:
+                return variant
+    for name in names:
+        for segment in re.split(r'[-_]', name):
+            if segment in labels:
+                return segment
+    return None
+
+
+def build_area_index(registry: Dict[str, Any], areas_file: str = DEFAULT_AREAS_FILE) -> Dict[str, Any]:
+    """Construye el trie de namespaces y la tabla de responsables por área.
+
+    La etiqueta de cada directorio se deduce de las etiquetas ``area:*`` de
+    areas.yaml: por el nombre del directorio o por los namespaces que define
+    (``database`` define ``db.*``). Si no hay coincidencia y sus atributos solo
+    se usan en los grupos de otro directorio, hereda la etiqueta de ese
+    directorio (``cassandra`` → ``database``). Los directorios que quedan sin etiqueta se avisan por stderr.
+    """
+    votes = defaultdict(Counter)
+    defined = defaultdict(Counter)
+    attr_area = {}
+    for attr_name, definition in registry['attributes'].items():
+        area = definition['file'].replace(os.sep, '/').split('/', 1)[0]
+        attr_area[attr_name] = area
+        namespace = attr_name.split('.')[:-1] or [attr_name]
+        defined[area][namespace[0]] += 1
+        for depth in range(1, len(namespace) + 1):
+            votes['.'.join(namespace[:depth])][area] += 1
+
+    trie = {'children': {}}
+    for namespace in sorted(votes):
+        node = trie
+        for segment in namespace.split('.'):
+            node = node['children'].setdefault(segment, {'children': {}})
+        node['area'] = votes[namespace].most_common(1)[0][0]
+
+    referenced_by = defaultdict(Counter)
+    for group in registry['groups'].values():
+        group_area = group['file'].replace(os.sep, '/').split('/', 1)[0]
+        for attr in group.get('attributes') or []:
+            area = attr_area.get(attr.get('ref') or attr.get('id'))
+            if area is not None and area != group_area:
+                referenced_by[area][group_area] += 1
+
+    owners_by_label = load_owners(areas_file)
+    all_areas = sorted({area for counter in votes.values() for area in counter})
+    labels = {}
+    for area in all_areas:
+        names = [area] + [namespace for namespace, _ in defined[area].most_common()]
+        labels[area] = match_label(names, owners_by_label)
+    for area in all_areas:
+        users = referenced_by[area]
+        if labels[area] is None and len(users) == 1:
+            labels[area] = labels.get(next(iter(users)))
+
+    unmatched = [area for area in all_areas if labels[area] is None]
+    if unmatched and owners_by_label:
+        print(f"Aviso: {len(unmatched)} directorios de model/ sin etiqueta area:* en {areas_file}: "
+              f"{', '.join(unmatched)}", file=sys.stderr)
+
+    areas = {}
+    for area in all_areas:
+        label = labels[area]
+        areas[area] = {'label': f'area:{label}' if label else None,
+                       'owners': owners_by_label.get(label, []) if label else []}
+    return {'trie': trie, 'areas': areas}
+
+
+def load_area_index(model_dir: str = DEFAULT_MODEL_DIR,
+                    areas_file: str = DEFAULT_AREAS_FILE,
+                    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                    rebuild: bool = False) -> Dict[str, Any]:
+    """Carga el índice desde la caché o lo reconstruye si el modelo o areas.yaml cambiaron."""
+    registry = load_registry(model_dir, cache_dir, rebuild=rebuild)
+    if cache_dir is None:
+        return build_area_index(registry, areas_file)
+
+    key = index_key(registry['content_hash'], areas_file)
+    # Un archivo por directorio del modelo: varias copias pueden compartir la caché
+    prefix = f'area-index-{model_dir_key(model_dir)}-'
+    cache_file = os.path.join(cache_dir, f'{prefix}{key[:16]}.json')
+    if not rebuild and os.path.exists(cache_file):
+        # Un archivo truncado o ilegible se reconstruye como si no existiera
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    index = build_area_index(registry, areas_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix):
+            os.remove(os.path.join(cache_dir, name))
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_file, cache_file)
+    return index
+
+
+class AreaClassifier:
+    """Clasifica atributos por el namespace más largo conocido."""
+
+    def __init__(self, index: Dict[str, Any]):
+        self.trie = index['trie']
+        self.areas = index['areas']
+
+    def area(self, attr_name: str) -> str:
+        node = self.trie
+        area = UNKNOWN_AREA
+        for segment in attr_name.split('.'):
+            node = node['children'].get(segment)
+            if node is None:
+                break
+            area = node.get('area', area)
+        return area
+
+    def owners(self, area: str) -> List[Dict[str, Any]]:
+        """SIGs responsables de un área (vacío si areas.yaml no la cubre)."""
+        return self.areas.get(area, {}).get('owners', [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el índice cacheado de áreas y clasifica atributos.")
+    parser.add_argument('attributes', nargs='*', help="Atributos a clasificar")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--areas-file', default=DEFAULT_AREAS_FILE, help="areas.yaml con los SIGs responsables")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directorio de caché")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora la caché existente")
+    args = parser.parse_args()
+
+    try:
+        index = load_area_index(args.model_dir, args.areas_file, args.cache_dir, rebuild=args.rebuild)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    classifier = AreaClassifier(index)
+    for attr_name in args.attributes:
+        area = classifier.area(attr_name)
+        sigs = ', '.join(owner['sig'] for owner in classifier.owners(area)) or '-'
+        print(f"{attr_name}: {area} ({sigs})")
+    if not args.attributes:
+        print(f"Áreas indexadas: {len(index['areas'])}")
+        print(f"Caché: {args.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Estructuras de tamaño acotado para resumir atributos de spans.
+
+- ``ExampleReservoir``: muestra uniforme de valores distintos (bottom-k por hash).
+- ``HyperLogLog``: estimación aproximada del número de valores distintos.
+- ``CappedSet``: conjunto que deja de crecer al alcanzar un límite.
+
+Todas se pueden combinar (``merge``) y usan un hash estable entre procesos,
+de modo que resúmenes calculados por separado se pueden unir sin perder precisión.
+"""
+
+import hashlib
+import heapq
+import math
+from typing import Dict, Iterable, Iterator, List
+
+DEFAULT_MAX_EXAMPLES = 3
+DEFAULT_MAX_SPAN_CONTEXTS = 20
+DEFAULT_HLL_PRECISION = 10  # 1024 registros, ~3% de error
+
+
+def stable_hash(value: str) -> int:
+    """Hash de 64 bits independiente de PYTHONHASHSEED."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+
+
+class ExampleReservoir:
+    """Muestra de tamaño fijo de valores distintos.
+
+    Conserva los ``capacity`` valores con menor hash, lo que equivale a una
+    muestra uniforme sobre los valores distintos vistos y es combinable.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MAX_EXAMPLES):
+        self.capacity = capacity
+        self.values: Dict[int, str] = {}
+        self._heap: List[int] = []  # hashes negados (max-heap)
+
+    def add(self, value: str, value_hash: int = None) -> None:
+        if value_hash is None:
+            value_hash = stable_hash(value)
+        if value_hash in self.values:
+            return
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, -value_hash)
+            self.values[value_hash] = value
+        elif value_hash < -self._heap[0]:
+            evicted = -heapq.heapreplace(self._heap, -value_hash)
+            del self.values[evicted]
+            self.values[value_hash] = value
+
+    def merge(self, other: 'ExampleReservoir') -> None:
+        for value_hash, value in other.values.items():
+            self.add(value, value_hash)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.values[h] for h in sorted(self.values))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class HyperLogLog:
+    """Estimador HyperLogLog del número de valores distintos."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str, value_hash: int = None) -> None:
+        if value_hash is None:
+            value_hash = stable_hash(value)
+        index = value_hash >> (64 - self.precision)
+        rest = value_hash & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        if other.precision != self.precision:
+            raise ValueError("No se pueden combinar HyperLogLog de distinta precisión")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Corrección para cardinalidades pequeñas (linear counting)
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class CappedSet(set):
+    """Conjunto que ignora nuevos elementos una vez alcanzado ``limit``."""
+
+    def __init__(self, limit: int = DEFAULT_MAX_SPAN_CONTEXTS, items: Iterable = ()):
+        super().__init__()
+        self.limit = limit
+        self.truncated = False
+        self.update(items)
+
+    def add(self, item) -> None:
+        if len(self) < self.limit:
+            super().add(item)
+        elif item not in self:
+            self.truncated = True
+
+    def update(self, *iterables) -> None:
+        for iterable in iterables:
+            for item in iterable:
+                self.add(item)
+
+    def merge(self, other: 'CappedSet') -> None:
+        self.update(other)
+        self.truncated = self.truncated or getattr(other, 'truncated', False)
+
+    def __reduce__(self):
+        return (self.__class__, (self.limit, list(self)), {'truncated': self.truncated})
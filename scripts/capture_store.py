@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Almacén columnar de capturas de spans para repetir análisis y consultas.
+
+Una captura (JSON, JSON-lines u OTLP protobuf) se convierte una sola vez en un
+archivo ``.spanstore`` con:
+
+- un diccionario de strings (nombres de span, claves y valores de texto)
+- columnas por span: nombre, kind, recurso y el rango de sus atributos
+- columnas por atributo: clave, tipo, valor y span al que pertenece; el valor
+  es un entero de 64 bits (id de string, entero o booleano) o los mismos 8
+  bytes leídos como double, según el tipo
+- un índice invertido clave → filas de atributo, ordenadas por span
+
+Todas las secciones están alineadas a 8 bytes y se leen con ``mmap`` y
+``memoryview.cast``, sin parsear nada al abrir: ``analyze_store`` genera el
+mismo análisis que ``analyze_spans`` recorriendo columnas e índice, y las
+consultas por atributo solo tocan las filas de esa clave.
+
+Uso:
+  python capture_store.py build capturas/ -o captura.spanstore
+  python capture_store.py query captura.spanstore db.statement --values
+  python generate_registry_from_spans.py captura.spanstore registry.yaml
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from attribute_sketches import DEFAULT_MAX_EXAMPLES, DEFAULT_MAX_SPAN_CONTEXTS, stable_hash
+from generate_registry_from_spans import (
+    DEFAULT_BATCH_SIZE,
+    STORE_EXTENSION,
+    create_default_attribute_info,
+    create_default_span_pattern,
+    expand_inputs,
+    iter_spans,
+    merge_span_patterns,
+    registry_type,
+)
+from span_templates import DEFAULT_MAX_TEMPLATES, SpanNameTemplater
+
+MAGIC = b'SPANSTO1'
+STORE_FORMAT_VERSION = 1
+FOOTER = struct.Struct('<Q8s')
+ALIGNMENT = 8
+
+# Tipos de la columna de valores
+T_STRING = 0
+T_INT = 1
+T_DOUBLE = 2
+T_BOOL = 3
+T_JSON = 4  # listas, mapas y enteros fuera de int64, serializados como string JSON
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+DOUBLE_BITS = struct.Struct('<d')
+INT64 = struct.Struct('<q')
+
+SPAN_KINDS = ('INTERNAL', 'SERVER', 'CLIENT', 'PRODUCER', 'CONSUMER')
+
+# Sección → código de tipo de ``array``
+SECTIONS = {
+    'string_offsets': 'Q',
+    'string_data': 'B',
+    'span_names': 'I',
+    'span_kinds': 'B',
+    'span_resources': 'I',
+    'span_attributes': 'Q',
+    'attr_keys': 'I',
+    'attr_types': 'B',
+    'attr_values': 'q',
+    'attr_spans': 'I',
+    'index_keys': 'I',
+    'index_offsets': 'Q',
+    'index_rows': 'Q',
+}
+
+
+class StoreBuilder:
+    """Acumula spans en columnas en memoria y las escribe con ``write``."""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.string_data = bytearray()
+        self.string_offsets = array('Q', [0])
+        self.resources: Dict[str, int] = {}
+        self.kinds: Dict[str, int] = {kind: i for i, kind in enumerate(SPAN_KINDS)}
+        self.span_names = array('I')
+        self.span_kinds = array('B')
+        self.span_resources = array('I')
+        self.span_attributes = array('Q', [0])
+        self.attr_keys = array('I')
+        self.attr_types = array('B')
+        self.attr_values = array('q')
+        self.attr_spans = array('I')
+
+    def string_id(self, value: str) -> int:
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+            self.string_data += value.encode('utf-8', 'surrogatepass')
+            self.string_offsets.append(len(self.string_data))
+        return string_id
+
+    def encode_value(self, value: Any):
+        value_type = type(value)
+        if value_type is str:
+            return T_STRING, self.string_id(value)
+        if value_type is bool:
+            return T_BOOL, int(value)
+        if value_type is int and INT64_MIN <= value <= INT64_MAX:
+            return T_INT, value
+        if value_type is float:
+            return T_DOUBLE, INT64.unpack(DOUBLE_BITS.pack(value))[0]
+        return T_JSON, self.string_id(json.dumps(value, separators=(',', ':')))
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        span_id = len(self.span_names)
+        self.span_names.append(self.string_id(str(span.get('name', 'unknown'))))
+        kind = span.get('kind', 'INTERNAL')
+        self.span_kinds.append(self.kinds.setdefault(kind, len(self.kinds)))
+        resource = json.dumps(span.get('resource') or {}, sort_keys=True)
+        self.span_resources.append(self.resources.setdefault(resource, len(self.resources)))
+        for attr_name, value in (span.get('attributes') or {}).items():
+            value_type, encoded = self.encode_value(value)
+            self.attr_keys.append(self.string_id(attr_name))
+            self.attr_types.append(value_type)
+            self.attr_values.append(encoded)
+            self.attr_spans.append(span_id)
+        self.span_attributes.append(len(self.attr_keys))
+
+    def add_spans(self, spans: Iterable[Dict[str, Any]]) -> None:
+        for span in spans:
+            self.add_span(span)
+
+    def build_index(self):
+        """Índice invertido por ordenación por conteo: filas de cada clave en orden de span."""
+        counts = Counter(self.attr_keys)
+        index_keys = array('I', sorted(counts))
+        index_offsets = array('Q', [0])
+        positions = {}
+        for key_id in index_keys:
+            positions[key_id] = index_offsets[-1]
+            index_offsets.append(index_offsets[-1] + counts[key_id])
+        index_rows = array('Q', bytes(8 * len(self.attr_keys)))
+        for row, key_id in enumerate(self.attr_keys):
+            index_rows[positions[key_id]] = row
+            positions[key_id] += 1
+        return index_keys, index_offsets, index_rows
+
+    def write(self, path: str) -> Dict[str, Any]:
+        """Escribe el almacén de forma atómica y devuelve su cabecera."""
+        index_keys, index_offsets, index_rows = self.build_index()
+        columns = {
+            'string_offsets': self.string_offsets,
+            'string_data': array('B', self.string_data),
+            'span_names': self.span_names,
+            'span_kinds': self.span_kinds,
+            'span_resources': self.span_resources,
+            'span_attributes': self.span_attributes,
+            'attr_keys': self.attr_keys,
+            'attr_types': self.attr_types,
+            'attr_values': self.attr_values,
+            'attr_spans': self.attr_spans,
+            'index_keys': index_keys,
+            'index_offsets': index_offsets,
+            'index_rows': index_rows,
+        }
+        header = {
+            'format': STORE_FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'span_count': len(self.span_names),
+            'attribute_count': len(self.attr_keys),
+            'string_count': len(self.strings),
+            'kinds': [kind for kind, _ in sorted(self.kinds.items(), key=lambda item: item[1])],
+            'resources': [json.loads(resource) for resource, _ in sorted(self.resources.items(), key=lambda item: item[1])],
+            'sections': {},
+        }
+
+        tmp_file = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(MAGIC)
+            for name, column in columns.items():
+                padding = -f.tell() % ALIGNMENT
+                f.write(b'\0' * padding)
+                header['sections'][name] = [f.tell(), len(column)]
+                column.tofile(f)
+            header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+            f.write(header_bytes)
+            f.write(FOOTER.pack(len(header_bytes), MAGIC))
+        os.replace(tmp_file, path)
+        return header
+
+
+def build_store(input_files: List[str], output_file: str) -> Dict[str, Any]:
+    builder = StoreBuilder()
+    for path in input_files:
+        builder.add_spans(iter_spans(path))
+    return builder.write(output_file)
+
+
+class CaptureStore:
+    """Lectura de un ``.spanstore`` mapeado en memoria."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(MAGIC) + FOOTER.size:
+                raise ValueError(f"{path}: no es un almacén de spans")
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_size, magic = FOOTER.unpack_from(self.mmap, size - FOOTER.size)
+        if self.mmap[:len(MAGIC)] != MAGIC or magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"{path}: no es un almacén de spans")
+        header_start = size - FOOTER.size - header_size
+        self.header = json.loads(self.mmap[header_start:size - FOOTER.size])
+        if self.header.get('format') != STORE_FORMAT_VERSION or self.header.get('byteorder') != sys.byteorder:
+            self.mmap.close()
+            raise ValueError(f"{path}: formato de almacén no soportado")
+
+        self.view = memoryview(self.mmap)
+        self.columns = {}
+        for name, (offset, length) in self.header['sections'].items():
+            typecode = SECTIONS[name]
+            item_size = array(typecode).itemsize
+            self.columns[name] = self.view[offset:offset + length * item_size].cast(typecode)
+        self.span_count = self.header['span_count']
+        self.kinds = self.header['kinds']
+        self.resources = self.header['resources']
+        self._key_ids: Optional[Dict[str, int]] = None
+        self._strings: Dict[int, str] = {}
+
+    def __enter__(self) -> 'CaptureStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self.view.release()
+        self.mmap.close()
+
+    def decode_string(self, string_id: int) -> str:
+        """Decodifica un string del diccionario sin pasar por la caché."""
+        offsets = self.columns['string_offsets']
+        return str(self.columns['string_data'][offsets[string_id]:offsets[string_id + 1]],
+                   'utf-8', 'surrogatepass')
+
+    def string(self, string_id: int) -> str:
+        """Nombre de span o clave de atributo; se recuerdan porque se repiten en cada span."""
+        value = self._strings.get(string_id)
+        if value is None:
+            value = self.decode_string(string_id)
+            if len(self._strings) < 100_000:
+                self._strings[string_id] = value
+        return value
+
+    def decode_value(self, value_type: int, encoded: int) -> Any:
+        # Los valores de texto se decodifican cada vez: no pasan por la caché de string()
+        if value_type == T_STRING:
+            return self.decode_string(encoded)
+        if value_type == T_INT:
+            return encoded
+        if value_type == T_DOUBLE:
+            return DOUBLE_BITS.unpack(INT64.pack(encoded))[0]
+        if value_type == T_BOOL:
+            return bool(encoded)
+        return json.loads(self.decode_string(encoded))
+
+    def value(self, row: int) -> Any:
+        return self.decode_value(self.columns['attr_types'][row], self.columns['attr_values'][row])
+
+    def span(self, span_id: int) -> Dict[str, Any]:
+        bounds = self.columns['span_attributes']
+        keys = self.columns['attr_keys']
+        return {
+            'name': self.string(self.columns['span_names'][span_id]),
+            'kind': self.kinds[self.columns['span_kinds'][span_id]],
+            'attributes': {self.string(keys[row]): self.value(row)
+                           for row in range(bounds[span_id], bounds[span_id + 1])},
+            'resource': self.resources[self.columns['span_resources'][span_id]],
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for span_id in range(self.span_count):
+            yield self.span(span_id)
+
+    def key_ids(self) -> Dict[str, int]:
+        """Clave de atributo → id de string, solo para las claves indexadas."""
+        if self._key_ids is None:
+            self._key_ids = {self.string(key_id): key_id for key_id in self.columns['index_keys']}
+        return self._key_ids
+
+    def attribute_rows(self, attr_name: str) -> List[int]:
+        """Filas de atributo con la clave ``attr_name``, en orden de span."""
+        key_id = self.key_ids().get(attr_name)
+        if key_id is None:
+            return []
+        index_keys = self.columns['index_keys']
+        # index_keys está ordenado: búsqueda binaria de la posición de la clave
+        lo, hi = 0, len(index_keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index_keys[mid] < key_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        offsets = self.columns['index_offsets']
+        return self.columns['index_rows'][offsets[lo]:offsets[lo + 1]].tolist()
+
+    def spans_with(self, attr_name: str) -> List[int]:
+        """Ids de los spans que tienen el atributo ``attr_name``."""
+        attr_spans = self.columns['attr_spans']
+        return [attr_spans[row] for row in self.attribute_rows(attr_name)]
+
+
+def iter_store_spans(path: str) -> Iterator[Dict[str, Any]]:
+    with CaptureStore(path) as store:
+        yield from store
+
+
+def analyze_store(path: str, compact: bool = False,
+                  max_examples: int = DEFAULT_MAX_EXAMPLES,
+                  max_span_contexts: int = DEFAULT_MAX_SPAN_CONTEXTS,
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  max_span_templates: int = DEFAULT_MAX_TEMPLATES) -> Dict:
+    """Mismo análisis que ``analyze_spans`` calculado sobre columnas e índice.
+
+    Los atributos se resumen clave a clave a partir del índice invertido,
+    decodificando cada valor distinto una sola vez; los patrones de span solo
+    recorren las columnas de nombre, kind y claves. ``batch_size`` se acepta
+    por compatibilidad con las opciones de ``analyze_spans`` y se ignora.
+    """
+    with CaptureStore(path) as store:
+        columns = store.columns
+        span_names = columns['span_names']
+        attr_spans = columns['attr_spans']
+        attr_types = columns['attr_types']
+        attr_values = columns['attr_values']
+
+        attributes_info = defaultdict(partial(create_default_attribute_info, compact,
+                                              max_examples, max_span_contexts))
+        index_keys = columns['index_keys']
+        index_offsets = columns['index_offsets']
+        index_rows = columns['index_rows']
+        # Claves en orden de primera aparición, como las acumula SpanAnalyzer
+        positions = sorted(range(len(index_keys)), key=lambda i: index_rows[index_offsets[i]])
+        for i in positions:
+            rows = index_rows[index_offsets[i]:index_offsets[i + 1]].tolist()
+            attr_info = attributes_info[store.string(index_keys[i])]
+            encoded = Counter(zip((attr_types[row] for row in rows), (attr_values[row] for row in rows)))
+            examples = set()
+            for (value_type, value), count in encoded.items():
+                decoded = store.decode_value(value_type, value)
+                attr_info['types'][registry_type(decoded)] += count
+                examples.add(decoded if value_type == T_STRING else str(decoded))
+            if compact:
+                for example in examples:
+                    value_hash = stable_hash(example)
+                    attr_info['examples'].add(example, value_hash)
+                    attr_info['cardinality'].add(example, value_hash)
+            else:
+                attr_info['examples'].update(examples)
+            name_ids = dict.fromkeys(span_names[attr_spans[row]] for row in rows)
+            attr_info['span_contexts'].update(store.string(name_id) for name_id in name_ids)
+
+        # Patrones: (nombre, kind) y (nombre, claves) por span, sin decodificar valores
+        kinds_by_name = Counter(zip(span_names, columns['span_kinds']))
+        bounds = columns['span_attributes']
+        attr_keys = columns['attr_keys']
+        keys_by_name = Counter((span_names[span_id], tuple(attr_keys[bounds[span_id]:bounds[span_id + 1]]))
+                               for span_id in range(store.span_count)
+                               if bounds[span_id] != bounds[span_id + 1])
+
+        templater = SpanNameTemplater(max_span_templates)
+        template_ids = {name_id: templater.assign(store.string(name_id)) for name_id in dict.fromkeys(span_names)}
+        patterns = defaultdict(create_default_span_pattern)
+        for (name_id, kind), count in kinds_by_name.items():
+            pattern = patterns[template_ids[name_id]]
+            pattern['kinds'][store.kinds[kind]] += count
+            pattern['names'].add(store.string(name_id))
+        signatures = {}
+        for (name_id, keys), count in keys_by_name.items():
+            signature = signatures.get(keys)
+            if signature is None:
+                signature = signatures[keys] = frozenset(store.string(key_id) for key_id in keys)
+            patterns[template_ids[name_id]]['signatures'][signature] += count
+
+        span_patterns = {}
+        for template_id, pattern_info in patterns.items():
+            template = templater.template(template_id)
+            if template in span_patterns:
+                span_patterns[template] = merge_span_patterns(
+                    merge_span_patterns(create_default_span_pattern(), span_patterns[template]), pattern_info)
+            else:
+                span_patterns[template] = pattern_info
+
+        return {
+            'attributes': dict(attributes_info),
+            'span_patterns': span_patterns,
+            'span_count': store.span_count,
+            'service_name': find_service_name(store),
+        }
+
+
+def find_service_name(store: CaptureStore) -> Optional[str]:
+    """``service.name`` del primer span que lo lleva en atributos o recurso, como ``SpanAnalyzer``."""
+    first_span, service_name = store.span_count, None
+    for row in store.attribute_rows('service.name'):
+        value = store.value(row)
+        if value:
+            first_span, service_name = store.columns['attr_spans'][row], value
+            break
+    with_service = {i for i, resource in enumerate(store.resources) if resource.get('service.name')}
+    if with_service:
+        for span_id, resource_id in enumerate(store.columns['span_resources'][:first_span]):
+            if resource_id in with_service:
+                return str(store.resources[resource_id]['service.name'])
+    return str(service_name) if service_name else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte capturas de spans a un almacén columnar y lo consulta.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Convierte capturas a un .spanstore")
+    build_parser.add_argument('inputs', nargs='+',
+                              help="Capturas de spans o directorios (JSON, JSON-lines u OTLP protobuf)")
+    build_parser.add_argument('--output', '-o', required=True, help=f"Archivo de salida ({STORE_EXTENSION})")
+
+    query_parser = subparsers.add_parser('query', help="Spans que tienen un atributo")
+    query_parser.add_argument('store', help=f"Almacén {STORE_EXTENSION}")
+    query_parser.add_argument('attribute', help="Clave del atributo (por ejemplo db.statement)")
+    query_parser.add_argument('--values', action='store_true', help="Muestra los valores más frecuentes")
+    query_parser.add_argument('--limit', type=int, default=10, help="Filas a mostrar (default: 10)")
+
+    info_parser = subparsers.add_parser('info', help="Resumen del almacén y claves más frecuentes")
+    info_parser.add_argument('store', help=f"Almacén {STORE_EXTENSION}")
+    info_parser.add_argument('--limit', type=int, default=20, help="Claves a mostrar (default: 20)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'build':
+            if not args.output.endswith(STORE_EXTENSION):
+                parser.error(f"La salida debe terminar en {STORE_EXTENSION}")
+            input_files = expand_inputs(args.inputs)
+            if not input_files:
+                print("Error: No se encontraron capturas de spans en las entradas indicadas", file=sys.stderr)
+                sys.exit(1)
+            header = build_store(input_files, args.output)
+            print(f"Almacén generado en {args.output}")
+            print(f"Spans: {header['span_count']}, atributos: {header['attribute_count']}, "
+                  f"strings distintos: {header['string_count']}")
+            return
+
+        with CaptureStore(args.store) as store:
+            if args.command == 'info':
+                print(f"Spans: {store.span_count}, atributos: {store.header['attribute_count']}, "
+                      f"claves: {len(store.key_ids())}")
+                sizes = Counter({attr_name: len(store.attribute_rows(attr_name)) for attr_name in store.key_ids()})
+                for attr_name, count in sizes.most_common(args.limit):
+                    print(f"  {attr_name}: {count}")
+                return
+
+            rows = store.attribute_rows(args.attribute)
+            span_ids = dict.fromkeys(store.columns['attr_spans'][row] for row in rows)
+            names = Counter(store.string(store.columns['span_names'][span_id]) for span_id in span_ids)
+            print(f"{args.attribute}: {len(rows)} valores en {len(span_ids)} spans")
+            for span_name, count in names.most_common(args.limit):
+                print(f"  {span_name}: {count}")
+            if args.values:
+                values = Counter(str(store.value(row)) for row in rows)
+                print("Valores más frecuentes:")
+                for value, count in values.most_common(args.limit):
+                    print(f"  {value}: {count}")
+    except FileNotFoundError as e:
+        print(f"Error: No se puede encontrar el archivo {e.filename}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
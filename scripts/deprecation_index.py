@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Índice precompilado de atributos deprecados, derivado de ``model/`` y ``schemas/``.
+
+Para cada atributo deprecado guarda el reemplazo (``renamed_to``), el motivo,
+la nota y la versión de semantic conventions en la que se deprecó (tomada de
+los ``rename_attributes`` del schema más reciente). El índice se serializa a
+un JSON compacto en el directorio de caché, con el hash del contenido del
+modelo en el nombre: mientras el modelo no cambie, cargarlo es inmediato.
+
+El modelo se lee con ``semconv_model.load_registry``, que reutiliza su propio
+snapshot incremental.
+
+Uso:
+  python deprecation_index.py [--model-dir model] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Optional
+
+from semconv_model import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MODEL_DIR,
+    REPO_ROOT,
+    iter_files,
+    load_registry,
+    load_yaml,
+    model_dir_key,
+)
+
+DEFAULT_SCHEMAS_DIR = os.path.join(REPO_ROOT, 'schemas')
+
+INDEX_FORMAT_VERSION = 2
+# Secciones del schema que renombran atributos de spans/recursos en general
+SCHEMA_RENAME_SECTIONS = ('all', 'spans', 'resources')
+
+CODE_SPAN_RE = re.compile(r'`([^`]+)`')
+
+
+def index_key(model_hash: str, schemas_dir: str = DEFAULT_SCHEMAS_DIR) -> str:
+    """Clave de caché: hash del modelo más el contenido de los schemas."""
+    digest = hashlib.sha256(f'v{INDEX_FORMAT_VERSION}:{model_hash}'.encode())
+    for path in iter_files(schemas_dir):
+        digest.update(os.path.relpath(path, schemas_dir).encode())
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def version_key(version: str):
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split('.'))
+
+
+def load_schema_renames(schemas_dir: str = DEFAULT_SCHEMAS_DIR) -> Dict[str, Dict[str, str]]:
+    """Atributo renombrado → {'renamed_to', 'since'} según el schema más reciente.
+
+    Cada archivo de ``schemas/`` contiene el historial completo, así que basta
+    con el de mayor versión. ``since`` es la primera versión que lo renombra.
+    """
+    if not os.path.isdir(schemas_dir):
+        return {}
+    versions = sorted(os.listdir(schemas_dir), key=version_key)
+    if not versions:
+        return {}
+    schema = load_yaml(os.path.join(schemas_dir, versions[-1])) or {}
+
+    renames = {}
+    for version in sorted(schema.get('versions') or {}, key=version_key):
+        sections = schema['versions'][version] or {}
+        for section in SCHEMA_RENAME_SECTIONS:
+            for change in (sections.get(section) or {}).get('changes') or []:
+                attribute_map = (change.get('rename_attributes') or {}).get('attribute_map') or {}
+                for old_name, new_name in attribute_map.items():
+                    renames.setdefault(old_name, {'renamed_to': new_name, 'since': version})
+    return renames
+
+
+def extract_replacement(deprecated: Dict[str, Any]) -> Optional[str]:
+    """Reemplazo de un atributo deprecado.
+
+    Algunas entradas del modelo describen el reemplazo en texto libre
+    (``renamed_to: Use `db.namespace` instead.`` o ``note: Replaced by ...``);
+    en ese caso se extraen los nombres entre comillas invertidas.
+    """
+    renamed_to = deprecated.get('renamed_to')
+    if renamed_to and '`' not in renamed_to:
+        return renamed_to
+    text = renamed_to or deprecated.get('note') or ''
+    if not renamed_to and not text.lstrip().startswith('Replaced by'):
+        return None
+    names = CODE_SPAN_RE.findall(text)
+    return ' + '.join(names) if names else None
+
+
+def build_deprecation_index(registry: Dict[str, Any],
+                            schemas_dir: str = DEFAULT_SCHEMAS_DIR) -> Dict[str, Dict[str, Any]]:
+    """Construye el índice atributo → {replacement, reason, note, since}.
+
+    ``registry`` es el resultado de ``semconv_model.load_registry``.
+    """
+    renames = load_schema_renames(schemas_dir)
+    index = {}
+
+    for attr_name, deprecated in sorted(registry['deprecations'].items()):
+        if not isinstance(deprecated, dict):
+            deprecated = {'reason': 'uncategorized', 'note': str(deprecated)}
+        rename = renames.get(attr_name, {})
+        note = deprecated.get('note')
+        index[attr_name] = {
+            'replacement': extract_replacement(deprecated) or rename.get('renamed_to'),
+            'reason': deprecated.get('reason'),
+            'note': ' '.join(note.split()) if note else None,
+            'since': rename.get('since'),
+        }
+
+    # Atributos renombrados en los schemas que ya no figuran en el modelo
+    for attr_name, rename in renames.items():
+        index.setdefault(attr_name, {
+            'replacement': rename['renamed_to'],
+            'reason': 'renamed',
+            'note': None,
+            'since': rename['since'],
+        })
+    return index
+
+
+def load_deprecation_index(model_dir: str = DEFAULT_MODEL_DIR,
+                           schemas_dir: str = DEFAULT_SCHEMAS_DIR,
+                           cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                           rebuild: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Carga el índice desde la caché o lo reconstruye si el modelo cambió."""
+    registry = load_registry(model_dir, cache_dir, rebuild=rebuild)
+    if cache_dir is None:
+        return build_deprecation_index(registry, schemas_dir)
+
+    key = index_key(registry['content_hash'], schemas_dir)
+    # Un archivo por directorio del modelo: varias copias pueden compartir la caché
+    prefix = f'deprecation-index-{model_dir_key(model_dir)}-'
+    cache_file = os.path.join(cache_dir, f'{prefix}{key[:16]}.json')
+    if not rebuild and os.path.exists(cache_file):
+        # Un archivo truncado o ilegible se reconstruye como si no existiera
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    index = build_deprecation_index(registry, schemas_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix):
+            os.remove(os.path.join(cache_dir, name))
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_file, cache_file)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el índice cacheado de atributos deprecados.")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--schemas-dir', default=DEFAULT_SCHEMAS_DIR, help="Directorio de schemas (default: schemas/)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directorio de caché")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora la caché existente")
+    args = parser.parse_args()
+
+    try:
+        index = load_deprecation_index(args.model_dir, args.schemas_dir, args.cache_dir, rebuild=args.rebuild)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Atributos deprecados indexados: {len(index)}")
+    print(f"Caché: {args.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
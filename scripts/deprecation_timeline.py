@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Línea temporal de deprecaciones a partir de varias versiones del modelo.
+
+Cada versión es un directorio ``model/`` de otra release (otro checkout, un
+``git worktree`` o un archivo descomprimido). Las versiones se recorren en
+orden y, por atributo, solo se guarda una entrada cuando su definición cambia;
+las definiciones idénticas se comparten entre versiones, así que el coste en
+memoria depende de los cambios y no del número de versiones.
+
+Con la línea temporal, una violation de atributo deprecado se clasifica frente
+a la versión de semantic conventions del SDK que la emitió:
+
+- ``after_sdk_version``: se deprecó después de esa versión (desfase esperado)
+- ``before_sdk_version``: ya estaba deprecado cuando salió el SDK
+- ``unknown``: no se conoce la versión del SDK o cuándo se deprecó, o la versión
+  del SDK cae entre dos snapshots no consecutivos que acotan la deprecación
+
+Además de los snapshots, ``since`` de los ``rename_attributes`` de schemas/
+sirve como fecha de deprecación para las versiones sin snapshot local.
+
+Uso:
+  git worktree add /tmp/semconv-1.27.0 v1.27.0
+  python deprecation_timeline.py --snapshot 1.27.0=/tmp/semconv-1.27.0/model db.system http.method
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from deprecation_index import DEFAULT_SCHEMAS_DIR, load_schema_renames, version_key
+from semconv_model import DEFAULT_MODEL_DIR, load_registry
+
+SCHEMA_URL_VERSION_RE = re.compile(r'/schemas/(\d+(?:\.\d+)*)')
+# Claves que añade resolve_registry y no forman parte de la definición
+LOCATION_KEYS = ('group', 'file')
+
+
+def current_model_version(schemas_dir: str = DEFAULT_SCHEMAS_DIR) -> Optional[str]:
+    """Versión del modelo actual: el schema más reciente de schemas/."""
+    if not os.path.isdir(schemas_dir):
+        return None
+    versions = sorted(os.listdir(schemas_dir), key=version_key)
+    return versions[-1] if versions else None
+
+
+def violation_semconv_version(violation: Dict[str, Any]) -> Optional[str]:
+    """Versión de semconv declarada en la violation (``semconv_version`` o ``schema_url``)."""
+    version = violation.get('semconv_version')
+    if version:
+        return str(version).lstrip('v')
+    match = SCHEMA_URL_VERSION_RE.search(violation.get('schema_url') or '')
+    return match.group(1) if match else None
+
+
+def parse_snapshot(spec: str) -> Tuple[str, str]:
+    """``1.27.0=/ruta/model`` → ``('1.27.0', '/ruta/model')``."""
+    version, separator, model_dir = spec.partition('=')
+    if not separator or not version or not model_dir:
+        raise argparse.ArgumentTypeError(f"Snapshot inválido {spec!r}, se espera VERSION=DIRECTORIO")
+    return version.lstrip('v'), model_dir
+
+
+class DeprecationTimeline:
+    """Historial por atributo de sus definiciones a lo largo de varias versiones."""
+
+    def __init__(self):
+        self.versions: List[str] = []
+        # Definición canónica (JSON) → definición compartida entre versiones
+        self.definitions: Dict[str, Dict[str, Any]] = {}
+        # Atributo → [(versión, definición o None si no existe)], solo en los cambios
+        self.history: Dict[str, List[Tuple[str, Optional[Dict[str, Any]]]]] = {}
+        self.schema_since: Dict[str, str] = {}
+
+    def add_version(self, version: str, registry: Dict[str, Any]) -> None:
+        """Añade una versión; deben añadirse en orden ascendente."""
+        if self.versions and version_key(version) <= version_key(self.versions[-1]):
+            raise ValueError(f"Las versiones deben añadirse en orden: {version} después de {self.versions[-1]}")
+        self.versions.append(version)
+        attributes = registry['attributes']
+        for attr_name, definition in attributes.items():
+            definition = {key: value for key, value in definition.items() if key not in LOCATION_KEYS}
+            canonical = json.dumps(definition, sort_keys=True, default=str)
+            shared = self.definitions.setdefault(canonical, definition)
+            changes = self.history.setdefault(attr_name, [])
+            if not changes or changes[-1][1] is not shared:
+                changes.append((version, shared))
+        for attr_name, changes in self.history.items():
+            if attr_name not in attributes and changes[-1][1] is not None:
+                changes.append((version, None))
+
+    def add_schema_renames(self, renames: Dict[str, Dict[str, str]]) -> None:
+        self.schema_since.update({attr_name: rename['since'] for attr_name, rename in renames.items()})
+
+    def deprecated_in(self, attr_name: str) -> Optional[str]:
+        """Versión en la que el atributo pasó a deprecado (o se eliminó), si se conoce.
+
+        Un cambio entre dos snapshots da el snapshot posterior, el primero en el
+        que ya aparece deprecado. Solo es la versión exacta si los dos snapshots
+        son releases consecutivas; si no, es una cota superior (la deprecación
+        ocurrió en alguna release entre ambos). ``since`` del schema, cuando
+        existe y es anterior, tiene prioridad.
+        """
+        candidates = []
+        previous = None
+        for version, definition in self.history.get(attr_name) or []:
+            if definition is None or definition.get('deprecated'):
+                if previous is not None and not previous.get('deprecated'):
+                    candidates.append(version)
+                break
+            previous = definition
+        if attr_name in self.schema_since:
+            candidates.append(self.schema_since[attr_name])
+        return min(candidates, key=version_key) if candidates else None
+
+    def deprecated_by(self, attr_name: str) -> Optional[str]:
+        """Primera versión observada en la que ya estaba deprecado (cota superior)."""
+        for version, definition in self.history.get(attr_name) or []:
+            if definition is None or definition.get('deprecated'):
+                return version
+        return None
+
+    def still_current_in(self, attr_name: str) -> Optional[str]:
+        """Última versión observada en la que aún no estaba deprecado (cota inferior)."""
+        deprecated_by = self.deprecated_by(attr_name)
+        if deprecated_by is None:
+            return None
+        # El historial solo guarda cambios: la cota es el snapshot anterior al
+        # primero deprecado, si entonces el atributo existía sin deprecar
+        previous = None
+        for version, definition in self.history[attr_name]:
+            if version == deprecated_by:
+                break
+            previous = definition
+        if previous is None or previous.get('deprecated'):
+            return None
+        return self.versions[self.versions.index(deprecated_by) - 1]
+
+    def deprecation(self, attr_name: str) -> Optional[Dict[str, Any]]:
+        """Bloque ``deprecated`` más reciente del atributo en cualquier versión."""
+        for _, definition in reversed(self.history.get(attr_name) or []):
+            if definition is not None and definition.get('deprecated'):
+                return definition['deprecated']
+        return None
+
+    def timing(self, attr_name: str, sdk_version: Optional[str]) -> Tuple[str, Optional[str]]:
+        """``(clasificación, versión de deprecación)`` frente a la versión del SDK.
+
+        Entre dos snapshots no consecutivos la deprecación solo se conoce
+        acotada: ``after_sdk_version`` exige que el SDK no pase de la última
+        versión sin deprecar (o que sea anterior a ``since`` del schema), y
+        ``before_sdk_version`` que alcance la primera deprecada. Un SDK dentro
+        del intervalo queda como ``unknown``.
+        """
+        deprecated_in = self.deprecated_in(attr_name)
+        if sdk_version is None:
+            return 'unknown', deprecated_in
+        sdk = version_key(sdk_version)
+        since = self.schema_since.get(attr_name)
+        upper = self.deprecated_by(attr_name)
+        if since is not None and (upper is None or version_key(since) < version_key(upper)):
+            upper = since
+        if upper is not None and sdk >= version_key(upper):
+            return 'before_sdk_version', deprecated_in
+        lower = self.still_current_in(attr_name)
+        if (since is not None and sdk < version_key(since)) or (lower is not None and sdk <= version_key(lower)):
+            return 'after_sdk_version', deprecated_in
+        return 'unknown', deprecated_in
+
+
+def build_timeline(snapshots: List[Tuple[str, str]], model_dir: str = DEFAULT_MODEL_DIR,
+                   model_version: Optional[str] = None,
+                   schemas_dir: str = DEFAULT_SCHEMAS_DIR) -> DeprecationTimeline:
+    """Línea temporal con los snapshots indicados más el modelo actual.
+
+    Cada snapshot se carga con ``load_registry``, que mantiene su propio
+    snapshot cacheado por directorio.
+    """
+    versions = dict(snapshots)
+    model_version = model_version or current_model_version(schemas_dir)
+    if model_version and model_version not in versions:
+        versions[model_version] = model_dir
+
+    timeline = DeprecationTimeline()
+    for version in sorted(versions, key=version_key):
+        timeline.add_version(version, load_registry(versions[version]))
+    timeline.add_schema_renames(load_schema_renames(schemas_dir))
+    return timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestra cuándo se deprecó cada atributo según varias versiones del modelo.")
+    parser.add_argument('attributes', nargs='*', help="Atributos a consultar")
+    parser.add_argument('--snapshot', action='append', type=parse_snapshot, default=[],
+                        help="Versión anterior del modelo como VERSION=DIRECTORIO (repetible)")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo actual (default: model/)")
+    parser.add_argument('--model-version', help="Versión del modelo actual (default: el schema más reciente)")
+    parser.add_argument('--sdk-version', help="Versión de semconv del SDK para clasificar los atributos")
+    args = parser.parse_args()
+
+    try:
+        timeline = build_timeline(args.snapshot, args.model_dir, args.model_version)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Versiones: {', '.join(timeline.versions)}")
+    print(f"Atributos: {len(timeline.history)}, definiciones distintas: {len(timeline.definitions)}")
+    for attr_name in args.attributes:
+        timing, deprecated_in = timeline.timing(attr_name, args.sdk_version)
+        print(f"{attr_name}: deprecado en {deprecated_in or '-'} ({timing})")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,85 +4,61 @@ Filtro para violations conocidas de SDKs desfasados.
 
 Este script filtra violations que son esperadas cuando el SDK aún no ha actualizado
 atributos que fueron deprecados en versiones anteriores de semantic conventions.
+
+Con --stream las violations se leen de forma incremental (array JSON, objeto con
+``violations`` o JSON-lines, también desde stdin) y cada una se escribe como un
+registro JSON-lines categorizado, con el resumen al final:
+
+  weaver registry live-check ... --output - | python3 filter_sdk_lag.py --stream - -o -
+
+Con --aggregate las violations se agrupan en buckets por (categoría, tipo,
+atributo, nombre de span) con el conteo, la primera y última posición en la
+entrada y unas pocas muestras; el resumen, las recomendaciones y el reporte se
+calculan sobre los buckets, así que el tamaño de la salida depende del número
+de problemas distintos y no del volumen de tráfico.
 """
 
+import argparse
 import json
 import sys
-from typing import Dict, List, Any, Set
-
-# Atributos deprecados más comunes que los SDKs tardan en actualizar
-KNOWN_SDK_LAG_ATTRIBUTES = {
-    # Deployment - deprecados en v1.27.0
-    "deployment.environment": "deployment.environment.name",
-    
-    # Database - deprecados principalmente en v1.26.0
-    "db.statement": "db.query.text",
-    "db.operation": "db.operation.name", 
-    "db.name": "db.namespace",
-    "db.system": "db.system.name",
-    "db.user": None,  # Sin reemplazo
-    "db.connection_string": "server.address + server.port",
-    "db.instance.id": None,
-    
-    # Cassandra
-    "db.cassandra.table": "db.collection.name",
-    "db.cassandra.consistency_level": "cassandra.consistency.level",
-    "db.cassandra.coordinator.dc": "cassandra.coordinator.dc",
-    "db.cassandra.coordinator.id": "cassandra.coordinator.id",
-    "db.cassandra.idempotence": "cassandra.query.idempotent",
-    
-    # MongoDB
-    "db.mongodb.collection": "db.collection.name",
-    
-    # CosmosDB
-    "db.cosmosdb.container": "db.collection.name",
-    "db.cosmosdb.consistency_level": "azure.cosmosdb.consistency.level",
-    "db.cosmosdb.operation_type": None,
-    "db.cosmosdb.regions_contacted": "azure.cosmosdb.operation.contacted_regions",
-    
-    # Elasticsearch
-    "db.elasticsearch.cluster.name": "db.namespace",
-    "db.elasticsearch.node.name": "elasticsearch.node.name",
-    
-    # Redis
-    "db.redis.database_index": "db.namespace",
-    
-    # Messaging - deprecados en v1.26.0 y v1.27.0
-    "messaging.operation": "messaging.operation.type",
-    "messaging.kafka.consumer.group": "messaging.consumer.group.name",
-    "messaging.kafka.destination.partition": "messaging.destination.partition.id", 
-    "messaging.kafka.message.offset": "messaging.kafka.offset",
-    "messaging.eventhubs.consumer.group": "messaging.consumer.group.name",
-    "messaging.rocketmq.client_group": "messaging.consumer.group.name",
-    "messaging.servicebus.destination.subscription_name": "messaging.destination.subscription.name",
-    "messaging.destination_publish.name": None,
-    "messaging.destination_publish.anonymous": None,
-    "messaging.client_id": "messaging.client.id",
-    
-    # RPC - deprecados en v1.26.0
-    "message.compressed_size": "rpc.message.compressed_size",
-    "message.id": "rpc.message.id", 
-    "message.type": "rpc.message.type",
-    "message.uncompressed_size": "rpc.message.uncompressed_size",
-    
-    # End User - deprecados en versiones anteriores
-    "enduser.role": "user.roles",
-    "enduser.scope": None,
-    
-    # TLS - deprecado en v1.27.0
-    "tls.client.server_name": "server.address",
-}
-
-def filter_known_sdk_lag_violations(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+from collections import Counter
+from functools import lru_cache
+from typing import IO, Dict, List, Any, Optional, Set
+
+from area_index import AreaClassifier, load_area_index
+from deprecation_index import DEFAULT_MODEL_DIR, extract_replacement, load_deprecation_index
+from deprecation_timeline import DeprecationTimeline, build_timeline, parse_snapshot, violation_semconv_version
+from json_stream import iter_json_items, open_capture
+from stage_profiler import add_profile_arguments, finish_profile, profiler_from_args
+
+# Los atributos deprecados conocidos se derivan de model/ y schemas/ mediante
+# un índice precompilado y cacheado (ver deprecation_index.py).
+
+def filter_known_sdk_lag_violations(analysis_data: Dict[str, Any],
+                                    deprecation_index: Optional[Dict[str, Dict[str, Any]]] = None,
+                                    include_original: bool = True,
+                                    area_classifier: Optional[AreaClassifier] = None,
+                                    timeline: Optional[DeprecationTimeline] = None,
+                                    sdk_version: Optional[str] = None) -> Dict[str, Any]:
     """
     Filtra violations conocidas del desfase de SDKs y las separa en categorías.
     
     Args:
         analysis_data: Datos del análisis de spans (JSON parseado)
+        deprecation_index: Índice de atributos deprecados; por defecto el
+            derivado de model/ (ver ``load_deprecation_index``)
+        include_original: Copiar ``analysis_data`` en ``original_analysis``
+        area_classifier: Clasificador de áreas; por defecto el derivado de
+            model/ y areas.yaml (ver ``load_area_index``)
+        timeline: Línea temporal de deprecaciones (ver ``build_timeline``)
+        sdk_version: Versión de semconv del SDK para las violations que no
+            declaran la suya
         
     Returns:
         Diccionario con violations filtradas y estadísticas
     """
+    if deprecation_index is None:
+        deprecation_index = load_deprecation_index()
     original_violations = analysis_data.get('violations', [])
     
     # Separar violations en categorías
@@ -90,45 +66,261 @@ def filter_known_sdk_lag_violations(analysis_data: Dict[str, Any]) -> Dict[str,
     sdk_lag_violations = []
     unknown_deprecated = []
     
+    categories = {
+        'real': real_violations,
+        'known_sdk_lag': sdk_lag_violations,
+        'unknown_deprecated': unknown_deprecated,
+    }
     for violation in original_violations:
-        attr_name = violation.get('attribute', '')
-        violation_type = violation.get('type', '')
-        
-        if violation_type == 'deprecated_attribute' and attr_name in KNOWN_SDK_LAG_ATTRIBUTES:
-            # Esta es una violation conocida del desfase del SDK
-            violation['category'] = 'known_sdk_lag'
-            violation['replacement'] = KNOWN_SDK_LAG_ATTRIBUTES[attr_name]
-            sdk_lag_violations.append(violation)
-        elif violation_type == 'deprecated_attribute':
-            # Deprecado pero no conocido - podría ser nuevo
-            violation['category'] = 'unknown_deprecated'
-            unknown_deprecated.append(violation)
-        else:
-            # Violation real que necesita atención
-            real_violations.append(violation)
+        categories[classify_violation(violation, deprecation_index, timeline, sdk_version)].append(violation)
+    timings = None
+    if timeline is not None:
+        timings = Counter(v['deprecation_timing'] for v in sdk_lag_violations + unknown_deprecated)
     
     # Crear reporte filtrado
     filtered_analysis = {
-        'original_analysis': analysis_data,
         'filtered_results': {
             'real_violations': real_violations,
             'sdk_lag_violations': sdk_lag_violations, 
             'unknown_deprecated': unknown_deprecated,
         },
-        'summary': {
-            'total_violations': len(original_violations),
-            'real_issues': len(real_violations),
-            'known_sdk_lag': len(sdk_lag_violations),
-            'unknown_deprecated': len(unknown_deprecated),
-            'attention_needed': len(real_violations) + len(unknown_deprecated),
-        },
-        'recommendations': generate_recommendations(real_violations, unknown_deprecated, sdk_lag_violations)
+        'summary': build_summary(Counter({category: len(items) for category, items in categories.items()}), timings),
+        'recommendations': generate_recommendations(real_violations, unknown_deprecated, sdk_lag_violations,
+                                                    area_classifier)
     }
+    if include_original:
+        filtered_analysis = {'original_analysis': analysis_data, **filtered_analysis}
     
     return filtered_analysis
 
-def generate_recommendations(real_violations: List[Dict], unknown_deprecated: List[Dict], sdk_lag: List[Dict]) -> Dict[str, Any]:
-    """Genera recomendaciones basadas en las violations encontradas."""
+def classify_violation(violation: Dict[str, Any], deprecation_index: Dict[str, Dict[str, Any]],
+                       timeline: Optional[DeprecationTimeline] = None,
+                       sdk_version: Optional[str] = None) -> str:
+    """
+    Clasifica una violation y la anota in place.
+    
+    Con ``timeline`` las violations de atributos deprecados se anotan además
+    con ``deprecation_timing`` frente a la versión de semconv de la propia
+    violation o, si no la declara, ``sdk_version``. Un atributo que el índice
+    no conoce pero que estaba deprecado en una versión anterior del modelo
+    cuenta como desfase conocido.
+    
+    Returns:
+        'known_sdk_lag', 'unknown_deprecated' o 'real'
+    """
+    attr_name = violation.get('attribute', '')
+    violation_type = violation.get('type', '')
+    
+    if violation_type != 'deprecated_attribute':
+        # Violation real que necesita atención
+        return 'real'
+    
+    deprecation = deprecation_index.get(attr_name)
+    if deprecation is None and timeline is not None:
+        deprecated = timeline.deprecation(attr_name)
+        if deprecated is not None:
+            deprecation = {
+                'replacement': extract_replacement(deprecated),
+                'reason': deprecated.get('reason'),
+                'since': None,
+            }
+    if timeline is not None:
+        timing, deprecated_in = timeline.timing(attr_name, violation_semconv_version(violation) or sdk_version)
+        violation['deprecation_timing'] = timing
+        if deprecation is not None and deprecated_in is not None:
+            deprecation = {**deprecation, 'since': deprecated_in}
+    
+    if deprecation is None:
+        # Deprecado pero no conocido - podría ser nuevo
+        violation['category'] = 'unknown_deprecated'
+        return 'unknown_deprecated'
+    
+    # Esta es una violation conocida del desfase del SDK
+    violation['category'] = 'known_sdk_lag'
+    violation['replacement'] = deprecation['replacement']
+    violation['deprecation_reason'] = deprecation['reason']
+    violation['deprecated_since'] = deprecation['since']
+    return 'known_sdk_lag'
+
+# Momento de la deprecación frente a la versión de semconv del SDK (ver deprecation_timeline.py)
+DEPRECATION_TIMINGS = ('after_sdk_version', 'before_sdk_version', 'unknown')
+
+@lru_cache(maxsize=None)
+def default_area_classifier(model_dir: str = DEFAULT_MODEL_DIR) -> AreaClassifier:
+    return AreaClassifier(load_area_index(model_dir))
+
+def classify_area(attr: str, area_classifier: Optional[AreaClassifier] = None) -> str:
+    """Área (directorio de model/) a la que pertenece un atributo, u ``other``."""
+    return (area_classifier or default_area_classifier()).area(attr)
+
+def build_summary(counts: Counter, timings: Optional[Counter] = None) -> Dict[str, Any]:
+    """Resumen a partir de los contadores por categoría y, si hay línea temporal, por momento de deprecación."""
+    summary = {
+        'total_violations': sum(counts.values()),
+        'real_issues': counts['real'],
+        'known_sdk_lag': counts['known_sdk_lag'],
+        'unknown_deprecated': counts['unknown_deprecated'],
+        'attention_needed': counts['real'] + counts['unknown_deprecated'],
+    }
+    if timings is not None:
+        summary['deprecation_timing'] = {timing: timings[timing] for timing in DEPRECATION_TIMINGS}
+    return summary
+
+def stream_filter_violations(input_stream: IO[str], output: IO[str],
+                             deprecation_index: Dict[str, Dict[str, Any]],
+                             include_original: bool = False,
+                             area_classifier: Optional[AreaClassifier] = None,
+                             timeline: Optional[DeprecationTimeline] = None,
+                             sdk_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Filtra violations de forma incremental escribiendo registros JSON-lines.
+    
+    Cada violation se escribe como ``{"record": "violation", ..., "category": ...}``
+    en cuanto se lee. Al final se escribe, si se pide, el resto del análisis
+    original (``{"record": "original_analysis", ...}``) y siempre un registro
+    ``{"record": "summary", ...}`` con los contadores acumulados.
+    
+    Returns:
+        Diccionario con ``summary`` y ``sdk_lag_areas`` (conteo por área)
+    """
+    area_classifier = area_classifier or default_area_classifier()
+    counts = Counter()
+    timings = Counter() if timeline is not None else None
+    areas = Counter()
+    original_members = {} if include_original else None
+    
+    for violation in iter_json_items(input_stream, key='violations', other_members=original_members):
+        if not isinstance(violation, dict):
+            raise ValueError("Each violation must be a JSON object")
+        category = classify_violation(violation, deprecation_index, timeline, sdk_version)
+        counts[category] += 1
+        if timings is not None and 'deprecation_timing' in violation:
+            timings[violation['deprecation_timing']] += 1
+        if category == 'known_sdk_lag':
+            areas[area_classifier.area(violation.get('attribute', ''))] += 1
+        record = {'record': 'violation', **violation, 'category': category}
+        output.write(json.dumps(record, separators=(',', ':')) + '\n')
+    
+    if include_original:
+        output.write(json.dumps({'record': 'original_analysis', 'analysis': original_members},
+                                separators=(',', ':')) + '\n')
+    
+    summary = build_summary(counts, timings)
+    output.write(json.dumps({'record': 'summary', 'summary': summary, 'sdk_lag_areas': dict(areas)},
+                            separators=(',', ':')) + '\n')
+    output.flush()
+    return {'summary': summary, 'sdk_lag_areas': dict(areas)}
+
+DEFAULT_MAX_SAMPLES = 3
+
+class ViolationAggregator:
+    """Agrupa violations en buckets por (categoría, tipo, atributo, nombre de span).
+
+    Con línea temporal, el momento de deprecación también forma parte de la
+    clave: el mismo atributo emitido por SDKs de distintas versiones puede ser
+    desfase esperado en unos y deuda en otros.
+    """
+
+    def __init__(self, deprecation_index: Dict[str, Dict[str, Any]],
+                 area_classifier: Optional[AreaClassifier] = None,
+                 max_samples: int = DEFAULT_MAX_SAMPLES,
+                 timeline: Optional[DeprecationTimeline] = None,
+                 sdk_version: Optional[str] = None):
+        self.deprecation_index = deprecation_index
+        self.area_classifier = area_classifier or default_area_classifier()
+        self.max_samples = max_samples
+        self.timeline = timeline
+        self.sdk_version = sdk_version
+        self.buckets = {}
+        self.counts = Counter()
+        self.timings = Counter() if timeline is not None else None
+        self.position = 0
+
+    def add(self, violation: Dict[str, Any]) -> None:
+        category = classify_violation(violation, self.deprecation_index, self.timeline, self.sdk_version)
+        attr_name = violation.get('attribute', '')
+        timing = violation.get('deprecation_timing')
+        key = (category, violation.get('type', ''), attr_name, violation.get('span_name'), timing)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {
+                'category': category,
+                'type': key[1],
+                'attribute': attr_name,
+                'span_name': key[3],
+                'area': self.area_classifier.area(attr_name),
+                'count': 0,
+                'first_seen': self.position,
+                'last_seen': self.position,
+                'samples': [],
+            }
+            if category == 'known_sdk_lag':
+                bucket['replacement'] = violation['replacement']
+                bucket['deprecated_since'] = violation['deprecated_since']
+            if timing is not None:
+                bucket['deprecation_timing'] = timing
+        bucket['count'] += 1
+        bucket['last_seen'] = self.position
+        if len(bucket['samples']) < self.max_samples:
+            bucket['samples'].append(violation)
+        self.counts[category] += 1
+        if timing is not None:
+            self.timings[timing] += 1
+        self.position += 1
+
+    def result(self, original_members: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Reporte con la misma estructura que el filtrado normal, sobre buckets."""
+        by_category = {'real': [], 'known_sdk_lag': [], 'unknown_deprecated': []}
+        for bucket in sorted(self.buckets.values(), key=lambda b: -b['count']):
+            by_category[bucket['category']].append(bucket)
+        summary = build_summary(self.counts, self.timings)
+        summary['distinct_problems'] = len(self.buckets)
+        aggregated = {
+            'aggregated_results': {
+                'real_violations': by_category['real'],
+                'sdk_lag_violations': by_category['known_sdk_lag'],
+                'unknown_deprecated': by_category['unknown_deprecated'],
+            },
+            'summary': summary,
+            'recommendations': generate_recommendations(by_category['real'], by_category['unknown_deprecated'],
+                                                        by_category['known_sdk_lag'], self.area_classifier,
+                                                        aggregated=True),
+        }
+        if original_members is not None:
+            aggregated = {'original_analysis': original_members, **aggregated}
+        return aggregated
+
+def aggregate_violations(input_stream: IO[str], deprecation_index: Dict[str, Dict[str, Any]],
+                         include_original: bool = False,
+                         area_classifier: Optional[AreaClassifier] = None,
+                         max_samples: int = DEFAULT_MAX_SAMPLES,
+                         timeline: Optional[DeprecationTimeline] = None,
+                         sdk_version: Optional[str] = None) -> Dict[str, Any]:
+    """Lee violations de forma incremental y devuelve el reporte agregado.
+
+    Con ``include_original`` se conserva el resto del análisis original, sin
+    el array de violations.
+    """
+    aggregator = ViolationAggregator(deprecation_index, area_classifier, max_samples, timeline, sdk_version)
+    original_members = {} if include_original else None
+    for violation in iter_json_items(input_stream, key='violations', other_members=original_members):
+        if not isinstance(violation, dict):
+            raise ValueError("Each violation must be a JSON object")
+        aggregator.add(violation)
+    return aggregator.result(original_members)
+
+def generate_recommendations(real_violations: List[Dict], unknown_deprecated: List[Dict], sdk_lag: List[Dict],
+                             area_classifier: Optional[AreaClassifier] = None,
+                             aggregated: bool = False) -> Dict[str, Any]:
+    """Genera recomendaciones basadas en las violations encontradas.
+
+    Con ``aggregated`` las listas son buckets de ``ViolationAggregator`` y los
+    conteos se suman desde ``count``.
+    """
+    area_classifier = area_classifier or default_area_classifier()
+    
+    def total(items: List[Dict]) -> int:
+        return sum(item['count'] for item in items) if aggregated else len(items)
     
     recommendations = {
         'immediate_action': [],
@@ -139,16 +331,16 @@ def generate_recommendations(real_violations: List[Dict], unknown_deprecated: Li
     if real_violations:
         recommendations['immediate_action'].append({
             'type': 'fix_violations',
-            'count': len(real_violations),
-            'message': f'Fix {len(real_violations)} real violations in your application code',
-            'violations': real_violations[:5]  # Mostrar solo las primeras 5
+            'count': total(real_violations),
+            'message': f'Fix {total(real_violations)} real violations in your application code',
+            'violations': real_violations[:5]  # Mostrar solo las primeras 5 (los buckets más frecuentes)
         })
     
     if unknown_deprecated:
         recommendations['monitor'].append({
             'type': 'check_new_deprecated',
-            'count': len(unknown_deprecated),
-            'message': f'Check {len(unknown_deprecated)} deprecated attributes not in known SDK lag list',
+            'count': total(unknown_deprecated),
+            'message': f'Check {total(unknown_deprecated)} deprecated attributes not in known SDK lag list',
             'violations': unknown_deprecated
         })
     
@@ -156,77 +348,150 @@ def generate_recommendations(real_violations: List[Dict], unknown_deprecated: Li
         # Agrupar por área
         areas = {}
         for violation in sdk_lag:
-            attr = violation['attribute']
-            if attr.startswith('db.'):
-                area = 'database'
-            elif attr.startswith('messaging.'):
-                area = 'messaging'
-            elif attr.startswith('deployment.'):
-                area = 'deployment'
-            elif attr.startswith('rpc.') or attr.startswith('message.'):
-                area = 'rpc'
-            else:
-                area = 'other'
-            
-            areas.setdefault(area, []).append(violation)
+            areas.setdefault(area_classifier.area(violation['attribute']), []).append(violation)
         
         recommendations['sdk_updates'] = [{
             'type': 'sdk_lag',
             'message': f'SDK lag detected in {len(areas)} areas: {", ".join(areas.keys())}',
             'areas': areas,
-            'total_count': len(sdk_lag)
+            'owners': {area: area_classifier.owners(area) for area in areas},
+            'total_count': total(sdk_lag)
         }]
     
     return recommendations
 
+def print_summary(summary: Dict[str, int], output_file: str, out: IO[str] = sys.stdout):
+    """Muestra el resumen en consola."""
+    print(f"\n🔍 ANÁLISIS DE VIOLATIONS FILTRADO", file=out)
+    print(f"{'='*50}", file=out)
+    print(f"📊 Total violations: {summary['total_violations']}", file=out)
+    print(f"🚨 Issues reales: {summary['real_issues']} (requieren atención inmediata)", file=out)
+    print(f"⏳ SDK lag conocido: {summary['known_sdk_lag']} (esperado)", file=out)
+    print(f"❓ Deprecados desconocidos: {summary['unknown_deprecated']} (revisar)", file=out)
+    if 'distinct_problems' in summary:
+        print(f"🔁 Problemas distintos: {summary['distinct_problems']}", file=out)
+    if 'deprecation_timing' in summary:
+        timing = summary['deprecation_timing']
+        print(f"🕒 Deprecados después del SDK: {timing['after_sdk_version']}, "
+              f"antes del SDK: {timing['before_sdk_version']}, sin versión: {timing['unknown']}", file=out)
+    print(f"\n💡 ATENCIÓN REQUERIDA: {summary['attention_needed']} violations", file=out)
+    
+    if summary['attention_needed'] == 0:
+        print(f"✅ ¡Excelente! Solo violations de SDK lag esperado.", file=out)
+    
+    print(f"\n📝 Resultados detallados guardados en: {output_file}", file=out)
+
 def main():
     """Función principal del filtro."""
-    if len(sys.argv) != 2:
-        print("Usage: python3 filter_sdk_lag.py <spans_analysis.json>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Filter known SDK lag violations from a spans analysis.")
+    parser.add_argument('input_file', help="spans_analysis.json ('-' for stdin in --stream/--aggregate mode)")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR,
+                        help="Semantic conventions model used to build the deprecation index (default: model/)")
+    parser.add_argument('--rebuild-index', action='store_true', help="Rebuild the cached deprecation index")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true',
+                      help="Read violations incrementally and write categorized JSON-lines records")
+    mode.add_argument('--aggregate', action='store_true',
+                      help="Collapse violations into (category, type, attribute, span name) buckets with counts")
+    parser.add_argument('--sdk-version',
+                        help="Semantic conventions version of the SDK, for violations that do not declare "
+                             "semconv_version or schema_url")
+    parser.add_argument('--snapshot', action='append', type=parse_snapshot, default=[],
+                        help="Earlier model version as VERSION=DIR (repeatable); enables the deprecation timeline")
+    parser.add_argument('--model-version', help="Version of --model-dir (default: the latest schema in schemas/)")
+    parser.add_argument('--max-samples', type=int, default=DEFAULT_MAX_SAMPLES,
+                        help=f"Sample violations kept per bucket with --aggregate (default: {DEFAULT_MAX_SAMPLES})")
+    parser.add_argument('--output', '-o',
+                        help="Output file ('-' for stdout). Default: <input>_filtered.json, or .jsonl with --stream")
+    parser.add_argument('--include-original', action=argparse.BooleanOptionalAction, default=None,
+                        help="Copy the original analysis into the output (default: yes, no with --stream/--aggregate; "
+                             "with --aggregate the violations array itself is never copied)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
     
-    input_file = sys.argv[1]
-    output_file = input_file.replace('.json', '_filtered.json')
+    profiler = profiler_from_args(args)
+    input_file = args.input_file
+    streaming = args.stream or args.aggregate
+    include_original = args.include_original if args.include_original is not None else not streaming
+    output_file = args.output
+    if output_file is None:
+        suffix = '_filtered.jsonl' if args.stream else '_filtered.json'
+        output_file = input_file.replace('.json', suffix) if input_file != '-' else '-'
     
     try:
-        with open(input_file, 'r') as f:
-            analysis_data = json.load(f)
+        with profiler.stage('load_index'):
+            deprecation_index = load_deprecation_index(args.model_dir, rebuild=args.rebuild_index)
+            area_classifier = AreaClassifier(load_area_index(args.model_dir, rebuild=args.rebuild_index))
+            timeline = None
+            if args.snapshot or args.sdk_version:
+                timeline = build_timeline(args.snapshot, args.model_dir, args.model_version)
         
-        filtered_results = filter_known_sdk_lag_violations(analysis_data)
+        if args.stream:
+            # El reporte va a stderr si los registros salen por stdout
+            report_out = sys.stderr if output_file == '-' else sys.stdout
+            with profiler.stage('filter_stream') as stage, open_capture(input_file) as input_stream:
+                if output_file == '-':
+                    result = stream_filter_violations(input_stream, sys.stdout, deprecation_index,
+                                                      include_original, area_classifier, timeline, args.sdk_version)
+                else:
+                    with open(output_file, 'w') as output:
+                        result = stream_filter_violations(input_stream, profiler.timed_writer('file_write', output),
+                                                          deprecation_index, include_original, area_classifier,
+                                                          timeline, args.sdk_version)
+                stage.items = result['summary']['total_violations']
+            
+            finish_profile(profiler, args, 'filter_sdk_lag')
+            print_summary(result['summary'], output_file, report_out)
+            if result['sdk_lag_areas']:
+                print(f"\n⏳ SDK LAG POR ÁREA:", file=report_out)
+                for area, count in sorted(result['sdk_lag_areas'].items(), key=lambda item: -item[1]):
+                    sigs = ', '.join(owner['sig'] for owner in area_classifier.owners(area))
+                    print(f"   - {area}: {count}" + (f" → {sigs}" if sigs else ''), file=report_out)
+            return
+        
+        if args.aggregate:
+            with profiler.stage('aggregate') as stage, open_capture(input_file) as input_stream:
+                filtered_results = aggregate_violations(input_stream, deprecation_index, include_original,
+                                                        area_classifier, args.max_samples, timeline,
+                                                        args.sdk_version)
+                stage.items = filtered_results['summary']['total_violations']
+        else:
+            with profiler.stage('read_json'), open(input_file, 'r') as f:
+                analysis_data = json.load(f)
+            
+            with profiler.stage('classify') as stage:
+                filtered_results = filter_known_sdk_lag_violations(analysis_data, deprecation_index,
+                                                                   include_original, area_classifier, timeline,
+                                                                   args.sdk_version)
+                stage.items = filtered_results['summary']['total_violations']
         
         # Guardar resultados filtrados
-        with open(output_file, 'w') as f:
-            json.dump(filtered_results, f, indent=2)
+        with profiler.stage('write_json'):
+            if output_file == '-':
+                json.dump(filtered_results, sys.stdout, indent=2)
+            else:
+                with open(output_file, 'w') as f:
+                    json.dump(filtered_results, profiler.timed_writer('file_write', f), indent=2)
+        finish_profile(profiler, args, 'filter_sdk_lag')
         
         # Mostrar resumen en consola
-        summary = filtered_results['summary']
-        print(f"\n🔍 ANÁLISIS DE VIOLATIONS FILTRADO")
-        print(f"{'='*50}")
-        print(f"📊 Total violations: {summary['total_violations']}")
-        print(f"🚨 Issues reales: {summary['real_issues']} (requieren atención inmediata)")
-        print(f"⏳ SDK lag conocido: {summary['known_sdk_lag']} (esperado)")
-        print(f"❓ Deprecados desconocidos: {summary['unknown_deprecated']} (revisar)")
-        print(f"\n💡 ATENCIÓN REQUERIDA: {summary['attention_needed']} violations")
-        
-        if summary['attention_needed'] == 0:
-            print(f"✅ ¡Excelente! Solo violations de SDK lag esperado.")
-        
-        print(f"\n📝 Resultados detallados guardados en: {output_file}")
+        report_out = sys.stderr if output_file == '-' else sys.stdout
+        print_summary(filtered_results['summary'], output_file, report_out)
         
         # Mostrar recommendations importantes
         recs = filtered_results['recommendations']
         if recs['immediate_action']:
-            print(f"\n🔴 ACCIÓN INMEDIATA:")
+            print(f"\n🔴 ACCIÓN INMEDIATA:", file=report_out)
             for rec in recs['immediate_action']:
-                print(f"   - {rec['message']}")
+                print(f"   - {rec['message']}", file=report_out)
         
         if recs['monitor']:
-            print(f"\n🟡 REVISAR:")
+            print(f"\n🟡 REVISAR:", file=report_out)
             for rec in recs['monitor']:
-                print(f"   - {rec['message']}")
+                print(f"   - {rec['message']}", file=report_out)
         
-    except FileNotFoundError:
-        print(f"Error: File {input_file} not found", file=sys.stderr)
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename or input_file} not found", file=sys.stderr)
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}", file=sys.stderr)
@@ -236,4 +501,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
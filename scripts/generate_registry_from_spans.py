@@ -4,15 +4,97 @@ Script para generar un registry de weaver desde spans OTLP capturados.
 
 Uso:
   python generate_registry_from_spans.py captured_spans.json output_registry.yaml
+  python generate_registry_from_spans.py capturas/ pod-*.json.gz output_registry.yaml --jobs 8
+
+La captura puede ser un array JSON de spans o JSON-lines (un span por línea),
+opcionalmente comprimida con gzip. Los spans se leen de forma incremental.
+Las capturas ``.pb``/``.binpb`` son ``ExportTraceServiceRequest`` de OTLP en
+binario con prefijo de longitud (por ejemplo, del file exporter del collector
+con ``format: proto``); se mapean en memoria y se decodifican sin pasar por
+JSON (ver otlp.py). Los almacenes ``.spanstore`` de capture_store.py se
+analizan directamente sobre sus columnas e índice.
+
+Con --compact cada atributo se resume con estructuras de tamaño fijo (muestra
+de ejemplos, HyperLogLog para la cardinalidad y contextos de span acotados),
+de modo que la memoria no crece con el volumen de tráfico.
+
+Con varias entradas (archivos o directorios) cada archivo se analiza en un
+proceso independiente y los resultados parciales se combinan antes de generar
+el registry.
+
+Con --state el análisis se acumula entre ejecuciones: las capturas nuevas se
+suman al estado guardado (las ya incorporadas se omiten) y el registry se
+regenera desde el estado combinado:
+  python generate_registry_from_spans.py hoy/*.jsonl.gz registry.yaml --compact --state perfil.state.gz
+
+El YAML se emite grupo a grupo con el ``CSafeDumper`` de libyaml si está
+disponible. Con --shard-by-namespace la salida es un directorio con un
+``<namespace>/registry.yaml`` (atributos) y ``<namespace>/spans.yaml`` (grupos
+de span) por namespace, como ``model/<área>/``, escritos en paralelo:
+  python generate_registry_from_spans.py captura.jsonl.gz registry/ --shard-by-namespace
+
+Con --sample-rate el análisis es muestreado: de cada patrón de span se
+analizan todos los spans hasta que la presencia de sus atributos principales
+queda decidida con el intervalo de confianza pedido, y después solo esa
+fracción. Cada atributo de los grupos de span lleva en ``note`` su proporción
+estimada e intervalo (ver span_sampling.py):
+  python generate_registry_from_spans.py enorme.jsonl.gz registry.yaml --sample-rate 0.01
+
+Los nombres de span se agrupan en plantillas (``GET /users/<*>``) con
+span_templates.py; --max-span-templates acota el número de grupos de span.
 """
 
+import argparse
 import json
+import os
+import re
 import yaml
 import sys
 from collections import defaultdict, Counter
-from typing import Dict, List, Set, Any
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Any
+
+from analysis_state import StateError, capture_fingerprint, load_state, save_state
+from attribute_sketches import (
+    DEFAULT_MAX_EXAMPLES,
+    DEFAULT_MAX_SPAN_CONTEXTS,
+    CappedSet,
+    ExampleReservoir,
+    HyperLogLog,
+    stable_hash,
+)
+from json_stream import iter_json_items, open_capture
+from otlp import PROTOBUF_EXTENSIONS, is_protobuf_capture, iter_protobuf_spans
+from span_sampling import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_MARGIN,
+    DEFAULT_MIN_SAMPLES,
+    SAMPLING_OPTIONS,
+    StratifiedSampler,
+    parse_confidence,
+    parse_rate,
+    presence_decision,
+    presence_note,
+    z_score,
+)
+from span_templates import DEFAULT_MAX_TEMPLATES, WILDCARD, SpanNameTemplater
+from stage_profiler import StageProfiler, add_profile_arguments, finish_profile, profiler_from_args
 
-def create_default_attribute_info():
+# Almacenes columnares de capturas (ver capture_store.py, que importa este módulo)
+STORE_EXTENSION = '.spanstore'
+
+def create_default_attribute_info(compact: bool = False,
+                                  max_examples: int = DEFAULT_MAX_EXAMPLES,
+                                  max_span_contexts: int = DEFAULT_MAX_SPAN_CONTEXTS):
+    if compact:
+        return {
+            'types': Counter(),
+            'examples': ExampleReservoir(max_examples),
+            'span_contexts': CappedSet(max_span_contexts),
+            'cardinality': HyperLogLog()
+        }
     return {
         'types': Counter(),
         'examples': set(),
@@ -20,59 +102,490 @@ def create_default_attribute_info():
     }
 
 def create_default_span_pattern():
+    # ``signatures`` cuenta spans por conjunto de claves de atributos
+    # (frozenset); los conteos por atributo y la co-ocurrencia se derivan de
+    # ahí al generar el registry
     return {
         'kinds': Counter(),
-        'attributes': Counter(),
+        'signatures': Counter(),
         'names': set()
     }
 
-def analyze_spans(spans_data: List[Dict]) -> Dict:
-    """Analiza spans para extraer información de atributos y patrones."""
-    
-    attributes_info = defaultdict(create_default_attribute_info)
-    span_patterns = defaultdict(create_default_span_pattern)
-    
-    for span in spans_data:
-        span_name = span.get('name', 'unknown')
-        span_kind = span.get('kind', 'INTERNAL')
-        attributes = span.get('attributes', {})
+def iter_spans(input_file: str) -> Iterator[Dict]:
+    """Lee spans uno a uno desde una captura (array JSON, JSON-lines u OTLP protobuf)."""
+    if is_protobuf_capture(input_file):
+        yield from iter_protobuf_spans(input_file)
+        return
+    if input_file.endswith(STORE_EXTENSION):
+        from capture_store import iter_store_spans
+        yield from iter_store_spans(input_file)
+        return
+    with open_capture(input_file) as f:
+        for span in iter_json_items(f):
+            if not isinstance(span, dict):
+                raise ValueError("Cada elemento de la captura debe ser un objeto span")
+            yield span
+
+def registry_type(value: Any) -> str:
+    """Tipo de registry de un valor de atributo (``string``, ``int``, ``string[]``...)."""
+    attr_type = type(value).__name__
+    if attr_type == 'str':
+        return 'string'
+    elif attr_type == 'int':
+        return 'int'
+    elif attr_type == 'float':
+        return 'double'
+    elif attr_type == 'bool':
+        return 'boolean'
+    elif attr_type in ('list', 'tuple'):
+        item_types = {registry_type(item) for item in value}
+        if len(item_types) == 1:
+            return f'{item_types.pop()}[]'
+        return 'string[]'
+    return attr_type
+
+# Tipo de Python → tipo de registry para valores escalares
+REGISTRY_TYPES = {str: 'string', int: 'int', float: 'double', bool: 'boolean'}
+
+DEFAULT_BATCH_SIZE = 4096
+# Órdenes de claves distintos que se recuerdan antes de vaciar el internado
+SIGNATURE_CACHE_SIZE = 100_000
+
+class SpanAnalyzer:
+    """Acumulador incremental del análisis de spans.
+
+    Permite alimentar spans a medida que llegan (por lote con ``add_spans`` o
+    de a uno con ``add_span``) y obtener el análisis en cualquier momento con
+    ``result()``.
+
+    Con ``batch_size > 0`` los spans se procesan por bloques: dentro de cada
+    bloque se agrupan por nombre y por conjunto de claves, se transponen a
+    columnas por atributo y tipos y ejemplos se resuelven por columna, en vez
+    de atributo por atributo. ``batch_size=0`` usa el recorrido span a span.
+
+    Los patrones de span se acumulan por id de plantilla (ver
+    ``SpanNameTemplater``) y se indexan por el texto de la plantilla en
+    ``result()``, ya que una plantilla puede generalizarse con spans posteriores.
+
+    Con ``sample_rate`` cada plantilla es un estrato de ``StratifiedSampler``:
+    solo se analiza una muestra de sus spans y el patrón guarda en
+    ``population`` cuántos spans tenía en total.
+    """
+
+    def __init__(self, compact: bool = False,
+                 max_examples: int = DEFAULT_MAX_EXAMPLES,
+                 max_span_contexts: int = DEFAULT_MAX_SPAN_CONTEXTS,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_span_templates: int = DEFAULT_MAX_TEMPLATES,
+                 sample_rate: Optional[float] = None,
+                 min_samples: int = DEFAULT_MIN_SAMPLES,
+                 confidence: float = DEFAULT_CONFIDENCE,
+                 margin: float = DEFAULT_MARGIN):
+        self.compact = compact
+        self.batch_size = batch_size
+        self.attributes_info = defaultdict(partial(create_default_attribute_info, compact,
+                                                   max_examples, max_span_contexts))
+        self.templater = SpanNameTemplater(max_span_templates)
+        self.span_patterns = defaultdict(create_default_span_pattern)
+        # Claves de atributos en el orden del span → conjunto internado
+        self.signatures: Dict[tuple, frozenset] = {}
+        self.span_count = 0
+        self.service_name = None
+        self.sampler = None
+        if sample_rate is not None:
+            self.sampler = StratifiedSampler(sample_rate, min_samples, confidence, margin)
+
+    def add_span(self, span: Dict) -> None:
+        self.add_spans((span,))
+
+    def add_spans(self, spans_data: Iterable[Dict]) -> None:
+        if self.batch_size <= 0:
+            self._add_spans_one_by_one(spans_data)
+            return
+        spans_iter = iter(spans_data)
+        while True:
+            chunk = list(islice(spans_iter, self.batch_size))
+            if not chunk:
+                return
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk: List[Dict]) -> None:
+        attributes_info = self.attributes_info
+        span_patterns = self.span_patterns
+        sampler = self.sampler
+        self.span_count += len(chunk)
+        if self.service_name is None:
+            self._find_service_name(chunk)
+        
+        by_name = defaultdict(list)
+        for span in chunk:
+            by_name[span.get('name', 'unknown')].append(span)
         
-        # Analizar atributos
-        for attr_name, attr_value in attributes.items():
-            attr_type = type(attr_value).__name__
-            if attr_type == 'str':
-                attr_type = 'string'
-            elif attr_type == 'int':
-                attr_type = 'int'
-            elif attr_type == 'float':
-                attr_type = 'double'
-            elif attr_type == 'bool':
-                attr_type = 'boolean'
+        # Columnas por atributo: lista de tuplas de valores y nombres de span
+        columns = defaultdict(list)
+        contexts = defaultdict(set)
+        template_ids = set()
+        for span_name, spans in by_name.items():
+            template_id = self.templater.assign(span_name)
+            pattern = span_patterns[template_id]
+            pattern['names'].add(span_name)
+            if sampler is not None:
+                template_ids.add(template_id)
+                spans = sampler.sample(template_id, spans)
+                if not spans:
+                    continue
+            pattern['kinds'].update([span.get('kind', 'INTERNAL') for span in spans])
             
-            attributes_info[attr_name]['types'][attr_type] += 1
-            attributes_info[attr_name]['examples'].add(str(attr_value))
-            attributes_info[attr_name]['span_contexts'].add(span_name)
+            # Spans con las mismas claves (en el mismo orden) se transponen juntos
+            rows_by_keys = defaultdict(list)
+            for span in spans:
+                attributes = span.get('attributes', {})
+                if attributes:
+                    rows_by_keys[tuple(attributes)].append(tuple(attributes.values()))
+            pattern_signatures = pattern['signatures']
+            for keys, rows in rows_by_keys.items():
+                pattern_signatures[self._signature(keys)] += len(rows)
+                for attr_name, column in zip(keys, zip(*rows)):
+                    columns[attr_name].append(column)
+                    contexts[attr_name].add(span_name)
         
-        # Analizar patrones de span
-        operation_key = extract_operation_key(span_name)
-        span_patterns[operation_key]['kinds'][span_kind] += 1
-        span_patterns[operation_key]['names'].add(span_name)
+        for attr_name, parts in columns.items():
+            attr_info = attributes_info[attr_name]
+            values = parts[0] if len(parts) == 1 else list(chain.from_iterable(parts))
+            type_counts = Counter(map(type, values))
+            types = attr_info['types']
+            for value_type, count in type_counts.items():
+                registry_type_name = REGISTRY_TYPES.get(value_type)
+                if registry_type_name is not None:
+                    types[registry_type_name] += count
+                else:
+                    types.update(registry_type(value) for value in values if type(value) is value_type)
+            
+            # Con un único tipo hashable los valores distintos se pueden deduplicar antes de str()
+            if len(type_counts) == 1 and next(iter(type_counts)) in REGISTRY_TYPES:
+                distinct = set(values)
+                examples = distinct if str in type_counts else set(map(str, distinct))
+            else:
+                examples = set(map(str, values))
+            if self.compact:
+                reservoir = attr_info['examples']
+                cardinality = attr_info['cardinality']
+                for example in examples:
+                    value_hash = stable_hash(example)
+                    reservoir.add(example, value_hash)
+                    cardinality.add(example, value_hash)
+            else:
+                attr_info['examples'].update(examples)
+            attr_info['span_contexts'].update(contexts[attr_name])
         
-        for attr_name in attributes.keys():
-            span_patterns[operation_key]['attributes'][attr_name] += 1
+        for template_id in template_ids:
+            self._check_stratum(template_id)
+
+    def _check_stratum(self, template_id: int) -> None:
+        """Con la muestra suficientemente crecida, revisa si el patrón ya puede muestrearse."""
+        if self.sampler.needs_check(template_id):
+            pattern = self.span_patterns[template_id]
+            self.sampler.update(template_id, pattern_attribute_counts(pattern), pattern_span_count(pattern))
+
+    def _signature(self, keys: tuple) -> frozenset:
+        signature = self.signatures.get(keys)
+        if signature is None:
+            if len(self.signatures) >= SIGNATURE_CACHE_SIZE:
+                self.signatures.clear()
+            signature = self.signatures[keys] = frozenset(keys)
+        return signature
+
+    def _find_service_name(self, spans: Iterable[Dict]) -> None:
+        for span in spans:
+            service_name = span.get('attributes', {}).get('service.name') or span.get('resource', {}).get('service.name')
+            if service_name:
+                self.service_name = str(service_name)
+                return
+
+    def _add_spans_one_by_one(self, spans_data: Iterable[Dict]) -> None:
+        attributes_info = self.attributes_info
+        span_patterns = self.span_patterns
+        compact = self.compact
+        sampler = self.sampler
+        
+        for span in spans_data:
+            span_name = span.get('name', 'unknown')
+            span_kind = span.get('kind', 'INTERNAL')
+            attributes = span.get('attributes', {})
+            self.span_count += 1
+            if self.service_name is None:
+                service_name = attributes.get('service.name') or span.get('resource', {}).get('service.name')
+                if service_name:
+                    self.service_name = str(service_name)
+            template_id = self.templater.assign(span_name)
+            if sampler is not None and not sampler.keep(template_id):
+                span_patterns[template_id]['names'].add(span_name)
+                continue
+            
+            # Analizar atributos
+            for attr_name, attr_value in attributes.items():
+                attr_info = attributes_info[attr_name]
+                attr_info['types'][registry_type(attr_value)] += 1
+                example = str(attr_value)
+                if compact:
+                    value_hash = stable_hash(example)
+                    attr_info['examples'].add(example, value_hash)
+                    attr_info['cardinality'].add(example, value_hash)
+                else:
+                    attr_info['examples'].add(example)
+                attr_info['span_contexts'].add(span_name)
+            
+            # Analizar patrones de span
+            pattern = span_patterns[template_id]
+            pattern['kinds'][span_kind] += 1
+            pattern['names'].add(span_name)
+            if attributes:
+                pattern['signatures'][self._signature(tuple(attributes))] += 1
+            if sampler is not None:
+                self._check_stratum(template_id)
+
+    def result(self) -> Dict:
+        span_patterns = {}
+        for template_id, pattern_info in self.span_patterns.items():
+            if self.sampler is not None:
+                pattern_info['population'] = self.sampler.population(template_id)
+            template = self.templater.template(template_id)
+            if template in span_patterns:
+                # Dos plantillas que terminaron generalizándose al mismo texto
+                span_patterns[template] = merge_span_patterns(
+                    merge_span_patterns(create_default_span_pattern(), span_patterns[template]), pattern_info)
+            else:
+                span_patterns[template] = pattern_info
+        analysis = {
+            'attributes': dict(self.attributes_info),
+            'span_patterns': span_patterns,
+            'span_count': self.span_count,
+            'service_name': self.service_name
+        }
+        if self.sampler is not None:
+            analysis['sampling'] = self.sampler.summary()
+        return analysis
+
+def analyze_spans(spans_data: Iterable[Dict], compact: bool = False,
+                  max_examples: int = DEFAULT_MAX_EXAMPLES,
+                  max_span_contexts: int = DEFAULT_MAX_SPAN_CONTEXTS,
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  max_span_templates: int = DEFAULT_MAX_TEMPLATES,
+                  sample_rate: Optional[float] = None,
+                  min_samples: int = DEFAULT_MIN_SAMPLES,
+                  confidence: float = DEFAULT_CONFIDENCE,
+                  margin: float = DEFAULT_MARGIN) -> Dict:
+    """Analiza spans para extraer información de atributos y patrones.
+
+    ``spans_data`` puede ser cualquier iterable (por ejemplo ``iter_spans``);
+    no se retiene ningún span una vez procesado. Con ``compact`` los ejemplos
+    y contextos de cada atributo se acotan y la cardinalidad se estima. Con
+    ``sample_rate`` solo se analiza una muestra estratificada por patrón (ver
+    span_sampling.py).
+    """
+    analyzer = SpanAnalyzer(compact, max_examples, max_span_contexts, batch_size, max_span_templates,
+                            sample_rate, min_samples, confidence, margin)
+    analyzer.add_spans(spans_data)
+    return analyzer.result()
+
+def analyze_file(input_file: str, profiler: Optional[StageProfiler] = None, **options) -> Dict:
+    """Analiza una captura completa; punto de entrada de los workers.
+
+    Con ``profiler`` la lectura y decodificación de spans se mide como etapa
+    ``read_spans`` aparte del análisis.
+    """
+    try:
+        if input_file.endswith(STORE_EXTENSION):
+            # Un almacén columnar se analiza sobre sus columnas, sin reconstruir spans;
+            # la pasada completa ya es barata, así que no se muestrea
+            from capture_store import analyze_store
+            return analyze_store(input_file, **{name: value for name, value in options.items()
+                                                if name not in SAMPLING_OPTIONS})
+        spans = iter_spans(input_file)
+        if profiler is not None:
+            spans = profiler.timed_iter('read_spans', spans)
+        return analyze_spans(spans, **options)
+    except (json.JSONDecodeError, ValueError) as e:
+        raise ValueError(f"{input_file}: {e}") from None
+
+def merge_analyses(target: Dict, other: Dict) -> Dict:
+    """Combina el análisis parcial ``other`` dentro de ``target``."""
+    for attr_name, attr_info in other['attributes'].items():
+        current = target['attributes'].get(attr_name)
+        if current is None:
+            target['attributes'][attr_name] = attr_info
+            continue
+        current['types'].update(attr_info['types'])
+        for key in ('examples', 'span_contexts', 'cardinality'):
+            if key not in current:
+                continue
+            if hasattr(current[key], 'merge'):
+                current[key].merge(attr_info[key])
+            else:
+                current[key].update(attr_info[key])
     
-    return {
-        'attributes': dict(attributes_info),
-        'span_patterns': dict(span_patterns)
-    }
+    for template, pattern_info in other['span_patterns'].items():
+        current = target['span_patterns'].get(template)
+        if current is None:
+            target['span_patterns'][template] = pattern_info
+        else:
+            merge_span_patterns(current, pattern_info)
+    
+    target['span_count'] += other['span_count']
+    if target['service_name'] is None:
+        target['service_name'] = other['service_name']
+    if 'sampling' in other:
+        if 'sampling' in target:
+            target['sampling']['sampled_spans'] += other['sampling']['sampled_spans']
+        else:
+            target['sampling'] = dict(other['sampling'])
+    return target
+
+def merge_span_patterns(target: Dict, other: Dict) -> Dict:
+    if 'population' in target or 'population' in other:
+        target['population'] = pattern_population(target) + pattern_population(other)
+    target['kinds'].update(other['kinds'])
+    target['signatures'].update(other['signatures'])
+    target['names'].update(other['names'])
+    return target
+
+def regroup_span_patterns(span_patterns: Dict[str, Dict],
+                          max_span_templates: int = DEFAULT_MAX_TEMPLATES) -> Dict[str, Dict]:
+    """Vuelve a agrupar plantillas de distintos análisis parciales.
+
+    Cada worker generaliza solo con los nombres que vio, así que la misma
+    operación puede llegar como ``GET /users/<*>`` y ``GET /users/me``. Las
+    plantillas con más comodines se asignan primero, de modo que las concretas
+    caen en una general que ya las cubre; el resultado conserva el orden de
+    aparición.
+    """
+    templater = SpanNameTemplater(max_span_templates)
+    grouped = defaultdict(create_default_span_pattern)
+    first_seen = {}
+    ordered = sorted(enumerate(span_patterns.items()), key=lambda item: -item[1][0].count(WILDCARD))
+    for position, (template, pattern_info) in ordered:
+        template_id = templater.assign_covered(template)
+        merge_span_patterns(grouped[template_id], pattern_info)
+        first_seen[template_id] = min(position, first_seen.get(template_id, position))
+    return {templater.template(template_id): grouped[template_id]
+            for template_id in sorted(grouped, key=first_seen.get)}
+
+def expand_inputs(paths: List[str]) -> List[str]:
+    """Expande directorios a las capturas que contienen, en orden estable."""
+    extensions = ('.json', '.jsonl', '.ndjson', '.gz', STORE_EXTENSION) + PROTOBUF_EXTENSIONS
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(extensions))
+        else:
+            files.append(path)
+    return files
+
+def analyze_inputs(input_files: List[str], jobs: int = 1, profiler: Optional[StageProfiler] = None,
+                   **options) -> Dict:
+    """Analiza varias capturas, en paralelo si ``jobs > 1``, y combina los resultados.
+
+    ``profiler`` solo desglosa la lectura cuando el análisis es en este proceso.
+    """
+    if len(input_files) == 1:
+        return analyze_file(input_files[0], profiler, **options)
+    max_span_templates = options.get('max_span_templates', DEFAULT_MAX_TEMPLATES)
+    if jobs <= 1:
+        partials = (analyze_file(path, profiler, **options) for path in input_files)
+        return reduce_analyses(partials, max_span_templates)
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, len(input_files))) as executor:
+        partials = executor.map(partial(analyze_file, **options), input_files)
+        return reduce_analyses(partials, max_span_templates)
+
+def accumulate_inputs(state_file: str, input_files: List[str], jobs: int = 1,
+                      profiler: Optional[StageProfiler] = None, **options) -> Tuple[Dict, List[str]]:
+    """Suma al estado de ``state_file`` las capturas aún no incorporadas y lo guarda.
+
+    Devuelve el análisis combinado y la lista de capturas analizadas en esta
+    ejecución.
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    with profiler.stage('load_state'):
+        state = load_state(state_file, options)
+    pending = []
+    fingerprints = {}
+    for path in input_files:
+        fingerprint = capture_fingerprint(path)
+        if fingerprint is None or fingerprint not in state['captures']:
+            pending.append(path)
+            fingerprints[path] = fingerprint
+
+    if pending:
+        new_analysis = analyze_inputs(pending, jobs=jobs, profiler=profiler, **options)
+        partials = [new_analysis] if state['analysis'] is None else [state['analysis'], new_analysis]
+        state['analysis'] = reduce_analyses(partials, options.get('max_span_templates', DEFAULT_MAX_TEMPLATES))
+        state['captures'].update((fingerprint, path) for path, fingerprint in fingerprints.items()
+                                 if fingerprint is not None)
+        with profiler.stage('save_state'):
+            save_state(state_file, state)
+    elif state['analysis'] is None:
+        state['analysis'] = reduce_analyses([])
+    return state['analysis'], pending
+
+def reduce_analyses(partials: Iterable[Dict], max_span_templates: int = DEFAULT_MAX_TEMPLATES) -> Dict:
+    analysis = {'attributes': {}, 'span_patterns': {}, 'span_count': 0, 'service_name': None}
+    for partial_analysis in partials:
+        merge_analyses(analysis, partial_analysis)
+    analysis['span_patterns'] = regroup_span_patterns(analysis['span_patterns'], max_span_templates)
+    return analysis
+
+def pattern_span_count(pattern_info: Dict) -> int:
+    return sum(pattern_info['kinds'].values())
+
+def pattern_population(pattern_info: Dict) -> int:
+    """Spans del patrón en la captura, analizados o no (con muestreo, más que ``pattern_span_count``)."""
+    return pattern_info.get('population', pattern_span_count(pattern_info))
 
-def extract_operation_key(span_name: str) -> str:
-    """Extrae clave de operación del nombre del span."""
-    # Lógica simple - podrías mejorar esto según tus patrones
-    parts = span_name.split('.')
-    if len(parts) > 1:
-        return '.'.join(parts[:-1])  # Todo excepto la última parte
-    return span_name.lower().replace(' ', '_')
+def pattern_attribute_counts(pattern_info: Dict) -> Counter:
+    """Spans del patrón en los que aparece cada atributo."""
+    counts = Counter()
+    for signature, count in pattern_info['signatures'].items():
+        for attr_name in signature:
+            counts[attr_name] += count
+    return counts
+
+def attribute_cooccurrence(pattern_info: Dict, attr_names: Optional[Iterable[str]] = None) -> Dict[str, Counter]:
+    """``cooccurrence[a][b]``: spans del patrón que llevan a la vez ``a`` y ``b``.
+
+    Con ``attr_names`` solo se calculan las filas de esos atributos.
+    """
+    cooccurrence = defaultdict(Counter)
+    selected = None if attr_names is None else frozenset(attr_names)
+    for signature, count in pattern_info['signatures'].items():
+        for attr_name in (signature if selected is None else signature & selected):
+            row = cooccurrence[attr_name]
+            for other_name in signature:
+                if other_name != attr_name:
+                    row[other_name] += count
+    return cooccurrence
+
+def infer_requirement_level(attr_name: str, counts: Counter, cooccurrence: Dict[str, Counter],
+                            span_count: int) -> Any:
+    """``required`` si aparece en al menos el 80% de los spans del patrón;
+    ``conditionally_required`` si solo aparece junto a otro atributo opcional
+    y casi siempre que este está presente; si no, ``recommended``."""
+    count = counts[attr_name]
+    if count >= span_count * 0.8:
+        return 'required'
+    for other_name, together in cooccurrence[attr_name].most_common():
+        if together < count:
+            break
+        if counts[other_name] < span_count * 0.8 and count >= counts[other_name] * 0.8:
+            return {'conditionally_required': f'Cuando `{other_name}` está presente.'}
+    return 'recommended'
+
+def operation_id(template: str) -> str:
+    """Identificador de grupo a partir de una plantilla (``GET /users/<*>`` → ``get_users``)."""
+    operation = re.sub(r'[^a-z0-9_.]+', '_', template.replace(WILDCARD, '').lower())
+    return re.sub(r'_{2,}', '_', operation).strip('_.') or 'unknown'
 
 def infer_attribute_type(type_counter: Counter) -> str:
     """Infiere el tipo más común de un atributo."""
@@ -80,96 +593,277 @@ def infer_attribute_type(type_counter: Counter) -> str:
         return 'string'
     return type_counter.most_common(1)[0][0]
 
-def generate_registry(analysis: Dict, app_name: str) -> Dict:
-    """Genera estructura de registry YAML."""
-    
-    registry = {
-        'groups': []
-    }
-    
-    # 1. Generar attribute groups
-    attribute_group = {
-        'id': f'registry.{app_name}.attributes',
-        'type': 'attribute_group',
-        'brief': f'Atributos comunes de {app_name}',
-        'attributes': []
+def estimate_cardinality(attr_info: Dict) -> int:
+    """Número (estimado en modo compacto) de valores distintos de un atributo."""
+    if 'cardinality' in attr_info:
+        return attr_info['cardinality'].estimate()
+    return len(attr_info['examples'])
+
+# Emisor de YAML: CSafeDumper (libyaml) si PyYAML tiene las extensiones de C,
+# igual que el Loader de semconv_model.py
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+def attribute_definition(attr_name: str, attr_info: Dict) -> Dict:
+    return {
+        'name': attr_name,
+        'type': infer_attribute_type(attr_info['types']),
+        'brief': f'Atributo {attr_name}',
+        'examples': list(islice(attr_info['examples'], 3)),  # Máximo 3 ejemplos
+        'note': f'Cardinalidad estimada: {estimate_cardinality(attr_info)} valores distintos.',
+        'requirement_level': 'recommended',
+        'stability': 'development'
     }
-    
-    for attr_name, attr_info in analysis['attributes'].items():
-        attr_type = infer_attribute_type(attr_info['types'])
-        examples = list(attr_info['examples'])[:3]  # Máximo 3 ejemplos
-        
-        attribute = {
-            'name': attr_name,
-            'type': attr_type,
-            'brief': f'Atributo {attr_name}',
-            'examples': examples,
-            'requirement_level': 'recommended',
-            'stability': 'development'
-        }
-        
-        attribute_group['attributes'].append(attribute)
-    
-    registry['groups'].append(attribute_group)
-    
-    # 2. Generar span groups
-    for operation_key, pattern_info in analysis['span_patterns'].items():
+
+def iter_span_groups(analysis: Dict, app_name: str) -> Iterator[Dict]:
+    """Grupos de span, uno por plantilla, generados a medida que se consumen.
+
+    Si el análisis es muestreado, cada atributo lleva en ``note`` la base
+    estadística de su ``requirement_level``.
+    """
+    sampling = analysis.get('sampling')
+    used_ids = set()
+    suffixes = Counter()
+    for template, pattern_info in analysis['span_patterns'].items():
         most_common_kind = pattern_info['kinds'].most_common(1)[0][0].lower()
+        base_key = operation_key = operation_id(template)
+        # El sufijo puede coincidir con el id de otra plantilla (``get_users_2``)
+        while operation_key in used_ids:
+            suffixes[base_key] += 1
+            operation_key = f'{base_key}_{suffixes[base_key] + 1}'
+        used_ids.add(operation_key)
         
         span_group = {
             'id': f'span.{app_name}.{operation_key}',
             'type': 'span',
             'span_kind': most_common_kind,
-            'brief': f'Span para operación {operation_key}',
+            'brief': f'Span para operación {template}',
             'attributes': []
         }
         
         # Agregar atributos más comunes para este span
-        for attr_name, count in pattern_info['attributes'].most_common(10):
-            requirement = 'required' if count > len(pattern_info['names']) * 0.8 else 'recommended'
-            span_group['attributes'].append({
+        counts = pattern_attribute_counts(pattern_info)
+        span_count = pattern_span_count(pattern_info)
+        top_attributes = counts.most_common(10)
+        # La co-ocurrencia solo hace falta para los atributos que no son required
+        cooccurrence = attribute_cooccurrence(pattern_info, [attr_name for attr_name, count in top_attributes
+                                                             if count < span_count * 0.8])
+        for attr_name, _ in top_attributes:
+            attribute_ref = {
                 'ref': attr_name,
-                'requirement_level': requirement
-            })
+                'requirement_level': infer_requirement_level(attr_name, counts, cooccurrence, span_count)
+            }
+            if sampling is not None:
+                attribute_ref['note'] = presence_note(counts[attr_name], span_count,
+                                                      pattern_population(pattern_info), sampling)
+            span_group['attributes'].append(attribute_ref)
         
-        registry['groups'].append(span_group)
-    
-    return registry
+        yield span_group
+
+def iter_registry_groups(analysis: Dict, app_name: str) -> Iterator[Dict]:
+    """Grupos del registry: primero el attribute group y después los grupos de span."""
+    yield {
+        'id': f'registry.{app_name}.attributes',
+        'type': 'attribute_group',
+        'brief': f'Atributos comunes de {app_name}',
+        'attributes': [attribute_definition(attr_name, attr_info)
+                       for attr_name, attr_info in analysis['attributes'].items()]
+    }
+    yield from iter_span_groups(analysis, app_name)
+
+def undecided_attributes(analysis: Dict) -> List[Tuple[str, str]]:
+    """``(plantilla, atributo)`` cuyo intervalo de presencia aún contiene el umbral de ``required``."""
+    sampling = analysis.get('sampling')
+    if sampling is None:
+        return []
+    z = z_score(sampling['confidence'])
+    undecided = []
+    for template, pattern_info in analysis['span_patterns'].items():
+        span_count = pattern_span_count(pattern_info)
+        if span_count >= pattern_population(pattern_info):
+            continue
+        for attr_name, count in pattern_attribute_counts(pattern_info).most_common(10):
+            if presence_decision(count, span_count, z, sampling['margin']) is None:
+                undecided.append((template, attr_name))
+    return undecided
+
+def generate_registry(analysis: Dict, app_name: str) -> Dict:
+    """Genera estructura de registry YAML."""
+    return {'groups': list(iter_registry_groups(analysis, app_name))}
+
+def attribute_namespace(attr_name: str) -> str:
+    """Primer segmento del nombre (``http.request.method`` → ``http``), apto como directorio."""
+    namespace = re.sub(r'[^A-Za-z0-9_-]+', '_', attr_name.split('.', 1)[0]).strip('_')
+    return namespace or 'other'
+
+def shard_registry(analysis: Dict, app_name: str) -> Dict[str, List[Dict]]:
+    """Reparte el registry por namespace, como ``model/<área>/``.
+
+    Cada namespace tiene ``<namespace>/registry.yaml`` con su attribute group
+    y ``<namespace>/spans.yaml`` con los grupos de span cuyos atributos
+    pertenecen mayoritariamente a ese namespace.
+    """
+    attributes = defaultdict(list)
+    for attr_name, attr_info in analysis['attributes'].items():
+        attributes[attribute_namespace(attr_name)].append(attribute_definition(attr_name, attr_info))
+    shards = {}
+    for namespace, definitions in attributes.items():
+        shards[f'{namespace}/registry.yaml'] = [{
+            'id': f'registry.{app_name}.{namespace}',
+            'type': 'attribute_group',
+            'brief': f'Atributos {namespace} de {app_name}',
+            'attributes': definitions
+        }]
+    for span_group in iter_span_groups(analysis, app_name):
+        namespaces = Counter(attribute_namespace(attribute['ref']) for attribute in span_group['attributes'])
+        namespace = namespaces.most_common(1)[0][0] if namespaces else 'other'
+        shards.setdefault(f'{namespace}/spans.yaml', []).append(span_group)
+    return shards
+
+def dump_groups(groups: Iterable[Dict], f) -> None:
+    """Escribe ``groups:`` grupo a grupo, sin construir el documento completo."""
+    f.write('groups:\n')
+    for group in groups:
+        yaml.dump([group], f, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+
+def write_groups_file(output_file: str, groups: Iterable[Dict], profiler: Optional[StageProfiler] = None) -> str:
+    """Escribe los grupos en ``output_file``.
+
+    Con ``profiler`` la generación de los grupos y las escrituras al archivo
+    se miden como etapas ``generate_registry`` y ``file_write``; el resto del
+    tiempo de la etapa en curso es el volcado YAML.
+    """
+    with open(output_file, 'w') as f:
+        if profiler is not None:
+            groups = profiler.timed_iter('generate_registry', groups)
+            f = profiler.timed_writer('file_write', f)
+        dump_groups(groups, f)
+    return output_file
+
+def infer_app_name(analysis: Dict) -> str:
+    """Nombre de app desde el primer span con service.name, o ``myapp``."""
+    if analysis['service_name']:
+        return analysis['service_name'].lower()
+    return 'myapp'
+
+def write_registry_file(analysis: Dict, output_file: str, app_name: str = None,
+                        profiler: Optional[StageProfiler] = None) -> str:
+    """Genera el registry del análisis y lo escribe como YAML. Devuelve el nombre de app."""
+    app_name = app_name or infer_app_name(analysis)
+    write_groups_file(output_file, iter_registry_groups(analysis, app_name), profiler)
+    return app_name
+
+def write_registry_shards(analysis: Dict, output_dir: str, app_name: str = None, jobs: int = 1) -> List[str]:
+    """Escribe el registry repartido por namespace en ``output_dir``, en paralelo si ``jobs > 1``.
+
+    Devuelve las rutas escritas.
+    """
+    shards = shard_registry(analysis, app_name or infer_app_name(analysis))
+    paths = [os.path.join(output_dir, relative_path) for relative_path in shards]
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if jobs <= 1 or len(shards) == 1:
+        return [write_groups_file(path, groups) for path, groups in zip(paths, shards.values())]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(shards))) as executor:
+        return list(executor.map(write_groups_file, paths, shards.values()))
 
 def main():
-    if len(sys.argv) != 3:
-        print("Uso: python generate_registry_from_spans.py <input.json> <output.yaml>")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    
-    # Cargar datos de spans
-    with open(input_file, 'r') as f:
-        spans_data = json.load(f)
+    parser = argparse.ArgumentParser(description="Genera un registry de weaver desde spans capturados.")
+    parser.add_argument('inputs', nargs='+',
+                        help="Capturas de spans o directorios (JSON, JSON-lines u OTLP protobuf .pb/.binpb, "
+                             "opcionalmente .gz; '-' para stdin)")
+    parser.add_argument('output_file', help="Archivo YAML de salida (directorio con --shard-by-namespace)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Spans por bloque en el análisis por columnas; 0 analiza span a span (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Procesos para analizar varias capturas en paralelo (default: número de CPUs)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Resumen de atributos con memoria acotada (muestra de ejemplos y cardinalidad estimada)")
+    parser.add_argument('--max-examples', type=int, default=DEFAULT_MAX_EXAMPLES,
+                        help=f"Ejemplos conservados por atributo en modo compacto (default: {DEFAULT_MAX_EXAMPLES})")
+    parser.add_argument('--max-span-contexts', type=int, default=DEFAULT_MAX_SPAN_CONTEXTS,
+                        help=f"Nombres de span conservados por atributo en modo compacto (default: {DEFAULT_MAX_SPAN_CONTEXTS})")
+    parser.add_argument('--max-span-templates', type=int, default=DEFAULT_MAX_TEMPLATES,
+                        help=f"Máximo de plantillas de nombre de span, es decir, de grupos de span, "
+                             f"incluida la de desbordamiento (default: {DEFAULT_MAX_TEMPLATES})")
+    parser.add_argument('--shard-by-namespace', action='store_true',
+                        help="Escribe un registry.yaml/spans.yaml por namespace en el directorio de salida, en paralelo")
+    parser.add_argument('--state',
+                        help="Estado persistente (.gz) donde acumular el análisis entre ejecuciones")
+    parser.add_argument('--sample-rate', type=parse_rate,
+                        help="Analiza solo esta fracción de los spans de cada patrón una vez decidido su "
+                             "requirement_level (muestreo estratificado; default: todos los spans)")
+    parser.add_argument('--sample-min', type=int, default=DEFAULT_MIN_SAMPLES,
+                        help=f"Spans por patrón analizados siempre antes de muestrear (default: {DEFAULT_MIN_SAMPLES})")
+    parser.add_argument('--confidence', type=parse_confidence, default=DEFAULT_CONFIDENCE,
+                        help=f"Nivel de confianza de los intervalos de presencia (default: {DEFAULT_CONFIDENCE})")
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN,
+                        help="Semiamplitud del intervalo con la que se decide aunque contenga el umbral del 80%% "
+                             f"(default: {DEFAULT_MARGIN})")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.max_span_templates < 2:
+        parser.error("--max-span-templates debe ser al menos 2 (incluye la plantilla de desbordamiento)")
     
-    if not isinstance(spans_data, list):
-        print("Error: El archivo JSON debe contener una lista de spans")
+    profiler = profiler_from_args(args)
+    input_files = expand_inputs(args.inputs)
+    output_file = args.output_file
+    if not input_files:
+        print("Error: No se encontraron capturas de spans en las entradas indicadas")
         sys.exit(1)
     
-    # Inferir nombre de app desde el primer span o usar default
-    app_name = 'myapp'
-    if spans_data and 'service.name' in spans_data[0].get('attributes', {}):
-        app_name = spans_data[0]['attributes']['service.name'].lower()
-    
-    # Analizar spans
-    analysis = analyze_spans(spans_data)
-    
-    # Generar registry
-    registry = generate_registry(analysis, app_name)
-    
-    # Guardar resultado
-    with open(output_file, 'w') as f:
-        yaml.dump(registry, f, default_flow_style=False, sort_keys=False)
+    options = dict(compact=args.compact, max_examples=args.max_examples,
+                   max_span_contexts=args.max_span_contexts, batch_size=args.batch_size,
+                   max_span_templates=args.max_span_templates)
+    if args.sample_rate is not None:
+        options.update(sample_rate=args.sample_rate, min_samples=args.sample_min,
+                       confidence=args.confidence, margin=args.margin)
+    # Analizar spans a medida que se leen
+    try:
+        with profiler.stage('analyze') as stage:
+            if args.state:
+                analysis, analyzed_files = accumulate_inputs(args.state, input_files, jobs=args.jobs,
+                                                             profiler=profiler, **options)
+            else:
+                analysis = analyze_inputs(input_files, jobs=args.jobs, profiler=profiler, **options)
+                analyzed_files = input_files
+            stage.items = analysis['span_count']
+    except FileNotFoundError as e:
+        print(f"Error: No se puede encontrar el archivo {e.filename}")
+        sys.exit(1)
+    except StateError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: Captura de spans no válida: {e}")
+        sys.exit(1)
     
-    print(f"Registry generado en {output_file}")
+    with profiler.stage('write_registry') as stage:
+        stage.items = len(analysis['attributes']) + len(analysis['span_patterns'])
+        if args.shard_by_namespace:
+            written = write_registry_shards(analysis, output_file, jobs=args.jobs)
+        else:
+            write_registry_file(analysis, output_file, profiler=profiler)
+    if args.shard_by_namespace:
+        print(f"Registry generado en {output_file} ({len(written)} archivos)")
+    else:
+        print(f"Registry generado en {output_file}")
+    print(f"Capturas analizadas: {len(analyzed_files)}")
+    if args.state:
+        print(f"Capturas ya incorporadas al estado: {len(input_files) - len(analyzed_files)}")
+    print(f"Spans analizados: {analysis['span_count']}")
+    if 'sampling' in analysis:
+        sampling = analysis['sampling']
+        sampled = sampling['sampled_spans']
+        print(f"Spans muestreados: {sampled} ({sampled / max(analysis['span_count'], 1):.1%}, "
+              f"tasa {sampling['rate']}, IC {sampling['confidence']:.0%})")
+        undecided = undecided_attributes(analysis)
+        if undecided:
+            print(f"Atributos sin decidir (ver note en el registry): {len(undecided)}")
+            for template, attr_name in undecided[:10]:
+                print(f"  - {template}: {attr_name}")
     print(f"Atributos únicos encontrados: {len(analysis['attributes'])}")
     print(f"Patrones de span encontrados: {len(analysis['span_patterns'])}")
+    finish_profile(profiler, args, 'generate_registry_from_spans')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Validación incremental del modelo: solo los grupos afectados por los YAML
+cambiados.
+
+Por cada archivo del modelo se extrae un resumen de sus grupos (atributos que
+definen y dependencias: ``extends``, ``ref`` de atributos, ``renamed_to``,
+``entity_associations`` y ``events``) y con ellos un grafo de dependencias
+entre grupos. Los resúmenes se cachean por sha256, así que solo se reparsean
+los archivos que cambiaron.
+
+Los archivos cambiados salen de ``git diff`` contra una referencia
+(``--since``), de una lista explícita (``--files``) o, por defecto, de
+comparar los sha256 actuales con los de la última validación correcta. Los
+grupos de esos archivos (en su versión anterior y en la actual) más todos los
+que dependen de ellos transitivamente forman el conjunto afectado, y sobre él
+se ejecutan:
+
+- comprobaciones estructurales: referencias, ``extends``, entidades y eventos
+  sin resolver, ciclos de ``extends``, grupos duplicados y atributos definidos
+  más de una vez;
+- las políticas ``before_resolution`` y ``after_resolution`` de ``policies/``
+  con ``opa`` (si está instalado). La resolución previa a ``after_resolution``
+  es aproximada (``ref`` y ``extends`` fusionados como hace weaver); los grupos
+  del registry, entidades, métricas y eventos se añaden como contexto para las
+  políticas globales, y solo se informan violaciones de grupos afectados. Las
+  políticas ``comparison_after_resolution`` necesitan el registry base y
+  siguen en ``make check-policies``.
+
+Si cambia la estructura del grafo (grupos añadidos, eliminados o movidos de
+archivo, o la jerarquía de ``extends``), cambian las políticas o no hay
+validación previa, se valida el modelo completo. El estado se guarda en
+``.cache/semconv`` y solo se da por validado tras una ejecución sin errores.
+
+Uso:
+  python incremental_model_check.py [--since origin/main] [--files a.yaml ...]
+                                    [--full] [--no-policies] [--list]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import yaml
+
+from semconv_model import (DEFAULT_CACHE_DIR, DEFAULT_MODEL_DIR, REPO_ROOT, Loader, iter_files,
+                           load_registry, load_yaml)
+
+DEFAULT_POLICIES_DIR = os.path.join(REPO_ROOT, 'policies')
+
+STATE_FORMAT_VERSION = 1
+
+# Campos de los grupos de contexto que usan las políticas globales de after_resolution
+CONTEXT_GROUP_KEYS = ('id', 'type', 'name', 'metric_name', 'deprecated', 'stability')
+CONTEXT_ATTRIBUTE_KEYS = ('name', 'type', 'deprecated', 'annotations', 'stability')
+
+
+def state_path(model_dir: str, cache_dir: str) -> str:
+    key = hashlib.sha256(os.path.abspath(model_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f'model-check-{key}.pickle')
+
+
+def policies_hash(policies_dir: str) -> str:
+    digest = hashlib.sha256()
+    if os.path.isdir(policies_dir):
+        for path in iter_files(policies_dir, '.rego'):
+            digest.update(os.path.relpath(path, policies_dir).encode())
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def renamed_to(deprecated: Any) -> Optional[str]:
+    """Destino de una deprecación por renombrado (weaver ignora ``renamed_to`` en el resto)."""
+    if isinstance(deprecated, dict) and deprecated.get('reason') == 'renamed' \
+            and isinstance(deprecated.get('renamed_to'), str):
+        return deprecated['renamed_to']
+    return None
+
+
+def summarize_document(document: Any) -> List[Dict[str, Any]]:
+    """Resumen de los grupos de un archivo: qué definen y de qué dependen."""
+    summaries = []
+    for group in (document or {}).get('groups') or []:
+        if not isinstance(group, dict) or not group.get('id'):
+            continue
+        defines = []
+        deps = []
+        if group.get('extends'):
+            deps.append(('group', group['extends']))
+        for attribute in group.get('attributes') or []:
+            if attribute.get('id'):
+                defines.append(attribute['id'])
+                target = renamed_to(attribute.get('deprecated'))
+                if target:
+                    deps.append(('renamed_attr', target))
+            elif attribute.get('ref'):
+                deps.append(('attr', attribute['ref']))
+        for entity in group.get('entity_associations') or []:
+            deps.append(('entity', entity))
+        for event in group.get('events') or []:
+            deps.append(('event', event))
+        target = renamed_to(group.get('deprecated'))
+        if target:
+            deps.append(('renamed', target))
+        summaries.append({
+            'id': group['id'],
+            'type': group.get('type'),
+            'name': group.get('name'),
+            'metric_name': group.get('metric_name'),
+            'defines': defines,
+            'deps': deps,
+        })
+    return summaries
+
+
+class ModelGraph:
+    """Grafo de dependencias entre grupos a partir de los resúmenes por archivo.
+
+    Las dependencias que no se resuelven apuntan a nodos ``missing:<tipo>:<nombre>``
+    para que los grupos que las usan se vuelvan a validar cuando aparezcan.
+    """
+
+    def __init__(self, files: Dict[str, List[Dict[str, Any]]]):
+        self.files = files
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.group_files: Dict[str, List[str]] = defaultdict(list)
+        self.attribute_owners: Dict[str, List[str]] = defaultdict(list)
+        self.names: Dict[str, Dict[str, str]] = defaultdict(dict)
+        for rel_path in sorted(files):
+            for group in files[rel_path]:
+                self.groups[group['id']] = group
+                self.group_files[group['id']].append(rel_path)
+                for attr_id in group['defines']:
+                    self.attribute_owners[attr_id].append(group['id'])
+                if group['name'] and group['type'] in ('entity', 'event'):
+                    self.names[group['type']].setdefault(group['name'], group['id'])
+                if group['metric_name']:
+                    self.names['metric'].setdefault(group['metric_name'], group['id'])
+
+        self.deps: Dict[str, Set[str]] = {}
+        self.dependents: Dict[str, Set[str]] = defaultdict(set)
+        for group_id, group in self.groups.items():
+            nodes = {self.resolve(kind, target) for kind, target in group['deps']}
+            nodes.discard(group_id)
+            self.deps[group_id] = nodes
+            for node in nodes:
+                self.dependents[node].add(group_id)
+
+    def resolve(self, kind: str, target: str) -> str:
+        if kind == 'group':
+            node = target if target in self.groups else None
+        elif kind in ('attr', 'renamed_attr'):
+            owners = self.attribute_owners.get(target)
+            node = owners[0] if owners else None
+        elif kind == 'renamed':
+            node = (target if target in self.groups else None) or \
+                self.names['metric'].get(target) or self.names['event'].get(target)
+        else:
+            node = self.names[kind].get(target)
+        return node or f'missing:{kind}:{target}'
+
+    def structure_signature(self) -> str:
+        """Hash de los grupos, sus archivos y la jerarquía de ``extends``.
+
+        Los cambios en referencias, entidades o eventos no alteran la firma: el
+        conjunto afectado ya los cubre al recorrer el grafo anterior y el actual.
+        """
+        digest = hashlib.sha256()
+        for group_id in sorted(self.groups):
+            parent = next((target for kind, target in self.groups[group_id]['deps'] if kind == 'group'), '')
+            digest.update(f'{group_id}\0{",".join(self.group_files[group_id])}\0{parent}\n'.encode())
+        return digest.hexdigest()
+
+    def group_ids(self, rel_path: str) -> List[str]:
+        return [group['id'] for group in self.files.get(rel_path) or []]
+
+
+def affected_groups(changed: Iterable[str], new: ModelGraph,
+                    old_groups: Dict[str, Optional[List[Dict[str, Any]]]],
+                    old: Optional[ModelGraph]) -> Set[str]:
+    """Grupos de los archivos cambiados y todos sus dependientes transitivos."""
+    seeds = set()
+    for rel_path in changed:
+        seeds.update(new.group_ids(rel_path))
+        seeds.update(group['id'] for group in old_groups.get(rel_path) or [])
+    # los grupos que cambian pueden resolver dependencias que antes faltaban
+    for group_id in list(seeds):
+        group = new.groups.get(group_id)
+        if group is None:
+            continue
+        for attr_id in group['defines']:
+            seeds.add(f'missing:attr:{attr_id}')
+            seeds.add(f'missing:renamed_attr:{attr_id}')
+        if group['name'] and group['type'] in ('entity', 'event'):
+            seeds.add(f'missing:{group["type"]}:{group["name"]}')
+        seeds.add(f'missing:group:{group_id}')
+        seeds.add(f'missing:renamed:{group_id}')
+
+    graphs = [new] + ([old] if old is not None else [])
+    closure = set(seeds)
+    queue = deque(seeds)
+    while queue:
+        node = queue.popleft()
+        for graph in graphs:
+            for dependent in graph.dependents.get(node, ()):
+                if dependent not in closure:
+                    closure.add(dependent)
+                    queue.append(dependent)
+    return {node for node in closure if node in new.groups}
+
+
+def structural_violations(graph: ModelGraph, groups: Iterable[str]) -> List[Dict[str, str]]:
+    """Errores de estructura del modelo en los grupos indicados."""
+    groups = set(groups)
+    violations = []
+
+    def add(group_id: str, attr: str, category: str, description: str):
+        violations.append({'id': description, 'category': category, 'group': group_id, 'attr': attr})
+
+    for group_id in sorted(groups):
+        group = graph.groups[group_id]
+        files = graph.group_files[group_id]
+        if len(files) > 1:
+            add(group_id, '', 'duplicate_group',
+                f"El grupo '{group_id}' está definido más de una vez ({', '.join(files)}).")
+        for kind, target in group['deps']:
+            if not graph.resolve(kind, target).startswith('missing:'):
+                continue
+            if kind == 'group':
+                add(group_id, '', 'unresolved_extends',
+                    f"El grupo '{group_id}' extiende '{target}', que no existe.")
+            elif kind == 'attr':
+                add(group_id, target, 'unresolved_ref',
+                    f"El grupo '{group_id}' referencia el atributo '{target}', que no está definido.")
+            elif kind == 'renamed_attr':
+                add(group_id, target, 'unresolved_renamed_to',
+                    f"Un atributo del grupo '{group_id}' se renombró a '{target}', que no está definido.")
+            elif kind == 'entity':
+                add(group_id, '', 'unresolved_entity',
+                    f"El grupo '{group_id}' se asocia a la entidad '{target}', que no existe.")
+            elif kind == 'event':
+                add(group_id, '', 'unresolved_event',
+                    f"El grupo '{group_id}' usa el evento '{target}', que no existe.")
+            else:
+                add(group_id, '', 'unresolved_renamed_to',
+                    f"El grupo '{group_id}' se renombró a '{target}', que no existe.")
+        for attr_id in group['defines']:
+            owners = graph.attribute_owners[attr_id]
+            # una sola vez por atributo, en el primero de sus grupos que se valida
+            if len(owners) > 1 and next(owner for owner in owners if owner in groups) == group_id:
+                add(group_id, attr_id, 'duplicate_attribute',
+                    f"El atributo '{attr_id}' está definido en varios grupos ({', '.join(owners)}).")
+
+        # ciclos de extends
+        seen = [group_id]
+        parent = next((target for kind, target in group['deps'] if kind == 'group'), None)
+        while parent in graph.groups:
+            if parent in seen:
+                if parent == group_id:
+                    add(group_id, '', 'extends_cycle',
+                        f"Ciclo de extends: {' -> '.join(seen + [parent])}.")
+                break
+            seen.append(parent)
+            parent = next((target for kind, target in graph.groups[parent]['deps'] if kind == 'group'), None)
+    return violations
+
+
+def resolve_groups(registry: Dict[str, Any], group_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolución aproximada de ``ref`` y ``extends`` para las políticas after_resolution."""
+    groups = registry['groups']
+    attributes = registry['attributes']
+    resolved: Dict[str, Dict[str, Any]] = {}
+
+    def resolve(group_id: str, stack: Tuple[str, ...]) -> Dict[str, Any]:
+        if group_id in resolved:
+            return resolved[group_id]
+        group = groups[group_id]
+        own = []
+        for attribute in group.get('attributes') or []:
+            if attribute.get('ref'):
+                base = attributes.get(attribute['ref'], {})
+                merged = {k: v for k, v in base.items() if k not in ('id', 'group', 'file')}
+                merged.update((k, v) for k, v in attribute.items() if k != 'ref')
+                merged['name'] = attribute['ref']
+            else:
+                merged = {k: v for k, v in attribute.items() if k != 'id'}
+                merged['name'] = attribute.get('id')
+            own.append(merged)
+        inherited = []
+        parent = group.get('extends')
+        if parent in groups and parent not in stack:
+            names = {attribute['name'] for attribute in own}
+            inherited = [attribute for attribute in resolve(parent, stack + (group_id,))['attributes']
+                         if attribute['name'] not in names]
+        result = {k: v for k, v in group.items() if k not in ('file', 'extends')}
+        result['attributes'] = inherited + own
+        resolved[group_id] = result
+        return result
+
+    return {group_id: resolve(group_id, ()) for group_id in group_ids if group_id in groups}
+
+
+def context_group(group: Dict[str, Any]) -> Dict[str, Any]:
+    context = {key: group[key] for key in CONTEXT_GROUP_KEYS if key in group}
+    context['attributes'] = [{key: attribute[key] for key in CONTEXT_ATTRIBUTE_KEYS if key in attribute}
+                             for attribute in group.get('attributes') or []]
+    return context
+
+
+def after_resolution_input(registry: Dict[str, Any], affected: Set[str]) -> Dict[str, Any]:
+    """Grupos afectados resueltos más el contexto que necesitan las políticas globales."""
+    groups = registry['groups']
+    context_ids = [group_id for group_id, group in groups.items()
+                   if group_id not in affected and (group_id.startswith('registry.') or
+                                                    group.get('type') in ('entity', 'event', 'metric'))]
+    resolved = resolve_groups(registry, list(affected) + context_ids)
+    return {'groups': [resolved[group_id] for group_id in sorted(affected) if group_id in resolved] +
+                      [context_group(resolved[group_id]) for group_id in context_ids]}
+
+
+def run_opa(policies_dir: str, package: str, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Evalúa ``data.<package>.deny`` con ``opa eval`` sobre ``document``."""
+    command = ['opa', 'eval', '--format', 'json', '--stdin-input', '--data', policies_dir, f'data.{package}.deny']
+    result = subprocess.run(command, input=json.dumps(document, default=str),
+                            capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"opa eval {package} falló: {result.stderr.strip()}")
+    output = json.loads(result.stdout or '{}')
+    return [violation
+            for entry in output.get('result') or []
+            for expression in entry.get('expressions') or []
+            for violation in expression.get('value') or []]
+
+
+def policy_violations(registry: Dict[str, Any], affected: Set[str],
+                      policies_dir: str) -> List[Dict[str, Any]]:
+    groups = registry['groups']
+    raw = [{k: v for k, v in groups[group_id].items() if k != 'file'}
+           for group_id in sorted(affected) if group_id in groups]
+    violations = run_opa(policies_dir, 'before_resolution', {'groups': raw})
+
+    affected_attributes = {attribute.get('id') or attribute.get('ref')
+                           for group_id in affected if group_id in groups
+                           for attribute in groups[group_id].get('attributes') or []}
+    for violation in run_opa(policies_dir, 'after_resolution', after_resolution_input(registry, affected)):
+        group_id = violation.get('group') or ''
+        if group_id in affected or (not group_id and violation.get('attr') in affected_attributes):
+            violations.append(violation)
+    return violations
+
+
+def git_lines(model_dir: str, *args: str) -> List[str]:
+    result = subprocess.run(['git', '-C', model_dir, *args], capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} falló: {result.stderr.strip()}")
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def changed_since(model_dir: str, ref: str) -> List[str]:
+    """YAML del modelo modificados respecto a ``ref``, incluidos los no versionados."""
+    names = git_lines(model_dir, 'diff', '--name-only', '--relative', ref, '--', '.')
+    names += git_lines(model_dir, 'ls-files', '--others', '--exclude-standard', '--', '.')
+    return sorted({os.path.normpath(name) for name in names if name.endswith('.yaml')})
+
+
+def groups_at(model_dir: str, ref: str, rel_path: str) -> Optional[List[Dict[str, Any]]]:
+    """Resumen de ``rel_path`` tal como estaba en ``ref`` (``None`` si no existía)."""
+    result = subprocess.run(['git', '-C', model_dir, 'show', f'{ref}:./{rel_path}'],
+                            capture_output=True, check=False)
+    if result.returncode != 0:
+        return None
+    try:
+        return summarize_document(yaml.load(result.stdout, Loader=Loader))
+    except yaml.YAMLError:
+        return []
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    return state if state.get('format') == STATE_FORMAT_VERSION else {}
+
+
+def save_state(path: str, state: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(dict(state, format=STATE_FORMAT_VERSION), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, path)
+
+
+def summarize_files(model_dir: str, file_hashes: Dict[str, str],
+                    cached: Dict[str, Tuple[str, List]]) -> Tuple[Dict[str, Tuple[str, List]], int]:
+    """Resúmenes por archivo, reparseando solo los que cambiaron de sha256."""
+    summaries = {}
+    parsed = 0
+    for rel_path, sha256 in file_hashes.items():
+        entry = cached.get(rel_path)
+        if entry is None or entry[0] != sha256:
+            entry = (sha256, summarize_document(load_yaml(os.path.join(model_dir, rel_path))))
+            parsed += 1
+        summaries[rel_path] = entry
+    return summaries, parsed
+
+
+def format_violation(violation: Dict[str, Any], graph: ModelGraph) -> str:
+    group_id = violation.get('group') or ''
+    files = graph.group_files.get(group_id)
+    location = f"{files[0]}: " if files else ''
+    category = violation.get('category') or violation.get('type') or 'policy'
+    return f"  {location}[{category}] {violation.get('id')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Valida solo los grupos del modelo afectados por los YAML cambiados.")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--policies-dir', default=DEFAULT_POLICIES_DIR, help="Directorio de políticas rego")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directorio de caché")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--since', metavar='REF', help="Archivos cambiados respecto a una referencia de git")
+    source.add_argument('--files', nargs='+', metavar='FILE', help="Archivos cambiados (rutas del modelo)")
+    source.add_argument('--full', action='store_true', help="Valida el modelo completo")
+    parser.add_argument('--no-policies', action='store_true', help="Solo comprobaciones estructurales, sin opa")
+    parser.add_argument('--list', action='store_true', help="Muestra los grupos afectados sin validar")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        registry = load_registry(args.model_dir, args.cache_dir)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    path = state_path(args.model_dir, args.cache_dir)
+    state = load_state(path)
+    summaries, parsed = summarize_files(args.model_dir, registry['file_hashes'], state.get('summaries') or {})
+    graph = ModelGraph({rel_path: groups for rel_path, (_, groups) in summaries.items()})
+    checked = state.get('checked')
+    current_policies = policies_hash(args.policies_dir)
+
+    # versión anterior de los archivos cambiados y grafo de referencia
+    if args.since:
+        try:
+            changed = changed_since(args.model_dir, args.since)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        old_groups = {rel_path: groups_at(args.model_dir, args.since, rel_path) for rel_path in changed}
+    elif args.files:
+        changed = sorted({os.path.relpath(os.path.abspath(name), os.path.abspath(args.model_dir))
+                          if os.path.isabs(name) or os.path.exists(name) else os.path.normpath(name)
+                          for name in args.files})
+        # sin validación previa se supone que la versión anterior es la actual
+        baseline = checked if checked is not None else summaries
+        old_groups = {rel_path: baseline.get(rel_path, (None, None))[1] for rel_path in changed}
+    else:
+        checked = checked or {}
+        changed = sorted(rel_path for rel_path in set(summaries) | set(checked)
+                         if summaries.get(rel_path, (None,))[0] != checked.get(rel_path, (None,))[0])
+        # los archivos nuevos no existían en la validación anterior
+        old_groups = {rel_path: checked.get(rel_path, (None, None))[1] for rel_path in changed}
+
+    old_files = {rel_path: groups for rel_path, (_, groups) in summaries.items() if rel_path not in old_groups}
+    old_files.update((rel_path, groups) for rel_path, groups in old_groups.items() if groups is not None)
+    old_graph = ModelGraph(old_files)
+
+    use_policies = not args.no_policies and shutil.which('opa') is not None
+    reason = None
+    if args.full:
+        reason = "--full"
+    elif not args.since and not args.files and not state.get('checked'):
+        reason = "sin validación previa"
+    elif use_policies and state.get('checked') and state.get('policies') != current_policies:
+        reason = "cambiaron las políticas"
+    elif old_graph.structure_signature() != graph.structure_signature():
+        reason = "cambió la estructura del grafo de grupos"
+
+    if reason:
+        affected = set(graph.groups)
+    else:
+        affected = affected_groups(changed, graph, old_groups, old_graph)
+
+    print(f"Archivos cambiados: {len(changed)} ({parsed} reparseados)")
+    if reason:
+        print(f"Validación completa: {reason}")
+    print(f"Grupos afectados: {len(affected)} de {len(graph.groups)}")
+    if args.list:
+        for group_id in sorted(affected):
+            print(f"  {group_id}")
+        save_state(path, dict(state, summaries=summaries))
+        return
+
+    violations = structural_violations(graph, affected)
+    policies_run = False
+    if affected and not args.no_policies:
+        if not use_policies:
+            print("Aviso: opa no está instalado, se omiten las políticas rego", file=sys.stderr)
+        else:
+            try:
+                violations += policy_violations(registry, affected, args.policies_dir)
+                policies_run = True
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                save_state(path, dict(state, summaries=summaries))
+                sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    new_state = dict(state, summaries=summaries)
+    if violations:
+        print(f"\n{len(violations)} violaciones:")
+        for violation in violations:
+            print(format_violation(violation, graph))
+        save_state(path, new_state)
+        print(f"\nTiempo: {elapsed:.2f}s")
+        sys.exit(1)
+
+    # solo una validación completa del árbol de trabajo deja estado de referencia
+    if not args.since and not args.files:
+        new_state['checked'] = summaries
+        # sin grupos afectados el estado de las políticas no cambia; si se omitieron
+        # sobre grupos afectados, la próxima ejecución con opa valida todo
+        if policies_run:
+            new_state['policies'] = current_policies
+        elif affected:
+            new_state['policies'] = None
+    save_state(path, new_state)
+    detail = ('con' if policies_run else 'sin') + ' políticas rego' if affected else 'nada que validar'
+    print(f"Sin violaciones ({detail}). Tiempo: {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
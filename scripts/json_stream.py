@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Lectura incremental de capturas JSON grandes.
+
+Soporta un array JSON de primer nivel (``[{...}, {...}]``) y JSON-lines/NDJSON
+(un valor por línea, o simplemente valores concatenados), opcionalmente
+comprimidos con gzip. Los elementos se entregan uno a uno, de modo que la
+memoria depende del tamaño del elemento más grande y no del archivo completo.
+"""
+
+import gzip
+import io
+import json
+import sys
+from typing import IO, Any, Dict, Iterator, Optional
+
+CHUNK_SIZE = 1 << 16
+# Tamaño máximo de un elemento (en caracteres) antes de dar la captura por corrupta
+MAX_ITEM_SIZE = 256 << 20
+# Un error de decodificación a menos de esta distancia del final del buffer
+# puede deberse a un elemento cortado (p. ej. a mitad de un escape \uXXXX\uXXXX)
+TRUNCATION_WINDOW = 12
+GZIP_MAGIC = b'\x1f\x8b'
+WHITESPACE = ' \t\r\n'
+
+_decoder = json.JSONDecoder()
+
+
+def open_capture(path: str) -> IO[str]:
+    """Abre una captura como texto, detectando gzip por sus bytes mágicos.
+
+    ``-`` lee de stdin.
+    """
+    if path == '-':
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, 'rb')
+
+    if not isinstance(raw, io.BufferedReader):
+        raw = io.BufferedReader(raw)
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+def iter_json_items(fp: IO[str], chunk_size: int = CHUNK_SIZE, key: Optional[str] = None,
+                    other_members: Optional[Dict[str, Any]] = None,
+                    max_item_size: int = MAX_ITEM_SIZE) -> Iterator[Any]:
+    """Itera los elementos de un array JSON o de un flujo JSON-lines.
+
+    Si el primer carácter significativo es ``[`` se recorren los elementos del
+    array; en caso contrario se decodifican valores JSON consecutivos.
+
+    Con ``key``, si el documento es un objeto se recorren los elementos del
+    array ``documento[key]`` (por ejemplo ``violations``) sin cargar el resto en
+    memoria a la vez; los demás miembros se guardan en ``other_members`` si se
+    indica, o se descartan.
+
+    Solo se sigue leyendo tras un error de decodificación si el error está al
+    final del buffer (elemento cortado); un elemento mal formado, o uno de más
+    de ``max_item_size`` caracteres, lanza ``JSONDecodeError`` con su posición
+    en el archivo sin leer el resto.
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    # Caracteres ya descartados del buffer, para informar posiciones absolutas
+    base = 0
+
+    def fill(size: int) -> bool:
+        nonlocal buf, pos, eof, base
+        if eof:
+            return False
+        data = fp.read(size)
+        if not data:
+            eof = True
+            return False
+        # Compactar el buffer para no retener lo ya consumido
+        if pos:
+            base += pos
+            buf = buf[pos:]
+            pos = 0
+        buf += data
+        return True
+
+    def skip_whitespace() -> bool:
+        """Avanza hasta el siguiente carácter significativo. False si EOF."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not fill(chunk_size):
+                return False
+
+    def decode() -> Any:
+        nonlocal pos
+        size = chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                truncated = e.pos >= len(buf) - TRUNCATION_WINDOW or e.msg.startswith('Unterminated string')
+                if not truncated or eof:
+                    raise json.JSONDecodeError(f'{e.msg} (posición {base + e.pos} del archivo)',
+                                               e.doc, e.pos) from None
+                if len(buf) - pos > max_item_size:
+                    raise json.JSONDecodeError(
+                        f'Elemento de más de {max_item_size} caracteres en la posición {base + pos} '
+                        'del archivo', buf, pos) from None
+                if not fill(size):
+                    raise json.JSONDecodeError(f'{e.msg} (posición {base + e.pos} del archivo)',
+                                               e.doc, e.pos) from None
+                size *= 2  # crecimiento geométrico para elementos muy grandes
+                continue
+            # Un número al final del buffer podría estar truncado
+            if end == len(buf) and fill(size):
+                continue
+            pos = end
+            return value
+
+    def expect_next(message: str) -> None:
+        if not skip_whitespace():
+            raise json.JSONDecodeError(message, buf, pos)
+
+    def array_items() -> Iterator[Any]:
+        nonlocal pos
+        pos += 1
+        expect_next('Array sin cerrar')
+        if buf[pos] == ']':
+            pos += 1
+            return
+        while True:
+            yield decode()
+            expect_next('Array sin cerrar')
+            if buf[pos] == ']':
+                pos += 1
+                return
+            if buf[pos] != ',':
+                raise json.JSONDecodeError("Se esperaba ',' o ']'", buf, pos)
+            pos += 1
+            expect_next('Array sin cerrar')
+
+    def object_member_items() -> Iterator[Any]:
+        nonlocal pos
+        pos += 1
+        expect_next('Objeto sin cerrar')
+        if buf[pos] == '}':
+            return
+        while True:
+            member = decode()
+            expect_next('Objeto sin cerrar')
+            if buf[pos] != ':':
+                raise json.JSONDecodeError("Se esperaba ':'", buf, pos)
+            pos += 1
+            expect_next('Objeto sin cerrar')
+            if member == key and buf[pos] == '[':
+                yield from array_items()
+            else:
+                value = decode()
+                if other_members is not None:
+                    other_members[member] = value
+            expect_next('Objeto sin cerrar')
+            if buf[pos] == '}':
+                return
+            if buf[pos] != ',':
+                raise json.JSONDecodeError("Se esperaba ',' o '}'", buf, pos)
+            pos += 1
+            expect_next('Objeto sin cerrar')
+
+    if not skip_whitespace():
+        return
+
+    if buf[pos] == '[':
+        yield from array_items()
+    elif key is not None and buf[pos] == '{':
+        yield from object_member_items()
+    else:
+        while skip_whitespace():
+            yield decode()
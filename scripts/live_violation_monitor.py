@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Monitor en vivo de violations de weaver live-check.
+
+Consume violations en JSON-lines (una violation por línea, o líneas con un
+array ``violations``) desde stdin o siguiendo un archivo que sigue creciendo,
+las clasifica con la misma lógica que filter_sdk_lag.py y mantiene conteos en
+una ventana deslizante por categoría y por área. Con --snapshot o
+--sdk-version también se cuenta, por momento de deprecación, si los atributos
+deprecados lo estaban ya cuando salió el SDK (ver deprecation_timeline.py). Cada ``--interval`` segundos
+emite un resumen, sin esperar al timeout de inactividad de la captura.
+
+Uso:
+  weaver registry live-check ... | python3 live_violation_monitor.py
+  python3 live_violation_monitor.py --follow captured/violations.jsonl --window 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import IO, Any, Dict, Iterator, Optional
+
+from area_index import AreaClassifier, load_area_index
+from deprecation_index import DEFAULT_MODEL_DIR, load_deprecation_index
+from deprecation_timeline import DeprecationTimeline, build_timeline, parse_snapshot
+from filter_sdk_lag import classify_violation, default_area_classifier
+
+DEFAULT_WINDOW = 60
+DEFAULT_INTERVAL = 10
+FOLLOW_POLL_INTERVAL = 0.2
+
+
+class RollingCounter:
+    """Conteos en una ventana deslizante, agrupados en buckets de un segundo."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.buckets = deque()  # (segundo, Counter)
+
+    def add(self, key, now: float, amount: int = 1) -> None:
+        second = int(now)
+        if not self.buckets or self.buckets[-1][0] != second:
+            self.buckets.append((second, Counter()))
+            self.expire(now)
+        self.buckets[-1][1][key] += amount
+
+    def expire(self, now: float) -> None:
+        oldest = int(now) - self.window
+        while self.buckets and self.buckets[0][0] <= oldest:
+            self.buckets.popleft()
+
+    def totals(self, now: float) -> Counter:
+        self.expire(now)
+        totals = Counter()
+        for _, counter in self.buckets:
+            totals.update(counter)
+        return totals
+
+
+class ViolationMonitor:
+    """Acumula violations clasificadas y produce resúmenes periódicos."""
+
+    def __init__(self, deprecation_index: Dict[str, Dict[str, Any]], window: int = DEFAULT_WINDOW,
+                 area_classifier: Optional[AreaClassifier] = None,
+                 timeline: Optional[DeprecationTimeline] = None,
+                 sdk_version: Optional[str] = None):
+        self.deprecation_index = deprecation_index
+        self.area_classifier = area_classifier or default_area_classifier()
+        self.timeline = timeline
+        self.sdk_version = sdk_version
+        self.window = window
+        self.rolling = RollingCounter(window)
+        self.totals = Counter()
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def add(self, violation: Dict[str, Any], now: float = None) -> None:
+        category = classify_violation(violation, self.deprecation_index, self.timeline, self.sdk_version)
+        area = self.area_classifier.area(violation.get('attribute', ''))
+        keys = [('category', category), ('area', area)]
+        if 'deprecation_timing' in violation:
+            keys.append(('timing', violation['deprecation_timing']))
+        now = time.time() if now is None else now
+        with self.lock:
+            for key in keys:
+                self.rolling.add(key, now)
+                self.totals[key] += 1
+
+    def summary(self, now: float = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        with self.lock:
+            window = self.rolling.totals(now)
+            totals = Counter(self.totals)
+
+        def split(counter: Counter, kind: str) -> Dict[str, int]:
+            return {key: count for (k, key), count in counter.most_common() if k == kind}
+
+        window_total = sum(split(window, 'category').values())
+        return {
+            'timestamp': now,
+            'window_seconds': self.window,
+            'window': {
+                'total': window_total,
+                'per_second': round(window_total / min(self.window, max(now - self.started, 1)), 1),
+                'categories': split(window, 'category'),
+                'areas': split(window, 'area'),
+                'deprecation_timing': split(window, 'timing'),
+            },
+            'totals': {
+                'total': sum(split(totals, 'category').values()),
+                'categories': split(totals, 'category'),
+                'areas': split(totals, 'area'),
+                'deprecation_timing': split(totals, 'timing'),
+            },
+        }
+
+
+def iter_lines(stream: IO[str], follow: bool, stop: threading.Event) -> Iterator[str]:
+    """Itera líneas; con ``follow`` espera nuevos datos como ``tail -f``.
+
+    Solo se entregan líneas completas: si el escritor aún no terminó una línea,
+    el fragmento leído se guarda hasta que llegue el resto.
+    """
+    pending = ''
+    while not stop.is_set():
+        line = stream.readline()
+        if line:
+            if not line.endswith('\n'):
+                pending += line
+                continue
+            yield pending + line
+            pending = ''
+        elif follow:
+            time.sleep(FOLLOW_POLL_INTERVAL)
+        else:
+            break
+    if pending and not follow:
+        yield pending
+
+
+def iter_violations(lines: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """Decodifica violations de líneas JSON, ignorando líneas que no lo son."""
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] != '{':
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record.get('violations'), list):
+            yield from (v for v in record['violations'] if isinstance(v, dict))
+        else:
+            yield record
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    window = summary['window']
+    categories = ', '.join(f"{key}={count}" for key, count in window['categories'].items()) or '-'
+    areas = ', '.join(f"{key}={count}" for key, count in list(window['areas'].items())[:8]) or '-'
+    timings = ', '.join(f"{key}={count}" for key, count in window['deprecation_timing'].items())
+    clock = time.strftime('%H:%M:%S', time.localtime(summary['timestamp']))
+    return (f"[{clock}] últimos {summary['window_seconds']}s: {window['total']} violations "
+            f"({window['per_second']}/s) | categorías: {categories} | áreas: {areas} "
+            + (f"| deprecación: {timings} " if timings else '')
+            + f"| total acumulado: {summary['totals']['total']}")
+
+
+def report_periodically(monitor: ViolationMonitor, interval: float, as_json: bool,
+                        out: IO[str], stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        emit_summary(monitor, as_json, out)
+
+
+def emit_summary(monitor: ViolationMonitor, as_json: bool, out: IO[str]) -> None:
+    summary = monitor.summary()
+    if as_json:
+        out.write(json.dumps(summary, separators=(',', ':')) + '\n')
+    else:
+        out.write(format_summary(summary) + '\n')
+    out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clasifica y agrega violations de live-check en tiempo real.")
+    parser.add_argument('--follow', '-f', metavar='FILE',
+                        help="Sigue un archivo que crece (como tail -f) en lugar de leer stdin")
+    parser.add_argument('--from-start', action='store_true',
+                        help="Con --follow, procesa también el contenido existente del archivo")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help=f"Tamaño de la ventana deslizante en segundos (default: {DEFAULT_WINDOW})")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"Segundos entre resúmenes (default: {DEFAULT_INTERVAL})")
+    parser.add_argument('--json', action='store_true', help="Emite los resúmenes como JSON-lines en stdout")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--sdk-version',
+                        help="Versión de semconv del SDK, para violations sin semconv_version ni schema_url")
+    parser.add_argument('--snapshot', action='append', type=parse_snapshot, default=[],
+                        help="Versión anterior del modelo como VERSION=DIRECTORIO (repetible)")
+    args = parser.parse_args()
+
+    try:
+        deprecation_index = load_deprecation_index(args.model_dir)
+        area_classifier = AreaClassifier(load_area_index(args.model_dir))
+        timeline = None
+        if args.snapshot or args.sdk_version:
+            timeline = build_timeline(args.snapshot, args.model_dir)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.follow:
+        try:
+            stream = open(args.follow, 'r')
+        except FileNotFoundError:
+            print(f"Error: No se puede encontrar el archivo {args.follow}", file=sys.stderr)
+            sys.exit(1)
+        if not args.from_start:
+            stream.seek(0, os.SEEK_END)
+    else:
+        stream = sys.stdin
+
+    monitor = ViolationMonitor(deprecation_index, args.window, area_classifier, timeline, args.sdk_version)
+    out = sys.stdout if args.json else sys.stderr
+    stop = threading.Event()
+    reporter = threading.Thread(target=report_periodically,
+                                args=(monitor, args.interval, args.json, out, stop), daemon=True)
+    reporter.start()
+
+    try:
+        for violation in iter_violations(iter_lines(stream, bool(args.follow), stop)):
+            monitor.add(violation)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        reporter.join()
+        emit_summary(monitor, args.json, out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Conversión de trazas OTLP al formato plano de span que usa analyze_spans.
+
+Un span plano es ``{'name', 'kind', 'attributes': {...}, 'resource': {...}}``
+con ``kind`` en mayúsculas (``SERVER``, ``CLIENT``...) y los ``AnyValue``
+convertidos a valores de Python (``intValue`` llega como string en OTLP/JSON).
+
+Las capturas binarias (``ExportTraceServiceRequest`` con prefijo de longitud,
+como las del file exporter del collector con ``format: proto``) se decodifican
+directamente con ``iter_protobuf_spans``, sin pasar por JSON.
+"""
+
+import base64
+import gzip
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from json_stream import GZIP_MAGIC
+
+SPAN_KIND_NAMES = {
+    0: 'INTERNAL',  # SPAN_KIND_UNSPECIFIED
+    1: 'INTERNAL',
+    2: 'SERVER',
+    3: 'CLIENT',
+    4: 'PRODUCER',
+    5: 'CONSUMER',
+}
+
+
+def any_value_to_python(value: Dict[str, Any]) -> Any:
+    """Convierte un ``AnyValue`` de OTLP/JSON a un valor de Python."""
+    if not value:
+        return None
+    if 'stringValue' in value:
+        return value['stringValue']
+    if 'boolValue' in value:
+        return bool(value['boolValue'])
+    if 'intValue' in value:
+        return int(value['intValue'])
+    if 'doubleValue' in value:
+        return float(value['doubleValue'])
+    if 'arrayValue' in value:
+        return [any_value_to_python(item) for item in (value['arrayValue'] or {}).get('values') or []]
+    if 'kvlistValue' in value:
+        return key_values_to_dict((value['kvlistValue'] or {}).get('values') or [])
+    if 'bytesValue' in value:
+        return base64.b64decode(value['bytesValue']).hex()
+    return None
+
+
+def key_values_to_dict(key_values: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convierte una lista de ``KeyValue`` a un diccionario."""
+    return {kv['key']: any_value_to_python(kv.get('value')) for kv in key_values if 'key' in kv}
+
+
+def span_kind_name(kind: Any) -> str:
+    """Normaliza ``kind`` (entero o ``SPAN_KIND_SERVER``) a ``SERVER``."""
+    if isinstance(kind, int):
+        return SPAN_KIND_NAMES.get(kind, 'INTERNAL')
+    if isinstance(kind, str) and kind:
+        kind = kind.upper()
+        if kind.startswith('SPAN_KIND_'):
+            kind = kind[len('SPAN_KIND_'):]
+        return 'INTERNAL' if kind == 'UNSPECIFIED' else kind
+    return 'INTERNAL'
+
+
+def flatten_traces_request(request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Recorre ``resourceSpans → scopeSpans → spans`` de un ExportTraceServiceRequest JSON."""
+    for resource_spans in request.get('resourceSpans') or []:
+        resource = key_values_to_dict(((resource_spans.get('resource') or {}).get('attributes')) or [])
+        # instrumentationLibrarySpans es el nombre anterior de scopeSpans
+        scope_spans_list = resource_spans.get('scopeSpans') or resource_spans.get('instrumentationLibrarySpans') or []
+        for scope_spans in scope_spans_list:
+            for span in scope_spans.get('spans') or []:
+                yield {
+                    'name': span.get('name', 'unknown'),
+                    'kind': span_kind_name(span.get('kind')),
+                    'attributes': key_values_to_dict(span.get('attributes') or []),
+                    'resource': resource,
+                }
+
+
+# --- OTLP protobuf --------------------------------------------------------
+#
+# Decodificador del formato binario de protobuf limitado a los campos que usa
+# el análisis (nombre, kind y atributos de span y atributos del recurso).
+# Trabaja con offsets sobre un único ``memoryview`` del archivo mapeado en
+# memoria: solo se copian los strings y valores que terminan en el span plano.
+
+# Extensiones de capturas OTLP protobuf (opcionalmente seguidas de .gz)
+PROTOBUF_EXTENSIONS = ('.pb', '.binpb')
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LEN = 2
+WIRE_FIXED32 = 5
+
+INT64_SIGN = 1 << 63
+DOUBLE = struct.Struct('<d')
+UINT32_BE = struct.Struct('>I')
+# Tag del campo 1 (resource_spans) de ExportTraceServiceRequest
+REQUEST_FIRST_TAG = (1 << 3) | WIRE_LEN
+
+
+def is_protobuf_capture(path: str) -> bool:
+    """Una captura es OTLP protobuf si su extensión es ``.pb``/``.binpb`` (o ``.pb.gz``...)."""
+    if path.endswith('.gz'):
+        path = path[:-len('.gz')]
+    return path.endswith(PROTOBUF_EXTENSIONS)
+
+
+def read_varint(buf, pos: int) -> Tuple[int, int]:
+    """Lee un varint en ``pos``; devuelve ``(valor, posición siguiente)``."""
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    result = byte & 0x7f
+    shift = 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos + 1
+        shift += 7
+
+
+def read_field(buf, pos: int) -> Tuple[int, int, Any, int]:
+    """Lee el campo que empieza en ``pos``: ``(número, wire type, valor, posición siguiente)``.
+
+    Para campos de longitud el valor es ``(inicio, fin)`` dentro de ``buf`` y
+    para fixed32/fixed64 el offset del valor.
+    """
+    key, pos = read_varint(buf, pos)
+    wire_type = key & 7
+    if wire_type == WIRE_LEN:
+        length, pos = read_varint(buf, pos)
+        return key >> 3, wire_type, (pos, pos + length), pos + length
+    if wire_type == WIRE_VARINT:
+        value, pos = read_varint(buf, pos)
+        return key >> 3, wire_type, value, pos
+    if wire_type == WIRE_FIXED64:
+        return key >> 3, wire_type, pos, pos + 8
+    if wire_type == WIRE_FIXED32:
+        return key >> 3, wire_type, pos, pos + 4
+    raise ValueError(f"wire type {wire_type} no soportado en el offset {pos}")
+
+
+def iter_fields(buf, pos: int, end: int) -> Iterator[Tuple[int, int, Any]]:
+    """Recorre los campos de un mensaje entre ``pos`` y ``end`` (ver ``read_field``)."""
+    while pos < end:
+        field, wire_type, value, pos = read_field(buf, pos)
+        yield field, wire_type, value
+    if pos != end:
+        raise ValueError(f"mensaje protobuf truncado en el offset {end}")
+
+
+# Los mensajes por span (Span, KeyValue, AnyValue) se recorren con bucles
+# propios que resuelven en línea los tags y longitudes de un byte, el caso
+# habitual; el resto de campos pasa por ``read_field``.
+TAG_ANY_STRING = (1 << 3) | WIRE_LEN
+TAG_ANY_BOOL = (2 << 3) | WIRE_VARINT
+TAG_ANY_INT = (3 << 3) | WIRE_VARINT
+TAG_ANY_DOUBLE = (4 << 3) | WIRE_FIXED64
+TAG_ANY_ARRAY = (5 << 3) | WIRE_LEN
+TAG_ANY_KVLIST = (6 << 3) | WIRE_LEN
+TAG_ANY_BYTES = (7 << 3) | WIRE_LEN
+TAG_KEY = (1 << 3) | WIRE_LEN
+TAG_VALUE = (2 << 3) | WIRE_LEN
+TAG_SPAN_NAME = (5 << 3) | WIRE_LEN
+TAG_SPAN_KIND = (6 << 3) | WIRE_VARINT
+TAG_SPAN_ATTRIBUTE = (9 << 3) | WIRE_LEN
+# Atributos (clave y valor) repetidos que se recuerdan antes de vaciar la caché;
+# los más largos (consultas, URLs completas) casi nunca se repiten y no se cachean
+KEY_VALUE_CACHE_SIZE = 100_000
+KEY_VALUE_CACHE_MAX_BYTES = 128
+
+
+def decode_any_value(buf, pos: int, end: int) -> Any:
+    """Convierte un ``AnyValue`` al mismo valor de Python que ``any_value_to_python``."""
+    value = None
+    while pos < end:
+        tag = buf[pos]
+        if tag == TAG_ANY_STRING:
+            length = buf[pos + 1]
+            pos += 2
+            if length >= 0x80:
+                length, pos = read_varint(buf, pos - 1)
+            value = str(buf[pos:pos + length], 'utf-8')
+            pos += length
+        elif tag == TAG_ANY_INT:
+            value, pos = read_varint(buf, pos + 1)
+            if value >= INT64_SIGN:
+                value -= 1 << 64
+        elif tag == TAG_ANY_DOUBLE:
+            value = DOUBLE.unpack_from(buf, pos + 1)[0]
+            pos += 9
+        elif tag == TAG_ANY_BOOL:
+            number, pos = read_varint(buf, pos + 1)
+            value = bool(number)
+        else:
+            field, _, data, pos = read_field(buf, pos)
+            if field == 5:
+                value = [decode_any_value(buf, *item) for number, _, item in iter_fields(buf, *data) if number == 1]
+            elif field == 6:
+                value = decode_key_values(buf, *data)
+            elif field == 7:
+                value = buf[data[0]:data[1]].hex()
+    return value
+
+
+def decode_key_value(buf, pos: int, end: int) -> Tuple[Optional[str], Any]:
+    key = None
+    value = None
+    while pos < end:
+        tag = buf[pos]
+        if tag == TAG_KEY or tag == TAG_VALUE:
+            length = buf[pos + 1]
+            pos += 2
+            if length >= 0x80:
+                length, pos = read_varint(buf, pos - 1)
+            if tag == TAG_KEY:
+                key = str(buf[pos:pos + length], 'utf-8')
+            else:
+                value = decode_any_value(buf, pos, pos + length)
+            pos += length
+        else:
+            pos = read_field(buf, pos)[3]
+    return key, value
+
+
+def decode_key_values(buf, start: int, end: int, field_number: int = 1) -> Dict[str, Any]:
+    """Los ``KeyValue`` del campo ``field_number`` de un mensaje, como diccionario."""
+    attributes = {}
+    for field, _, data in iter_fields(buf, start, end):
+        if field == field_number:
+            key, value = decode_key_value(buf, *data)
+            if key is not None:
+                attributes[key] = value
+    return attributes
+
+
+def decode_span(buf, pos: int, end: int, resource: Dict[str, Any],
+                key_values: Optional[Dict[bytes, Tuple[Optional[str], Any]]] = None) -> Dict[str, Any]:
+    """Span plano; ``key_values`` es una caché opcional de ``KeyValue`` ya decodificados por sus bytes."""
+    name = 'unknown'
+    kind = 0
+    attributes = {}
+    while pos < end:
+        tag = buf[pos]
+        if tag == TAG_SPAN_ATTRIBUTE or tag == TAG_SPAN_NAME:
+            length = buf[pos + 1]
+            pos += 2
+            if length >= 0x80:
+                length, pos = read_varint(buf, pos - 1)
+            if tag == TAG_SPAN_ATTRIBUTE:
+                if key_values is None or length > KEY_VALUE_CACHE_MAX_BYTES:
+                    key, value = decode_key_value(buf, pos, pos + length)
+                else:
+                    raw = bytes(buf[pos:pos + length])
+                    decoded = key_values.get(raw)
+                    if decoded is None:
+                        if len(key_values) >= KEY_VALUE_CACHE_SIZE:
+                            key_values.clear()
+                        decoded = key_values[raw] = decode_key_value(buf, pos, pos + length)
+                    key, value = decoded
+                if key is not None:
+                    attributes[key] = value
+            else:
+                name = str(buf[pos:pos + length], 'utf-8')
+            pos += length
+        elif tag == TAG_SPAN_KIND:
+            kind, pos = read_varint(buf, pos + 1)
+        else:
+            pos = read_field(buf, pos)[3]
+    if pos != end:
+        raise ValueError(f"span truncado en el offset {end}")
+    return {'name': name, 'kind': SPAN_KIND_NAMES.get(kind, 'INTERNAL'), 'attributes': attributes,
+            'resource': resource}
+
+
+def decode_traces_request(buf, start: int, end: int,
+                          key_values: Optional[Dict[bytes, Tuple[Optional[str], Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """Spans planos de un ``ExportTraceServiceRequest`` binario (equivalente a ``flatten_traces_request``).
+
+    ``key_values`` se comparte entre mensajes de una misma captura (ver ``decode_span``).
+    """
+    for field, _, resource_spans in iter_fields(buf, start, end):
+        if field != 1:
+            continue
+        resource = {}
+        scope_spans_list = []
+        for number, _, data in iter_fields(buf, *resource_spans):
+            if number == 1:
+                resource = decode_key_values(buf, *data)
+            elif number in (2, 1000):  # 1000: instrumentation_library_spans (obsoleto)
+                scope_spans_list.append(data)
+        for scope_spans in scope_spans_list:
+            for number, _, data in iter_fields(buf, *scope_spans):
+                if number == 2:
+                    yield decode_span(buf, data[0], data[1], resource, key_values)
+
+
+SPAN_KIND_NUMBERS = {'INTERNAL': 1, 'SERVER': 2, 'CLIENT': 3, 'PRODUCER': 4, 'CONSUMER': 5}
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_len_field(field_number: int, payload: bytes) -> bytes:
+    return encode_varint((field_number << 3) | WIRE_LEN) + encode_varint(len(payload)) + payload
+
+
+def encode_any_value(value: Any) -> bytes:
+    if isinstance(value, str):
+        return encode_len_field(1, value.encode('utf-8'))
+    if isinstance(value, bool):
+        return encode_varint((2 << 3) | WIRE_VARINT) + encode_varint(int(value))
+    if isinstance(value, int):
+        return encode_varint((3 << 3) | WIRE_VARINT) + encode_varint(value & ((1 << 64) - 1))
+    if isinstance(value, float):
+        return encode_varint((4 << 3) | WIRE_FIXED64) + DOUBLE.pack(value)
+    if isinstance(value, (list, tuple)):
+        return encode_len_field(5, b''.join(encode_len_field(1, encode_any_value(item)) for item in value))
+    if isinstance(value, dict):
+        return encode_len_field(6, encode_key_values(value))
+    return encode_len_field(1, str(value).encode('utf-8'))
+
+
+def encode_key_values(attributes: Dict[str, Any], field_number: int = 1) -> bytes:
+    return b''.join(encode_len_field(field_number, encode_len_field(1, key.encode('utf-8'))
+                                     + encode_len_field(2, encode_any_value(value)))
+                    for key, value in attributes.items())
+
+
+def encode_traces_request(spans: List[Dict[str, Any]]) -> bytes:
+    """Codifica spans planos como un ``ExportTraceServiceRequest`` (para corpus sintéticos).
+
+    Los spans consecutivos con el mismo recurso comparten ``ResourceSpans``.
+    """
+    request = bytearray()
+    i = 0
+    while i < len(spans):
+        resource = spans[i].get('resource') or {}
+        encoded_spans = bytearray()
+        while i < len(spans) and (spans[i].get('resource') or {}) == resource:
+            span = spans[i]
+            kind = SPAN_KIND_NUMBERS.get(span.get('kind'), 1)
+            encoded_spans += encode_len_field(2, encode_len_field(5, span.get('name', 'unknown').encode('utf-8'))
+                                              + encode_varint((6 << 3) | WIRE_VARINT) + encode_varint(kind)
+                                              + encode_key_values(span.get('attributes') or {}, 9))
+            i += 1
+        request += encode_len_field(1, encode_len_field(1, encode_key_values(resource))
+                                    + encode_len_field(2, bytes(encoded_spans)))
+    return bytes(request)
+
+
+def iter_delimited_messages(buf) -> Iterator[Tuple[int, int]]:
+    """``(inicio, fin)`` de cada mensaje de un archivo de mensajes con prefijo de longitud.
+
+    Se aceptan los dos marcos habituales: un entero de 4 bytes big-endian (el
+    formato ``proto`` del file exporter del collector) o un varint (mensajes
+    delimitados de protobuf). Se distinguen por el primer mensaje: con el
+    prefijo de 4 bytes el primer byte es 0 y el quinto es el primer tag.
+    """
+    size = len(buf)
+    fixed = size >= 5 and buf[0] == 0 and buf[4] == REQUEST_FIRST_TAG
+    pos = 0
+    while pos < size:
+        if fixed:
+            if pos + 4 > size:
+                raise ValueError(f"prefijo de longitud truncado en el offset {pos}")
+            length = UINT32_BE.unpack_from(buf, pos)[0]
+            pos += 4
+        else:
+            length, pos = read_varint(buf, pos)
+        if pos + length > size:
+            raise ValueError(f"mensaje truncado en el offset {pos}: faltan {pos + length - size} bytes")
+        yield pos, pos + length
+        pos += length
+
+
+def iter_protobuf_spans(path: str) -> Iterator[Dict[str, Any]]:
+    """Spans planos de una captura de ``ExportTraceServiceRequest`` con prefijo de longitud.
+
+    El archivo se mapea en memoria y se decodifica sin copiarlo; las capturas
+    comprimidas con gzip se descomprimen primero en memoria.
+    """
+    with open(path, 'rb') as f:
+        if f.read(2) == GZIP_MAGIC:
+            f.seek(0)
+            with gzip.GzipFile(fileobj=f) as gz:
+                mapped = gz.read()
+        elif os.fstat(f.fileno()).st_size == 0:
+            return
+        else:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    key_values = {}
+    try:
+        try:
+            for start, end in iter_delimited_messages(view):
+                yield from decode_traces_request(view, start, end, key_values)
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"OTLP protobuf no válido: {e}") from None
+    finally:
+        view.release()
+        if isinstance(mapped, mmap.mmap):
+            mapped.close()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Receptor OTLP/HTTP JSON que alimenta directamente el análisis de spans.
+
+Escucha ``POST /v1/traces`` (OTLP/HTTP con cuerpo JSON, opcionalmente gzip),
+aplana ``resourceSpans → scopeSpans → spans`` y pasa los spans al acumulador
+``SpanAnalyzer`` de generate_registry_from_spans.py, sin archivos intermedios.
+Los lotes pasan por una cola acotada: si el análisis no da abasto, las
+peticiones esperan y, pasado ``--put-timeout``, reciben 503 con ``Retry-After``
+para que el exporter reintente.
+
+El registry se escribe al recibir ``POST /snapshot``, con SIGUSR1 y al terminar
+(Ctrl+C / SIGTERM).
+
+Uso:
+  python otlp_http_receiver.py registry.yaml --port 4318
+  OTEL_EXPORTER_OTLP_PROTOCOL=http/json OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 ...
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from attribute_sketches import DEFAULT_MAX_EXAMPLES, DEFAULT_MAX_SPAN_CONTEXTS
+from generate_registry_from_spans import SpanAnalyzer, write_registry_file
+from otlp import flatten_traces_request
+
+DEFAULT_PORT = 4318
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_PUT_TIMEOUT = 5.0
+DEFAULT_MAX_BODY = 64 * 1024 * 1024
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    415: 'Unsupported Media Type',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(message)
+        self.status = status
+        self.message = message or HTTP_REASONS.get(status, '')
+
+
+class OTLPReceiver:
+    """Servidor HTTP mínimo sobre asyncio para OTLP/HTTP JSON."""
+
+    def __init__(self, analyzer: SpanAnalyzer, output_file: str,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 put_timeout: float = DEFAULT_PUT_TIMEOUT,
+                 max_body: int = DEFAULT_MAX_BODY):
+        self.analyzer = analyzer
+        self.output_file = output_file
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.put_timeout = put_timeout
+        self.max_body = max_body
+        self.requests = 0
+        self.rejected = 0
+        self.started = time.time()
+
+    async def consume(self) -> None:
+        """Pasa los lotes encolados al analizador y atiende los snapshots en orden.
+
+        Un snapshot se encola como un ``Future``: se escribe cuando el consumidor
+        llega a él, con los lotes recibidos hasta ese momento, sin esperar a que
+        la cola quede vacía.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            try:
+                if isinstance(item, asyncio.Future):
+                    try:
+                        result = await loop.run_in_executor(None, self._write_registry)
+                    except Exception as e:
+                        if not item.done():
+                            item.set_exception(e)
+                    else:
+                        if not item.done():
+                            item.set_result(result)
+                    continue
+                # En un hilo aparte para que el bucle siga atendiendo conexiones
+                await loop.run_in_executor(None, self.analyzer.add_spans, item)
+            except Exception as e:
+                print(f"Error al analizar un lote de {len(item)} spans: {e!r}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    def _write_registry(self) -> Dict:
+        analysis = self.analyzer.result()
+        write_registry_file(analysis, self.output_file)
+        print(f"Registry escrito en {self.output_file} ({analysis['span_count']} spans, "
+              f"{len(analysis['attributes'])} atributos)", file=sys.stderr)
+        return {'output': self.output_file, 'spans': analysis['span_count'],
+                'attributes': len(analysis['attributes'])}
+
+    async def write_snapshot(self) -> Dict:
+        """Escribe el registry con los lotes recibidos hasta ahora."""
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put(done)
+        return await done
+
+    def stats(self) -> Dict:
+        return {
+            'spans': self.analyzer.span_count,
+            'attributes': len(self.analyzer.attributes_info),
+            'span_patterns': len(self.analyzer.span_patterns),
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'queued_batches': self.queue.qsize(),
+            'uptime_seconds': round(time.time() - self.started, 1),
+        }
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                if len(body) + size > self.max_body:
+                    raise HTTPError(413)
+                body += await reader.readexactly(size)
+                await reader.readline()
+            body = bytes(body)
+        elif 'content-length' in headers:
+            length = int(headers['content-length'])
+            if length > self.max_body:
+                raise HTTPError(413)
+            body = await reader.readexactly(length)
+        elif method == 'POST':
+            raise HTTPError(411)
+        else:
+            body = b''
+
+        return method, path.split('?', 1)[0], headers, body
+
+    def gunzip(self, body: bytes) -> bytes:
+        """Descomprime el cuerpo sin pasar de ``max_body`` bytes descomprimidos."""
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            data = decompressor.decompress(body, self.max_body + 1)
+        except zlib.error as e:
+            raise HTTPError(400, f'Invalid gzip body: {e}')
+        if len(data) > self.max_body or decompressor.unconsumed_tail:
+            raise HTTPError(413)
+        if not decompressor.eof:
+            raise HTTPError(400, 'Truncated gzip body')
+        return data
+
+    def decode_spans(self, body: bytes, gzipped: bool) -> List[Dict]:
+        if gzipped:
+            body = self.gunzip(body)
+        try:
+            request = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise HTTPError(400, f'Invalid JSON: {e}')
+        return list(flatten_traces_request(request))
+
+    async def route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict, Dict]:
+        if path == '/v1/traces':
+            if method != 'POST':
+                raise HTTPError(405)
+            if 'json' not in headers.get('content-type', 'application/json'):
+                raise HTTPError(415, 'Only OTLP/HTTP JSON (application/json) is supported')
+            gzipped = headers.get('content-encoding', '').lower() == 'gzip'
+            # Descomprimir y parsear hasta max_body bytes no debe bloquear el bucle
+            spans = await asyncio.get_running_loop().run_in_executor(None, self.decode_spans, body, gzipped)
+            if spans:
+                try:
+                    await asyncio.wait_for(self.queue.put(spans), self.put_timeout)
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    return 503, {'Retry-After': '1'}, {'error': 'analysis queue full'}
+            return 200, {}, {}
+        if path == '/snapshot':
+            if method != 'POST':
+                raise HTTPError(405)
+            return 200, {}, await self.write_snapshot()
+        if path == '/stats':
+            return 200, {}, self.stats()
+        raise HTTPError(404)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    self.requests += 1
+                    status, extra_headers, payload = await self.route(method, path, headers, body)
+                except HTTPError as e:
+                    status, extra_headers, payload = e.status, {}, {'error': e.message}
+                    keep_alive = False
+                except (OSError, ValueError) as e:
+                    status, extra_headers, payload = 400, {}, {'error': str(e)}
+                    keep_alive = False
+
+                response = json.dumps(payload).encode()
+                head = [f'HTTP/1.1 {status} {HTTP_REASONS.get(status, "")}',
+                        'Content-Type: application/json',
+                        f'Content-Length: {len(response)}',
+                        f'Connection: {"keep-alive" if keep_alive else "close"}']
+                head.extend(f'{name}: {value}' for name, value in extra_headers.items())
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def report_snapshot_failure(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error al escribir el registry: {task.exception()!r}", file=sys.stderr)
+
+
+async def serve(args) -> None:
+    analyzer = SpanAnalyzer(compact=args.compact, max_examples=args.max_examples,
+                            max_span_contexts=args.max_span_contexts)
+    receiver = OTLPReceiver(analyzer, args.output_file, args.queue_size, args.put_timeout, args.max_body)
+    consumer = asyncio.create_task(receiver.consume())
+    server = await asyncio.start_server(receiver.handle_connection, args.host, args.port)
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    if hasattr(signal, 'SIGUSR1'):
+        loop.add_signal_handler(signal.SIGUSR1,
+                                lambda: asyncio.ensure_future(receiver.write_snapshot())
+                                .add_done_callback(report_snapshot_failure))
+
+    print(f"Escuchando OTLP/HTTP JSON en http://{args.host}:{args.port}/v1/traces", file=sys.stderr)
+    print(f"POST /snapshot o SIGUSR1 para escribir {args.output_file}; Ctrl+C para terminar", file=sys.stderr)
+    async with server:
+        await stop.wait()
+        server.close()
+        await server.wait_closed()
+        await receiver.write_snapshot()
+        consumer.cancel()
+
+    stats = receiver.stats()
+    print(f"Spans analizados: {stats['spans']}", file=sys.stderr)
+    print(f"Atributos únicos encontrados: {stats['attributes']}", file=sys.stderr)
+    print(f"Patrones de span encontrados: {stats['span_patterns']}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receptor OTLP/HTTP JSON que genera un registry de weaver.")
+    parser.add_argument('output_file', help="Archivo YAML donde escribir el registry")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Puerto (default: {DEFAULT_PORT})")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Lotes pendientes antes de aplicar backpressure (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument('--put-timeout', type=float, default=DEFAULT_PUT_TIMEOUT,
+                        help=f"Segundos de espera con la cola llena antes de responder 503 (default: {DEFAULT_PUT_TIMEOUT})")
+    parser.add_argument('--max-body', type=int, default=DEFAULT_MAX_BODY, help="Tamaño máximo de petición en bytes")
+    parser.add_argument('--compact', action='store_true',
+                        help="Resumen de atributos con memoria acotada (muestra de ejemplos y cardinalidad estimada)")
+    parser.add_argument('--max-examples', type=int, default=DEFAULT_MAX_EXAMPLES,
+                        help=f"Ejemplos conservados por atributo en modo compacto (default: {DEFAULT_MAX_EXAMPLES})")
+    parser.add_argument('--max-span-contexts', type=int, default=DEFAULT_MAX_SPAN_CONTEXTS,
+                        help=f"Nombres de span conservados por atributo en modo compacto (default: {DEFAULT_MAX_SPAN_CONTEXTS})")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
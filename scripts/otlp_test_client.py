@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cliente OTLP/HTTP JSON de prueba: envía spans sintéticos a un receptor.
+
+Los spans salen del mismo generador que los benchmarks (synthetic_corpus.py),
+con atributos y valores tomados de ``model/``.
+
+Sirve para probar otlp_http_receiver.py (o cualquier receptor OTLP/HTTP) sin
+instrumentar una aplicación real. Respeta los 503/429 con ``Retry-After``.
+
+Uso:
+  python otlp_test_client.py --spans 10000 --batch 500 --url http://localhost:4318/v1/traces
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from itertools import islice
+from typing import Any, Dict, Iterable, List
+
+from synthetic_corpus import DEFAULT_CARDINALITY, generate_spans
+
+DEFAULT_URL = 'http://localhost:4318/v1/traces'
+
+# Nombre de SpanKind → valor del enum OTLP
+SPAN_KINDS = {'INTERNAL': 1, 'SERVER': 2, 'CLIENT': 3, 'PRODUCER': 4, 'CONSUMER': 5}
+
+
+def any_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, list):
+        return {'arrayValue': {'values': [any_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def key_values(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': any_value(value)} for key, value in attributes.items()]
+
+
+def build_request(rng: random.Random, spans: Iterable[Dict[str, Any]], service_name: str) -> Dict[str, Any]:
+    """ExportTraceServiceRequest JSON con spans planos de synthetic_corpus.py."""
+    otlp_spans = []
+    for span in spans:
+        attributes = {key: value for key, value in span['attributes'].items() if key != 'service.name'}
+        otlp_spans.append({
+            'traceId': '%032x' % rng.getrandbits(128),
+            'spanId': '%016x' % rng.getrandbits(64),
+            'name': span['name'],
+            'kind': SPAN_KINDS.get(span['kind'], 1),
+            'attributes': key_values(attributes),
+        })
+    return {'resourceSpans': [{
+        'resource': {'attributes': key_values({'service.name': service_name})},
+        'scopeSpans': [{'scope': {'name': 'otlp_test_client'}, 'spans': otlp_spans}],
+    }]}
+
+
+def send(url: str, payload: bytes, retries: int = 10) -> None:
+    request = urllib.request.Request(url, data=payload, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    for _ in range(retries):
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503):
+                raise
+            time.sleep(float(e.headers.get('Retry-After', '1')))
+    raise RuntimeError(f"El receptor rechazó el lote {retries} veces")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Envía spans sintéticos por OTLP/HTTP JSON.")
+    parser.add_argument('--url', default=DEFAULT_URL, help=f"Endpoint de trazas (default: {DEFAULT_URL})")
+    parser.add_argument('--spans', type=int, default=1000, help="Spans a enviar (default: 1000)")
+    parser.add_argument('--batch', type=int, default=200, help="Spans por petición (default: 200)")
+    parser.add_argument('--service-name', default='test-client', help="service.name del recurso")
+    parser.add_argument('--cardinality', type=int, default=DEFAULT_CARDINALITY,
+                        help=f"Valores distintos por atributo de texto/numérico (default: {DEFAULT_CARDINALITY})")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla para datos reproducibles")
+    parser.add_argument('--snapshot', action='store_true', help="Pide un snapshot del registry al terminar")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    spans = generate_spans(args.spans, args.seed, args.cardinality)
+    start = time.perf_counter()
+    sent = 0
+    try:
+        while sent < args.spans:
+            batch = list(islice(spans, args.batch))
+            send(args.url, json.dumps(build_request(rng, batch, args.service_name)).encode())
+            sent += len(batch)
+        if args.snapshot:
+            send(args.url.rsplit('/v1/traces', 1)[0] + '/snapshot', b'')
+    except (urllib.error.URLError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"Spans enviados: {sent} en {elapsed:.2f}s ({sent / elapsed:.0f} spans/s)")
+
+
+if __name__ == '__main__':
+    main()
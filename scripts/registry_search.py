@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Índice de búsqueda persistente sobre los atributos del modelo (``model/``).
+
+Alternativa en proceso a ``weaver registry search`` (receta ``search-term``
+del justfile) para scripts que hacen miles de consultas, por ejemplo para
+mapear atributos capturados a la entrada más parecida del registry.
+
+Cada atributo es un documento con varios campos: nombre, namespace, brief,
+note y miembros del enum (valor, id y brief). Los textos se tokenizan en
+listas invertidas y las consultas se puntúan con BM25 sobre frecuencias
+ponderadas por campo (una coincidencia en el nombre pesa más que en la
+note). Además:
+
+- los términos de la consulta que no existen en el vocabulario se amplían a
+  los términos más parecidos por trigramas (``mesage`` → ``message``);
+- la consulta completa se compara con los nombres de atributo, también por
+  trigramas (coeficiente de Dice de los conjuntos de trigramas), de modo que ``http_method`` o ``db.statment`` encuentran
+  ``http.method`` y ``db.statement`` aunque no compartan tokens exactos.
+
+El índice se guarda en el directorio de caché junto con el sha256 de cada
+YAML del modelo; cuando cambian archivos solo se vuelven a tokenizar los
+atributos de esos archivos y se reconstruyen las listas invertidas.
+
+Uso:
+  python registry_search.py http method
+  python registry_search.py --batch atributos_capturados.txt --json -k 3
+"""
+
+import argparse
+import json
+import math
+import os
+import pickle
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from deprecation_index import extract_replacement
+from semconv_model import DEFAULT_CACHE_DIR, DEFAULT_MODEL_DIR, load_registry, snapshot_path
+
+INDEX_FORMAT_VERSION = 2
+DEFAULT_TOP_K = 10
+
+# Peso de cada campo en la frecuencia de término de BM25
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'namespace': 1.5,
+    'enum': 1.0,
+    'brief': 1.0,
+    'note': 0.5,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Términos desconocidos: candidatos del vocabulario por trigramas y similitud mínima
+MAX_EXPANSIONS = 3
+MIN_TERM_SIMILARITY = 0.5
+# Nombres de atributo: similitud mínima y peso frente a BM25 (normalizado a 1)
+MIN_NAME_SIMILARITY = 0.5
+NAME_WEIGHT = 1.0
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+NAME_SEPARATORS_RE = re.compile(r'[^a-z0-9]+')
+STOPWORDS = frozenset('a an and are as at be by for from in is it of on or that the this to when which with'.split())
+
+
+def normalize_token(token: str) -> str:
+    """Singular aproximado (``requests`` → ``request``) para que las consultas no dependan del número."""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize_token(token) for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def normalize_name(name: str) -> str:
+    """``HTTP_Method`` → ``http.method``: nombres comparables sin importar el separador."""
+    return NAME_SEPARATORS_RE.sub('.', name.lower()).strip('.')
+
+
+def trigrams(text: str) -> set:
+    padded = f'#{text}#'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(shared: int, size: int, other_size: int) -> float:
+    """Coeficiente de Dice entre dos conjuntos de trigramas a partir de los comunes."""
+    return 2 * shared / (size + other_size) if size + other_size else 0.0
+
+
+def attribute_fields(attr_name: str, definition: Dict[str, Any]) -> Dict[str, str]:
+    """Textos indexados de un atributo, por campo."""
+    members = []
+    attr_type = definition.get('type')
+    if isinstance(attr_type, dict):
+        for member in attr_type.get('members') or []:
+            members.extend(str(member.get(key) or '') for key in ('id', 'value', 'brief'))
+    return {
+        'name': attr_name,
+        'namespace': attr_name.rsplit('.', 1)[0] if '.' in attr_name else '',
+        'brief': str(definition.get('brief') or ''),
+        'note': str(definition.get('note') or ''),
+        'enum': ' '.join(members),
+    }
+
+
+def build_document(attr_name: str, definition: Dict[str, Any]) -> Dict[str, Any]:
+    """Frecuencias ponderadas de términos y datos que se devuelven en cada resultado."""
+    frequencies = Counter()
+    for field, text in attribute_fields(attr_name, definition).items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            frequencies[token] += weight
+    deprecated = definition.get('deprecated')
+    return {
+        'file': definition.get('file'),
+        'terms': dict(frequencies),
+        'length': sum(frequencies.values()),
+        'brief': ' '.join(str(definition.get('brief') or '').split()),
+        'stability': definition.get('stability'),
+        'deprecated': bool(deprecated),
+        'replacement': extract_replacement(deprecated) if isinstance(deprecated, dict) else None,
+    }
+
+
+class RegistrySearchIndex:
+    """Listas invertidas BM25 y trigramas de nombres y vocabulario del modelo."""
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]], file_hashes: Dict[str, str], content_hash: str):
+        self.documents = documents
+        self.file_hashes = file_hashes
+        self.content_hash = content_hash
+        self._build()
+
+    def _build(self) -> None:
+        self.names = sorted(self.documents)
+        lengths = [self.documents[name]['length'] for name in self.names]
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        # Término → [(documento, frecuencia ponderada)]
+        postings = defaultdict(list)
+        for doc_id, name in enumerate(self.names):
+            for term, frequency in self.documents[name]['terms'].items():
+                postings[term].append((doc_id, frequency))
+        self.postings = dict(postings)
+        self.lengths = lengths
+        self.term_trigrams = self._trigram_index((term, term) for term in self.postings)
+        self.normalized_names = [normalize_name(name) for name in self.names]
+        self.name_trigrams = self._trigram_index(enumerate(self.normalized_names))
+        self.name_trigram_counts = [len(trigrams(name)) for name in self.normalized_names]
+
+    @staticmethod
+    def _trigram_index(items: Iterable[Tuple[Any, str]]) -> Dict[str, List]:
+        """Trigrama → claves (término o posición del nombre) cuyo texto lo contiene."""
+        index = defaultdict(list)
+        for key, text in items:
+            for trigram in trigrams(text):
+                index[trigram].append(key)
+        return dict(index)
+
+    def refresh(self, registry: Dict[str, Any]) -> int:
+        """Actualiza el índice con un registry nuevo; devuelve los atributos reindexados."""
+        file_hashes = registry['file_hashes']
+        changed_files = {path for path, digest in file_hashes.items() if self.file_hashes.get(path) != digest}
+        changed_files.update(path for path in self.file_hashes if path not in file_hashes)
+        attributes = registry['attributes']
+        documents = {name: document for name, document in self.documents.items()
+                     if name in attributes and document['file'] not in changed_files
+                     and attributes[name].get('file') == document['file']}
+        reindexed = 0
+        for name, definition in attributes.items():
+            if name not in documents:
+                documents[name] = build_document(name, definition)
+                reindexed += 1
+        self.documents = documents
+        self.file_hashes = dict(file_hashes)
+        self.content_hash = registry['content_hash']
+        self._build()
+        return reindexed
+
+    def expand_term(self, term: str) -> List[Tuple[str, float]]:
+        """El término, o los más parecidos del vocabulario si no existe, con su peso."""
+        if term in self.postings:
+            return [(term, 1.0)]
+        term_trigrams = trigrams(term)
+        shared = Counter()
+        for trigram in term_trigrams:
+            shared.update(self.term_trigrams.get(trigram, ()))
+        candidates = []
+        for candidate, count in shared.items():
+            similarity = dice(count, len(term_trigrams), len(trigrams(candidate)))
+            if similarity >= MIN_TERM_SIMILARITY:
+                candidates.append((candidate, similarity))
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+        return candidates[:MAX_EXPANSIONS]
+
+    def bm25_scores(self, terms: Iterable[Tuple[str, float]],
+                    term_scores: Optional[Dict[str, Dict[int, float]]] = None) -> Dict[int, float]:
+        """Puntuación BM25 por documento; ``term_scores`` memoiza la contribución de cada término."""
+        scores = defaultdict(float)
+        total = len(self.names)
+        for term, weight in terms:
+            contributions = term_scores.get(term) if term_scores is not None else None
+            if contributions is None:
+                postings = self.postings.get(term, ())
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                contributions = {}
+                for doc_id, frequency in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / self.average_length)
+                    contributions[doc_id] = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                if term_scores is not None:
+                    term_scores[term] = contributions
+            for doc_id, score in contributions.items():
+                scores[doc_id] += weight * score
+        return scores
+
+    def name_scores(self, query: str) -> Dict[int, float]:
+        """Similitud de la consulta completa con los nombres de atributo."""
+        name = normalize_name(query)
+        if not name:
+            return {}
+        name_trigrams = trigrams(name)
+        shared = Counter()
+        for trigram in name_trigrams:
+            shared.update(self.name_trigrams.get(trigram, ()))
+        counts = self.name_trigram_counts
+        scores = {}
+        for doc_id, count in shared.items():
+            similarity = dice(count, len(name_trigrams), counts[doc_id])
+            if similarity >= MIN_NAME_SIMILARITY:
+                scores[doc_id] = similarity
+        return scores
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K,
+               term_scores: Optional[Dict[str, Dict[int, float]]] = None) -> List[Dict[str, Any]]:
+        """Los ``k`` atributos más relevantes para ``query``."""
+        terms = []
+        for term in tokenize(query):
+            terms.extend(self.expand_term(term))
+        bm25 = self.bm25_scores(terms, term_scores)
+        best = max(bm25.values(), default=0.0)
+        scores = {doc_id: score / best for doc_id, score in bm25.items()} if best > 0 else {}
+        for doc_id, similarity in self.name_scores(query).items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + NAME_WEIGHT * similarity
+        top = sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]]))[:k]
+        return [self.hit(doc_id, score) for doc_id, score in top]
+
+    def search_many(self, queries: Iterable[str], k: int = DEFAULT_TOP_K) -> List[List[Dict[str, Any]]]:
+        """Varias consultas compartiendo el cálculo BM25 de los términos repetidos."""
+        term_scores = {}
+        return [self.search(query, k, term_scores) for query in queries]
+
+    def hit(self, doc_id: int, score: float) -> Dict[str, Any]:
+        name = self.names[doc_id]
+        document = self.documents[name]
+        return {
+            'attribute': name,
+            'score': round(score, 4),
+            'brief': document['brief'],
+            'stability': document['stability'],
+            'deprecated': document['deprecated'],
+            'replacement': document['replacement'],
+        }
+
+
+def build_index(registry: Dict[str, Any]) -> RegistrySearchIndex:
+    documents = {name: build_document(name, definition) for name, definition in registry['attributes'].items()}
+    return RegistrySearchIndex(documents, registry['file_hashes'], registry['content_hash'])
+
+
+def index_path(model_dir: str, cache_dir: str) -> str:
+    """Junto al snapshot del modelo, con la misma clave por directorio."""
+    return snapshot_path(model_dir, cache_dir).replace('model-snapshot-', 'search-index-')
+
+
+def load_search_index(model_dir: str = DEFAULT_MODEL_DIR,
+                      cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                      rebuild: bool = False) -> RegistrySearchIndex:
+    """Carga el índice de la caché y lo actualiza con los archivos del modelo que cambiaron."""
+    registry = load_registry(model_dir, cache_dir, rebuild=rebuild)
+    if cache_dir is None:
+        return build_index(registry)
+
+    cache_file = index_path(model_dir, cache_dir)
+    index = None
+    if not rebuild and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            cached = None
+        # Solo datos planos en disco: el pickle no depende de si la clase se
+        # importó desde la CLI (``__main__``) o como módulo
+        if isinstance(cached, dict) and cached.get('format') == INDEX_FORMAT_VERSION:
+            index = RegistrySearchIndex(cached['documents'], cached['file_hashes'], cached['content_hash'])
+    if index is not None and index.content_hash == registry['content_hash']:
+        return index
+
+    if index is None:
+        index = build_index(registry)
+    else:
+        index.refresh(registry)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump({'format': INDEX_FORMAT_VERSION, 'documents': index.documents,
+                     'file_hashes': index.file_hashes, 'content_hash': index.content_hash},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    return index
+
+
+def read_queries(path: str) -> List[str]:
+    """Una consulta por línea (``-`` para stdin); se ignoran las líneas vacías."""
+    f = sys.stdin if path == '-' else open(path, 'r')
+    try:
+        return [line.strip() for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca atributos del modelo con un índice BM25 cacheado.")
+    parser.add_argument('query', nargs='*', help="Términos de búsqueda o nombre de atributo")
+    parser.add_argument('--batch', metavar='ARCHIVO', help="Archivo con una consulta por línea ('-' para stdin)")
+    parser.add_argument('-k', type=int, default=DEFAULT_TOP_K, help=f"Resultados por consulta (default: {DEFAULT_TOP_K})")
+    parser.add_argument('--json', action='store_true', help="Salida JSON-lines: {\"query\": ..., \"hits\": [...]}")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directorio de caché")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora el índice existente")
+    args = parser.parse_args()
+
+    queries = read_queries(args.batch) if args.batch else []
+    if args.query:
+        queries.append(' '.join(args.query))
+    if not queries:
+        parser.error("Indica una consulta o --batch")
+
+    start = time.perf_counter()
+    try:
+        index = load_search_index(args.model_dir, args.cache_dir, rebuild=args.rebuild)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    loaded = time.perf_counter()
+    results = index.search_many(queries, args.k)
+    elapsed = time.perf_counter() - loaded
+
+    for query, hits in zip(queries, results):
+        if args.json:
+            print(json.dumps({'query': query, 'hits': hits}, ensure_ascii=False))
+            continue
+        print(f"{query}:")
+        for hit in hits:
+            deprecated = ''
+            if hit['deprecated']:
+                deprecated = f" [deprecado → {hit['replacement']}]" if hit['replacement'] else ' [deprecado]'
+            print(f"  {hit['score']:6.3f}  {hit['attribute']}{deprecated}  {hit['brief'][:80]}")
+    print(f"{len(queries)} consultas en {elapsed * 1000:.1f} ms (índice cargado en "
+          f"{(loaded - start) * 1000:.1f} ms, {len(index.names)} atributos)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de las herramientas de scripts/.
+
+Genera (o reutiliza) un corpus sintético reproducible con synthetic_corpus.py
+y mide, cada caso en un proceso hijo propio para aislar el pico de memoria:
+
+- ``analyze_exact`` / ``analyze_compact``: spans/seg de generate_registry_from_spans.py
+- ``analyze_unbatched``: el análisis exacto recorriendo span a span (``batch_size=0``),
+  para comparar con el procesamiento por bloques de ``analyze_exact``
+- ``analyze_protobuf``: el mismo análisis leyendo el corpus como OTLP protobuf
+- ``analyze_store``: el mismo análisis sobre el almacén columnar (capture_store.py)
+- ``analyze_sampled``: el análisis con muestreo estratificado al 1% (span_sampling.py)
+- ``registry_yaml``: análisis + generación y volcado del registry YAML
+- ``filter_batch`` / ``filter_stream``: violations/seg de filter_sdk_lag.py
+- ``startup_cold`` / ``startup_warm``: arranque de filter_sdk_lag.py con la
+  caché de modelo e índices (deprecados y áreas) vacía y ya poblada
+
+Los resultados se guardan en JSON (commit, parámetros y, por caso, items,
+segundos, items/seg y pico de RSS) para comparar ejecuciones con ``--compare``.
+
+Uso:
+  python run_benchmarks.py --spans 200000 --violations 200000 -o bench.json
+  python run_benchmarks.py -o after.json --compare bench.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stage_profiler import peak_rss_mb
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPANS = 200_000
+DEFAULT_VIOLATIONS = 200_000
+DEFAULT_REPEAT = 3
+
+
+def bench_analyze(corpus: Dict[str, str], compact: bool, capture: str = 'spans', **options) -> int:
+    from generate_registry_from_spans import analyze_file
+    return analyze_file(corpus[capture], compact=compact, **options)['span_count']
+
+
+def bench_registry_yaml(corpus: Dict[str, str]) -> int:
+    from generate_registry_from_spans import analyze_file, write_registry_file
+    analysis = analyze_file(corpus['spans'])
+    write_registry_file(analysis, os.path.join(corpus['dir'], 'registry.yaml'))
+    return analysis['span_count']
+
+
+def bench_filter_batch(corpus: Dict[str, str]) -> int:
+    from deprecation_index import load_deprecation_index
+    from filter_sdk_lag import filter_known_sdk_lag_violations
+    with open(corpus['violations'], 'r') as f:
+        analysis_data = json.load(f)
+    filter_known_sdk_lag_violations(analysis_data, load_deprecation_index())
+    return len(analysis_data['violations'])
+
+
+def bench_filter_stream(corpus: Dict[str, str]) -> int:
+    from deprecation_index import load_deprecation_index
+    from filter_sdk_lag import stream_filter_violations
+    from json_stream import open_capture
+    with open_capture(corpus['violations']) as f:
+        result = stream_filter_violations(f, io.StringIO(), load_deprecation_index())
+    return result['summary']['total_violations']
+
+
+BENCHMARKS: Dict[str, Tuple[str, Callable[[Dict[str, str]], int]]] = {
+    'analyze_exact': ('spans', lambda corpus: bench_analyze(corpus, compact=False)),
+    'analyze_compact': ('spans', lambda corpus: bench_analyze(corpus, compact=True)),
+    'analyze_unbatched': ('spans', lambda corpus: bench_analyze(corpus, compact=False, batch_size=0)),
+    'analyze_protobuf': ('spans', lambda corpus: bench_analyze(corpus, compact=False, capture='spans_protobuf')),
+    'analyze_store': ('spans', lambda corpus: bench_analyze(corpus, compact=False, capture='spans_store')),
+    'analyze_sampled': ('spans', lambda corpus: bench_analyze(corpus, compact=False, sample_rate=0.01)),
+    'registry_yaml': ('spans', bench_registry_yaml),
+    'filter_batch': ('violations', bench_filter_batch),
+    'filter_stream': ('violations', bench_filter_stream),
+}
+
+
+def run_in_child(name: str, corpus: Dict[str, str]) -> Dict[str, Any]:
+    """Se ejecuta en un proceso hijo recién creado: el pico de RSS es solo de este caso."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    unit, function = BENCHMARKS[name]
+    start = time.perf_counter()
+    items = function(corpus)
+    seconds = time.perf_counter() - start
+    return {'unit': unit, 'items': items, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_benchmark(name: str, corpus: Dict[str, str], repeat: int) -> Dict[str, Any]:
+    """Mejor de ``repeat`` ejecuciones, cada una en un proceso ``spawn`` nuevo."""
+    runs = []
+    context = multiprocessing.get_context('spawn')
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(run_in_child, name, corpus).result())
+    best = min(runs, key=lambda run: run['seconds'])
+    return {
+        **best,
+        'items_per_second': best['items'] / best['seconds'],
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'all_seconds': [run['seconds'] for run in runs],
+    }
+
+
+def measure_startup(cache_dir: str, repeat: int, cold: bool = False) -> Dict[str, Any]:
+    """Tiempo hasta tener filter_sdk_lag.py importado y sus índices (deprecados y áreas) cargados.
+
+    Con ``cold`` cada ejecución usa una caché vacía, de modo que incluye
+    parsear model/ y construir los índices.
+    """
+    times = []
+    for run in range(repeat):
+        run_cache_dir = os.path.join(cache_dir, f'cold-{run}') if cold else cache_dir
+        code = ('import filter_sdk_lag, deprecation_index, area_index; '
+                'deprecation_index.load_deprecation_index(cache_dir=%r); '
+                'area_index.load_area_index(cache_dir=%r)' % (run_cache_dir, run_cache_dir))
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True)
+        times.append(time.perf_counter() - start)
+    return {'unit': 'runs', 'items': 1, 'seconds': min(times), 'items_per_second': 1 / min(times),
+            'peak_rss_mb': None, 'all_seconds': times}
+
+
+def generate_corpus(corpus_dir: str, spans: int, violations: int, seed: int, cardinality: int) -> Dict[str, str]:
+    from capture_store import build_store
+    from synthetic_corpus import generate_spans, generate_violations, write_spans, write_violations
+    corpus = {
+        'dir': corpus_dir,
+        'spans': os.path.join(corpus_dir, f'spans-{spans}-{cardinality}-{seed}.jsonl.gz'),
+        'spans_protobuf': os.path.join(corpus_dir, f'spans-{spans}-{cardinality}-{seed}.pb'),
+        'spans_store': os.path.join(corpus_dir, f'spans-{spans}-{cardinality}-{seed}.spanstore'),
+        'violations': os.path.join(corpus_dir, f'violations-{violations}-{seed}.json'),
+    }
+    os.makedirs(corpus_dir, exist_ok=True)
+    if not os.path.exists(corpus['spans']):
+        write_spans(corpus['spans'], generate_spans(spans, seed, cardinality))
+    if not os.path.exists(corpus['spans_protobuf']):
+        write_spans(corpus['spans_protobuf'], generate_spans(spans, seed, cardinality))
+    if not os.path.exists(corpus['spans_store']):
+        build_store([corpus['spans_protobuf']], corpus['spans_store'])
+    if not os.path.exists(corpus['violations']):
+        write_violations(corpus['violations'], generate_violations(violations, seed))
+    return corpus
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None):
+    header = f"{'caso':<18} {'items/s':>14} {'segundos':>9} {'RSS MB':>8}"
+    print(header + ('  vs base' if baseline else ''))
+    print('-' * (len(header) + (9 if baseline else 0)))
+    for name, result in results.items():
+        rss = f"{result['peak_rss_mb']:8.1f}" if result['peak_rss_mb'] is not None else f"{'-':>8}"
+        line = f"{name:<18} {result['items_per_second']:14,.0f} {result['seconds']:9.3f} {rss}"
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += f"  x{result['items_per_second'] / previous['items_per_second']:.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de las herramientas de scripts/ sobre un corpus sintético.")
+    parser.add_argument('--spans', type=int, default=DEFAULT_SPANS, help=f"Spans del corpus (default: {DEFAULT_SPANS})")
+    parser.add_argument('--violations', type=int, default=DEFAULT_VIOLATIONS,
+                        help=f"Violations del corpus (default: {DEFAULT_VIOLATIONS})")
+    parser.add_argument('--cardinality', type=int, default=1000, help="Valores distintos por atributo (default: 1000)")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla del corpus (default: 42)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f"Ejecuciones por caso; se guarda la mejor (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--only', help="Casos a ejecutar, separados por comas (default: todos)")
+    parser.add_argument('--corpus-dir', help="Directorio donde generar/reutilizar el corpus (default: temporal)")
+    parser.add_argument('--output', '-o', help="Archivo JSON de resultados")
+    parser.add_argument('--compare', help="Resultados JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    names: List[str] = list(BENCHMARKS) + ['startup_cold', 'startup_warm']
+    if args.only:
+        selected = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in selected if name not in names]
+        if unknown:
+            print(f"Error: casos desconocidos: {', '.join(unknown)} (disponibles: {', '.join(names)})",
+                  file=sys.stderr)
+            sys.exit(1)
+        names = selected
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+
+    with tempfile.TemporaryDirectory(prefix='semconv-bench-') as tmp_dir:
+        corpus_dir = args.corpus_dir or tmp_dir
+        print(f"Corpus: {args.spans} spans, {args.violations} violations en {corpus_dir}", file=sys.stderr)
+        corpus = generate_corpus(corpus_dir, args.spans, args.violations, args.seed, args.cardinality)
+
+        results = {}
+        for name in names:
+            print(f"  {name}...", file=sys.stderr)
+            if name == 'startup_cold':
+                results[name] = measure_startup(tmp_dir, args.repeat, cold=True)
+            elif name == 'startup_warm':
+                cache_dir = os.path.join(tmp_dir, 'warm-cache')
+                measure_startup(cache_dir, 1)
+                results[name] = measure_startup(cache_dir, args.repeat)
+            else:
+                results[name] = run_benchmark(name, corpus, args.repeat)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'spans': args.spans, 'violations': args.violations, 'cardinality': args.cardinality,
+                   'seed': args.seed, 'repeat': args.repeat},
+        'results': results,
+    }
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
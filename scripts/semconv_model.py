@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Carga compartida del modelo de semantic conventions (``model/``).
+
+Los YAML se parsean con ``CSafeLoader`` cuando PyYAML tiene las extensiones
+en C. El resultado se guarda en un snapshot binario (pickle) junto con el
+mtime, tamaño y sha256 de cada archivo; en la siguiente carga solo se vuelven
+a parsear los archivos que cambiaron, y si ninguno cambió el registry resuelto
+se devuelve directamente desde el snapshot.
+
+Uso:
+  python semconv_model.py [--model-dir model] [--rebuild]
+"""
+
+import argparse
+import errno
+import hashlib
+import os
+import pickle
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import yaml
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPT_DIR)
+DEFAULT_MODEL_DIR = os.path.join(REPO_ROOT, 'model')
+DEFAULT_CACHE_DIR = os.environ.get('SEMCONV_CACHE_DIR', os.path.join(REPO_ROOT, '.cache', 'semconv'))
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_yaml(path: str) -> Any:
+    """Parsea un YAML con el loader más rápido disponible."""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=Loader)
+
+
+def iter_files(directory: str, suffix: str = '') -> Iterator[str]:
+    """Recorre ``directory`` en orden estable."""
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(suffix):
+                yield os.path.join(root, name)
+
+
+def model_dir_key(model_dir: str) -> str:
+    """Clave del directorio del modelo para los archivos de caché que dependen de él."""
+    return hashlib.sha256(os.path.abspath(model_dir).encode()).hexdigest()[:16]
+
+
+def snapshot_path(model_dir: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f'model-snapshot-{model_dir_key(model_dir)}.pickle')
+
+
+def resolve_registry(files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Construye las tablas del registry a partir de los documentos parseados."""
+    attributes = {}
+    groups = {}
+    enums = {}
+    deprecations = {}
+
+    for rel_path, entry in files.items():
+        for group in (entry['document'] or {}).get('groups') or []:
+            group_id = group.get('id')
+            if not group_id:
+                continue
+            groups[group_id] = dict(group, file=rel_path)
+            for attribute in group.get('attributes') or []:
+                attr_id = attribute.get('id')
+                if not attr_id:
+                    continue  # referencias (ref) a atributos definidos en otro grupo
+                attributes[attr_id] = dict(attribute, group=group_id, file=rel_path)
+                attr_type = attribute.get('type')
+                if isinstance(attr_type, dict) and 'members' in attr_type:
+                    enums[attr_id] = [member.get('value') for member in attr_type['members'] or []]
+                if attribute.get('deprecated'):
+                    deprecations[attr_id] = attribute['deprecated']
+
+    return {
+        'attributes': attributes,
+        'groups': groups,
+        'enums': enums,
+        'deprecations': deprecations,
+        'file_hashes': {rel_path: entry['sha256'] for rel_path, entry in files.items()},
+    }
+
+
+def content_hash(files: Dict[str, Dict[str, Any]]) -> str:
+    """Hash del contenido del modelo a partir de los sha256 por archivo."""
+    digest = hashlib.sha256(f'v{SNAPSHOT_FORMAT_VERSION}'.encode())
+    for rel_path in sorted(files):
+        digest.update(rel_path.encode())
+        digest.update(files[rel_path]['sha256'].encode())
+    return digest.hexdigest()
+
+
+def load_registry(model_dir: str = DEFAULT_MODEL_DIR,
+                  cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                  rebuild: bool = False) -> Dict[str, Any]:
+    """Devuelve el registry resuelto del modelo, reutilizando el snapshot si es posible.
+
+    El resultado contiene ``attributes``, ``groups``, ``enums``,
+    ``deprecations``, ``file_hashes`` (sha256 por archivo, para índices
+    derivados que se actualizan por archivo), ``content_hash`` y ``stats``
+    (archivos reparseados).
+    """
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(errno.ENOENT, "No se encuentra el directorio del modelo", model_dir)
+
+    snapshot = None
+    snapshot_file = snapshot_path(model_dir, cache_dir) if cache_dir else None
+    if snapshot_file and not rebuild and os.path.exists(snapshot_file):
+        try:
+            with open(snapshot_file, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            snapshot = None
+        if snapshot is not None and snapshot.get('format') != SNAPSHOT_FORMAT_VERSION:
+            snapshot = None
+    previous = snapshot['files'] if snapshot else {}
+
+    files = {}
+    parsed = 0
+    changed = snapshot is None
+    for path in iter_files(model_dir, '.yaml'):
+        rel_path = os.path.relpath(path, model_dir)
+        stat = os.stat(path)
+        entry = previous.get(rel_path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            files[rel_path] = entry
+            continue
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        if entry and entry['sha256'] == sha256:
+            document = entry['document']
+        else:
+            document = yaml.load(data, Loader=Loader)
+            parsed += 1
+        files[rel_path] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha256,
+            'document': document,
+        }
+        changed = True
+
+    same_files = set(files) == set(previous)
+    changed = changed or not same_files
+    if snapshot is not None and parsed == 0 and same_files:
+        registry = snapshot['registry']
+    else:
+        registry = resolve_registry(files)
+        registry['content_hash'] = content_hash(files)
+
+    if snapshot_file and changed:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f'{snapshot_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({'format': SNAPSHOT_FORMAT_VERSION, 'files': files, 'registry': registry},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, snapshot_file)
+
+    return dict(registry, stats={'files': len(files), 'parsed': parsed})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga el modelo y actualiza el snapshot cacheado.")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directorio de caché")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora el snapshot existente")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        registry = load_registry(args.model_dir, args.cache_dir, rebuild=args.rebuild)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"Archivos YAML: {registry['stats']['files']} ({registry['stats']['parsed']} parseados)")
+    print(f"Grupos: {len(registry['groups'])}")
+    print(f"Atributos: {len(registry['attributes'])} ({len(registry['enums'])} enums, "
+          f"{len(registry['deprecations'])} deprecados)")
+    print(f"Hash del modelo: {registry['content_hash'][:16]}")
+    print(f"Tiempo de carga: {elapsed * 1000:.1f} ms (loader: {Loader.__name__})")
+
+
+if __name__ == '__main__':
+    main()
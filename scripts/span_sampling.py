@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Muestreo estratificado de spans para inferir ``requirement_level`` sin
+analizar toda la captura.
+
+Cada patrón de span (plantilla de nombre) es un estrato. De cada patrón se
+analizan todos los spans hasta tener ``min_samples`` y hasta que la decisión
+de sus atributos principales es firme; a partir de ahí solo una fracción
+``rate`` de los spans, elegidos al azar. Así los patrones poco frecuentes se
+analizan completos y los masivos cuestan una fracción de una pasada completa.
+
+La proporción de spans del patrón que llevan cada atributo se estima con el
+intervalo de Wilson al nivel de confianza indicado. Un atributo es
+``required`` cuando la cota inferior alcanza el umbral (80%) y no lo es cuando
+la cota superior queda por debajo; si el intervalo contiene el umbral, la
+decisión se toma con la estimación puntual solo cuando la semiamplitud es como
+mucho ``margin``. Mientras algún atributo principal de un patrón siga sin
+decidir, el patrón vuelve a analizarse completo.
+
+La estimación supone que la presencia de un atributo no depende de la
+posición del span en la captura (la instrumentación no cambia a mitad de
+captura), de modo que los spans analizados completos al principio y los
+muestreados después son intercambiables.
+"""
+
+import argparse
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_MIN_SAMPLES = 500
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_MARGIN = 0.02
+REQUIRED_THRESHOLD = 0.8
+# Atributos por patrón que acaban en el grupo de span del registry
+TOP_ATTRIBUTES = 10
+# Crecimiento de la muestra de un patrón entre dos comprobaciones de sus intervalos
+CHECK_GROWTH = 1.1
+
+# Opciones de análisis que activan y configuran el muestreo
+SAMPLING_OPTIONS = ('sample_rate', 'min_samples', 'confidence', 'margin')
+
+
+def z_score(confidence: float) -> float:
+    """Cuantil normal bilateral (0.95 → 1.96)."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: int, n: int, z: float) -> Tuple[float, float]:
+    """Intervalo de Wilson para una proporción; ``(0, 1)`` sin observaciones."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = successes / n
+    z2 = z * z
+    denominator = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denominator
+    half_width = z * ((p * (1 - p) / n + z2 / (4 * n * n)) ** 0.5) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def presence_decision(count: int, n: int, z: float, margin: float,
+                      threshold: float = REQUIRED_THRESHOLD) -> Optional[bool]:
+    """¿La proporción real alcanza ``threshold``? ``None`` si aún no se puede decidir."""
+    lower, upper = wilson_interval(count, n, z)
+    if lower >= threshold:
+        return True
+    if upper < threshold:
+        return False
+    if (upper - lower) / 2 <= margin:
+        return count >= n * threshold
+    return None
+
+
+class StratifiedSampler:
+    """Decide qué spans de cada patrón se analizan.
+
+    El estado por estrato es ``[vistos, analizados, firme, próxima comprobación]``.
+    Quien analiza llama a ``sample`` (o ``keep`` span a span) y, cuando
+    ``needs_check`` lo indica, a ``update`` con los conteos de atributos del
+    patrón para saber si ya puede muestrearlo.
+    """
+
+    def __init__(self, rate: float = DEFAULT_SAMPLE_RATE,
+                 min_samples: int = DEFAULT_MIN_SAMPLES,
+                 confidence: float = DEFAULT_CONFIDENCE,
+                 margin: float = DEFAULT_MARGIN,
+                 seed: int = 0):
+        if not 0 < rate <= 1:
+            raise ValueError(f"La tasa de muestreo debe estar en (0, 1]: {rate}")
+        if not 0 < confidence < 1:
+            raise ValueError(f"El nivel de confianza debe estar en (0, 1): {confidence}")
+        self.rate = rate
+        self.min_samples = min_samples
+        self.confidence = confidence
+        self.margin = margin
+        self.z = z_score(confidence)
+        self.random = random.Random(seed).random
+        self.strata: Dict[int, List] = {}
+
+    def _stratum(self, stratum: int) -> List:
+        state = self.strata.get(stratum)
+        if state is None:
+            state = self.strata[stratum] = [0, 0, False, self.min_samples]
+        return state
+
+    def _sampling(self, state: List) -> bool:
+        return state[2] and state[1] >= self.min_samples
+
+    def keep(self, stratum: int) -> bool:
+        state = self._stratum(stratum)
+        state[0] += 1
+        if self._sampling(state) and self.random() >= self.rate:
+            return False
+        state[1] += 1
+        return True
+
+    def sample(self, stratum: int, spans: List) -> List:
+        state = self._stratum(stratum)
+        state[0] += len(spans)
+        if self._sampling(state):
+            rate, rand = self.rate, self.random
+            spans = [span for span in spans if rand() < rate]
+        state[1] += len(spans)
+        return spans
+
+    def needs_check(self, stratum: int) -> bool:
+        state = self.strata.get(stratum)
+        return state is not None and state[1] >= state[3]
+
+    def update(self, stratum: int, counts: Dict[str, int], n: int) -> bool:
+        """Recalcula si el patrón está decidido con los conteos de su muestra."""
+        state = self._stratum(stratum)
+        top = sorted(counts.values(), reverse=True)[:TOP_ATTRIBUTES]
+        state[2] = all(presence_decision(count, n, self.z, self.margin) is not None for count in top)
+        state[3] = max(int(state[1] * CHECK_GROWTH) + 1, self.min_samples)
+        return state[2]
+
+    def population(self, stratum: int) -> int:
+        return self.strata[stratum][0] if stratum in self.strata else 0
+
+    def summary(self) -> Dict:
+        """Parámetros del muestreo que acompañan al análisis."""
+        return {
+            'rate': self.rate,
+            'min_samples': self.min_samples,
+            'confidence': self.confidence,
+            'margin': self.margin,
+            'sampled_spans': sum(state[1] for state in self.strata.values()),
+        }
+
+
+def presence_note(count: int, n: int, population: int, sampling: Dict) -> str:
+    """Base estadística de la decisión de un atributo, para el ``note`` del registry."""
+    if n >= population:
+        return f'Presente en {count} de {n} spans (todos analizados).'
+    lower, upper = wilson_interval(count, n, z_score(sampling['confidence']))
+    decision = presence_decision(count, n, z_score(sampling['confidence']), sampling['margin'])
+    note = (f'Presente en {count} de {n} spans muestreados de {population} ({count / n:.1%}, '
+            f'IC {sampling["confidence"]:.0%}: {lower:.1%}–{upper:.1%}).')
+    if decision is None:
+        note += ' Sin decidir: el intervalo contiene el umbral del 80%.'
+    return note
+
+
+def parse_rate(text: str) -> float:
+    """Tasa de muestreo en (0, 1] para argparse."""
+    rate = float(text)
+    if not 0 < rate <= 1:
+        raise argparse.ArgumentTypeError(f"La tasa de muestreo debe estar en (0, 1]: {text}")
+    return rate
+
+
+def parse_confidence(text: str) -> float:
+    """Nivel de confianza en (0, 1) para argparse."""
+    confidence = float(text)
+    if not 0 < confidence < 1:
+        raise argparse.ArgumentTypeError(f"El nivel de confianza debe estar en (0, 1): {text}")
+    return confidence
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Agrupación de nombres de span en plantillas, al estilo de los parsers de logs
+de árbol de prefijos de profundidad fija (Drain).
+
+Cada nombre se parte en palabras y separadores (espacios, ``/``, ``=``...);
+las palabras variables (números, UUIDs, hexadecimales, IPs y literales entre
+comillas) se sustituyen por ``<*>`` y el nombre se asigna a una plantilla:
+
+  GET /users/8812          → GET /users/<*>
+  SELECT * FROM t WHERE id = 'a' → SELECT * FROM t WHERE id = <*>
+
+La búsqueda baja por un árbol indexado por número de palabras y por las
+primeras ``depth`` palabras, y en la hoja compara solo con unas pocas
+plantillas, así que el coste por nombre es prácticamente constante. Dos
+nombres de la misma forma se funden si coinciden en al menos ``similarity``
+de sus palabras; las posiciones distintas pasan a ``<*>``. El número de
+plantillas está acotado por ``max_templates``, contando la única plantilla de
+desbordamiento, ``OVERFLOW_TEMPLATE``: con ``max_templates - 1`` plantillas
+normales, los nombres nuevos se asignan a la más parecida de su hoja o a la de
+desbordamiento.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+WILDCARD = '<*>'
+OVERFLOW_TEMPLATE = WILDCARD
+DEFAULT_MAX_TEMPLATES = 1000
+DEFAULT_DEPTH = 3
+DEFAULT_SIMILARITY = 0.6
+DEFAULT_MAX_CHILDREN = 64
+# Nombres ya resueltos que se recuerdan antes de vaciar la caché
+NAME_CACHE_SIZE = 100_000
+
+QUOTED_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+SEPARATORS_RE = re.compile(r'([\s/=?&,;:()\[\]]+)')
+VARIABLE_RE = re.compile(
+    r'[+-]?\d+(?:[.,]\d+)*'                                                  # números, IPs, versiones
+    r'|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'  # UUIDs
+    r'|0[xX][0-9a-fA-F]+'
+    r'|(?=[a-fA-F]*\d)[0-9a-fA-F]{8,}'                                        # ids hexadecimales
+    r'|<\*>'
+)
+
+
+def tokenize(span_name: str) -> List[str]:
+    """Parte un nombre en ``[palabra, separador, palabra, ...]`` con las variables enmascaradas.
+
+    Las palabras quedan en las posiciones pares y los separadores en las
+    impares, de modo que ``''.join(tokens)`` reconstruye el nombre.
+    """
+    tokens = SEPARATORS_RE.split(QUOTED_RE.sub(WILDCARD, span_name))
+    tokens[::2] = [WILDCARD if VARIABLE_RE.fullmatch(word) else word for word in tokens[::2]]
+    return tokens
+
+
+class SpanTemplate:
+    __slots__ = ('id', 'tokens')
+
+    def __init__(self, template_id: int, tokens: List[str]):
+        self.id = template_id
+        self.tokens = tokens
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> float:
+        """Fracción de palabras iguales; 0 si los separadores no coinciden."""
+        if self.tokens[1::2] != tokens[1::2]:
+            return 0.0
+        words = self.tokens[::2]
+        equal = sum(1 for own, other in zip(words, tokens[::2]) if own == other or own == WILDCARD)
+        return equal / len(words)
+
+    def absorb(self, tokens: List[str]) -> None:
+        for i in range(0, len(tokens), 2):
+            if self.tokens[i] != tokens[i]:
+                self.tokens[i] = WILDCARD
+
+
+class SpanNameTemplater:
+    """Asigna nombres de span a un conjunto acotado de plantillas.
+
+    ``assign(name)`` devuelve el id de la plantilla; ``template(id)`` su texto
+    actual, que puede generalizarse a medida que llegan nombres nuevos (por eso
+    quien acumule datos por plantilla debe indexar por id y resolver el texto
+    al final).
+    """
+
+    def __init__(self, max_templates: int = DEFAULT_MAX_TEMPLATES,
+                 depth: int = DEFAULT_DEPTH,
+                 similarity: float = DEFAULT_SIMILARITY,
+                 max_children: int = DEFAULT_MAX_CHILDREN):
+        if max_templates < 2:
+            raise ValueError(f"max_templates debe ser al menos 2 (una plantilla y la de desbordamiento): "
+                             f"{max_templates}")
+        self.max_templates = max_templates
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.templates: List[SpanTemplate] = []
+        self.tree: Dict = {}
+        self.cache: Dict[str, int] = {}
+        self.overflow_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def template(self, template_id: int) -> str:
+        return self.templates[template_id].text
+
+    def assign(self, span_name: str) -> int:
+        template_id = self.cache.get(span_name)
+        if template_id is None:
+            template_id = self._assign_tokens(tokenize(span_name))
+            if len(self.cache) >= NAME_CACHE_SIZE:
+                self.cache.clear()
+            self.cache[span_name] = template_id
+        return template_id
+
+    def assign_covered(self, span_name: str) -> int:
+        """Como ``assign``, pero reutiliza una plantilla existente que ya cubra el nombre.
+
+        El árbol indexa por palabras literales, así que ``GET /users/me`` no
+        llega a la hoja de ``GET /users/<*>``. Para fundir plantillas ya
+        generalizadas (de análisis parciales) se busca antes entre las
+        plantillas con los mismos separadores una en la que cada palabra
+        coincida o sea ``<*>``.
+        """
+        tokens = tokenize(span_name)
+        for template in self.templates:
+            if template.id != self.overflow_id and template.similarity(tokens) == 1.0:
+                return template.id
+        return self.assign(span_name)
+
+    def _leaf(self, tokens: List[str]) -> List[SpanTemplate]:
+        node = self.tree.setdefault(len(tokens), {})
+        for word in tokens[:2 * self.depth:2]:
+            if word in node:
+                node = node[word]
+            elif len(node) < self.max_children and not any(c.isdigit() for c in word):
+                node = node.setdefault(word, {})
+            else:
+                node = node.setdefault(WILDCARD, {})
+        return node.setdefault(None, [])
+
+    def _assign_tokens(self, tokens: List[str]) -> int:
+        leaf = self._leaf(tokens)
+        best, best_similarity = None, -1.0
+        for candidate in leaf:
+            candidate_similarity = candidate.similarity(tokens)
+            if candidate_similarity > best_similarity:
+                best, best_similarity = candidate, candidate_similarity
+        if best is not None and best_similarity >= self.similarity:
+            best.absorb(tokens)
+            # Los nombres cacheados siguen apuntando a ``best``, que ahora es más general
+            return best.id
+
+        # Se reserva un hueco para la plantilla de desbordamiento dentro de ``max_templates``
+        if len(self.templates) < self.max_templates - 1:
+            template = SpanTemplate(len(self.templates), list(tokens))
+            self.templates.append(template)
+            leaf.append(template)
+            return template.id
+
+        if best is not None and best_similarity > 0:
+            best.absorb(tokens)
+            return best.id
+        return self._overflow()
+
+    def _overflow(self) -> int:
+        if self.overflow_id is None:
+            self.overflow_id = len(self.templates)
+            self.templates.append(SpanTemplate(self.overflow_id, [OVERFLOW_TEMPLATE]))
+        return self.overflow_id
+
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Perfilado por etapas de los scripts de spans y violations (``--profile``).
+
+Cada etapa (``with profiler.stage('analyze') as stage``) registra tiempo de
+reloj y de CPU, elementos procesados y elementos/seg, y el pico de RSS del
+proceso al terminarla. Las etapas pueden anidarse; el tiempo propio de una
+etapa descuenta el de sus hijas. ``timed_iter`` y ``timed_writer`` atribuyen
+a una etapa hija el tiempo que se pasa dentro de un iterador (por ejemplo
+decodificando JSON) o escribiendo en un archivo, aunque se intercale con el
+trabajo de la etapa padre.
+
+Con ``--profile-allocations`` se activa tracemalloc y cada etapa guarda el
+pico de memoria trazada y las líneas que más memoria retienen al terminar.
+Con ``--profile-otlp ARCHIVO`` el resultado se añade al archivo como una
+línea de OTLP/JSON con un span por etapa y otra con métricas, el formato del
+file exporter del collector, para comparar ejecuciones a lo largo del tiempo.
+
+Uso:
+  python generate_registry_from_spans.py captura.jsonl.gz registry.yaml --profile
+  python filter_sdk_lag.py analysis.json --aggregate --profile --profile-otlp perfil.jsonl
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_TOP_ALLOCATIONS = 5
+TRACEMALLOC_FRAMES = 1
+SCOPE_NAME = 'semconv.scripts.stage_profiler'
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS del proceso actual (ru_maxrss está en KiB en Linux y en bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Stage:
+    """Medidas de una etapa; ``items`` lo fija quien la ejecuta."""
+
+    def __init__(self, name: str, parent: Optional['Stage'] = None):
+        self.name = name
+        self.parent = parent
+        self.children: List['Stage'] = []
+        self.items: Optional[int] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss_mb: Optional[float] = None
+        self.peak_traced_mb: Optional[float] = None
+        self.allocations: List[Dict[str, Any]] = []
+
+    @property
+    def self_wall(self) -> float:
+        return self.wall - sum(child.wall for child in self.children)
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        if self.items is None or self.wall <= 0:
+            return None
+        return self.items / self.wall
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'wall_seconds': round(self.wall, 6),
+            'self_wall_seconds': round(self.self_wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'items': self.items,
+            'items_per_second': self.items_per_second,
+            'peak_rss_mb': self.peak_rss_mb,
+            'peak_traced_mb': self.peak_traced_mb,
+            'allocations': self.allocations,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+
+class StageProfiler:
+    """Registro de etapas de una ejecución. Deshabilitado, cada método es un no-op."""
+
+    def __init__(self, enabled: bool = True, trace_allocations: bool = False,
+                 top_allocations: int = DEFAULT_TOP_ALLOCATIONS):
+        self.enabled = enabled
+        self.trace_allocations = enabled and trace_allocations
+        self.top_allocations = top_allocations
+        self.stages: List[Stage] = []
+        self.current: Optional[Stage] = None
+        self.start_ns = time.time_ns()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def _open(self, name: str) -> Stage:
+        stage = Stage(name, self.current)
+        (self.current.children if self.current else self.stages).append(stage)
+        return stage
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[Stage]:
+        if not self.enabled:
+            yield Stage(name)
+            return
+        stage = self._open(name)
+        stage.items = items
+        previous, self.current = self.current, stage
+        snapshot = None
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            snapshot = tracemalloc.take_snapshot()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall += time.perf_counter() - wall
+            stage.cpu += time.process_time() - cpu
+            stage.end_ns = time.time_ns()
+            stage.peak_rss_mb = peak_rss_mb()
+            if snapshot is not None:
+                stage.peak_traced_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                stage.allocations = self._allocation_diff(snapshot)
+            self.current = previous
+
+    def _allocation_diff(self, before: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+        """Líneas con más memoria retenida al terminar la etapa respecto al inicio."""
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        diff = after.compare_to(before.filter_traces(filters), 'lineno')
+        top = []
+        for stat in diff[:self.top_allocations]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            top.append({'location': f'{os.path.basename(frame.filename)}:{frame.lineno}',
+                        'size_mb': stat.size_diff / (1024 * 1024), 'count': stat.count_diff})
+        return top
+
+    def timed_iter(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Atribuye a la etapa hija ``name`` el tiempo pasado en ``next()`` y cuenta los elementos.
+
+        La etapa cuelga de la etapa en curso al llamar a ``timed_iter``, no
+        de la que esté en curso cuando se consuma el iterador.
+        """
+        if not self.enabled:
+            return iter(iterable)
+        stage = self._open(name)
+        stage.items = 0
+        return self._timed(stage, iter(iterable))
+
+    def _timed(self, stage: Stage, iterator: Iterator[Any]) -> Iterator[Any]:
+        try:
+            while True:
+                wall, cpu = time.perf_counter(), time.process_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    stage.wall += time.perf_counter() - wall
+                    stage.cpu += time.process_time() - cpu
+                stage.items += 1
+                yield item
+        finally:
+            stage.end_ns = time.time_ns()
+            stage.peak_rss_mb = peak_rss_mb()
+
+    def timed_writer(self, name: str, stream: IO[str]) -> IO[str]:
+        """Envuelve ``stream`` para atribuir a la etapa hija ``name`` el tiempo de ``write()``."""
+        if not self.enabled:
+            return stream
+        return TimedWriter(self._open(name), stream)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'start_unix_nano': self.start_ns, 'stages': [stage.to_dict() for stage in self.stages]}
+
+    def report(self, out: IO[str] = sys.stderr) -> None:
+        """Tabla de etapas (las hijas, indentadas) y asignaciones principales."""
+        if not self.enabled:
+            return
+        print(f"\n{'etapa':<28}{'total s':>9}{'propio s':>10}{'CPU s':>9}{'items':>11}{'items/s':>12}{'RSS MB':>9}",
+              file=out)
+        print('-' * 88, file=out)
+        for stage, depth in self._walk():
+            items = f"{stage.items:,}" if stage.items is not None else '-'
+            rate = f"{stage.items_per_second:,.0f}" if stage.items_per_second is not None else '-'
+            rss = f"{stage.peak_rss_mb:.1f}" if stage.peak_rss_mb is not None else '-'
+            print(f"{'  ' * depth + stage.name:<28}{stage.wall:>9.3f}{stage.self_wall:>10.3f}{stage.cpu:>9.3f}"
+                  f"{items:>11}{rate:>12}{rss:>9}", file=out)
+        for stage, _ in self._walk():
+            if stage.allocations:
+                print(f"\nAsignaciones retenidas en {stage.name} (pico trazado {stage.peak_traced_mb:.1f} MB):", file=out)
+                for allocation in stage.allocations:
+                    print(f"  {allocation['size_mb']:8.2f} MB  {allocation['count']:>8} bloques  "
+                          f"{allocation['location']}", file=out)
+
+    def _walk(self, stages: Optional[List[Stage]] = None, depth: int = 0):
+        for stage in self.stages if stages is None else stages:
+            yield stage, depth
+            yield from self._walk(stage.children, depth + 1)
+
+    def to_otlp(self, service_name: str) -> List[Dict[str, Any]]:
+        """``[ExportTraceServiceRequest, ExportMetricsServiceRequest]`` en OTLP/JSON."""
+        resource_attributes = key_values({'service.name': service_name,
+                                          'process.pid': os.getpid(),
+                                          'process.command_args': sys.argv})
+        scope = {'name': SCOPE_NAME}
+        trace_id = os.urandom(16).hex()
+        end_ns = time.time_ns()
+        root_id = os.urandom(8).hex()
+        spans = [{
+            'traceId': trace_id, 'spanId': root_id, 'name': service_name, 'kind': 1,
+            'startTimeUnixNano': str(self.start_ns), 'endTimeUnixNano': str(end_ns),
+            'attributes': key_values({'process.peak_rss_mb': peak_rss_mb()}),
+        }]
+        points = {'duration': [], 'cpu_time': [], 'items_per_second': []}
+        span_ids = {id(stage): os.urandom(8).hex() for stage, _ in self._walk()}
+        for stage, _ in self._walk():
+            spans.append({
+                'traceId': trace_id, 'spanId': span_ids[id(stage)],
+                'parentSpanId': span_ids[id(stage.parent)] if stage.parent else root_id,
+                'name': stage.name, 'kind': 1,
+                'startTimeUnixNano': str(stage.start_ns), 'endTimeUnixNano': str(stage.end_ns or end_ns),
+                'attributes': key_values({
+                    'stage.cpu_seconds': stage.cpu,
+                    'stage.self_seconds': stage.self_wall,
+                    'stage.items': stage.items,
+                    'stage.items_per_second': stage.items_per_second,
+                    'stage.peak_rss_mb': stage.peak_rss_mb,
+                    'stage.peak_traced_mb': stage.peak_traced_mb,
+                }),
+            })
+            attributes = key_values({'stage': stage.name})
+            timestamp = str(stage.end_ns or end_ns)
+            points['duration'].append({'attributes': attributes, 'timeUnixNano': timestamp, 'asDouble': stage.wall})
+            points['cpu_time'].append({'attributes': attributes, 'timeUnixNano': timestamp, 'asDouble': stage.cpu})
+            if stage.items_per_second is not None:
+                points['items_per_second'].append({'attributes': attributes, 'timeUnixNano': timestamp,
+                                                   'asDouble': stage.items_per_second})
+        metrics = [
+            {'name': 'scripts.stage.duration', 'unit': 's', 'gauge': {'dataPoints': points['duration']}},
+            {'name': 'scripts.stage.cpu_time', 'unit': 's', 'gauge': {'dataPoints': points['cpu_time']}},
+            {'name': 'scripts.stage.throughput', 'unit': '{item}/s',
+             'gauge': {'dataPoints': points['items_per_second']}},
+            {'name': 'process.memory.peak', 'unit': 'MiBy',
+             'gauge': {'dataPoints': [{'timeUnixNano': str(end_ns), 'asDouble': peak_rss_mb()}]}},
+        ]
+        return [
+            {'resourceSpans': [{'resource': {'attributes': resource_attributes},
+                                'scopeSpans': [{'scope': scope, 'spans': spans}]}]},
+            {'resourceMetrics': [{'resource': {'attributes': resource_attributes},
+                                  'scopeMetrics': [{'scope': scope, 'metrics': metrics}]}]},
+        ]
+
+    def write_otlp(self, path: str, service_name: str) -> None:
+        """Añade la ejecución a ``path`` como dos líneas de OTLP/JSON (trazas y métricas)."""
+        if not self.enabled:
+            return
+        with open(path, 'a') as f:
+            for request in self.to_otlp(service_name):
+                f.write(json.dumps(request, separators=(',', ':')) + '\n')
+
+
+class TimedWriter:
+    """Archivo de texto cuyo ``write()`` se cronometra en una etapa."""
+
+    def __init__(self, stage: Stage, stream: IO[str]):
+        self.stage = stage
+        self.stream = stream
+        stage.items = 0
+
+    def write(self, data: str) -> int:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return self.stream.write(data)
+        finally:
+            self.stage.wall += time.perf_counter() - wall
+            self.stage.cpu += time.process_time() - cpu
+            self.stage.items += len(data)
+            self.stage.end_ns = time.time_ns()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+def key_values(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Diccionario → lista de ``KeyValue`` de OTLP/JSON (se omiten los ``None``)."""
+    def any_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {'boolValue': value}
+        if isinstance(value, int):
+            return {'intValue': str(value)}
+        if isinstance(value, float):
+            return {'doubleValue': value}
+        if isinstance(value, (list, tuple)):
+            return {'arrayValue': {'values': [any_value(item) for item in value]}}
+        return {'stringValue': str(value)}
+    return [{'key': key, 'value': any_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opciones comunes de perfilado."""
+    group = parser.add_argument_group('perfilado')
+    group.add_argument('--profile', action='store_true',
+                       help="Muestra en stderr tiempo de reloj y CPU, items/s y pico de RSS por etapa")
+    group.add_argument('--profile-allocations', action='store_true',
+                       help="Con --profile, traza asignaciones con tracemalloc (más lento)")
+    group.add_argument('--profile-otlp', metavar='ARCHIVO',
+                       help="Añade el perfil de la ejecución a ARCHIVO como OTLP/JSON (spans y métricas)")
+
+
+def profiler_from_args(args: argparse.Namespace) -> StageProfiler:
+    enabled = bool(args.profile or args.profile_otlp)
+    return StageProfiler(enabled, trace_allocations=args.profile_allocations)
+
+
+def finish_profile(profiler: StageProfiler, args: argparse.Namespace, service_name: str,
+                   out: IO[str] = sys.stderr) -> None:
+    """Muestra el informe si se pidió --profile y lo exporta si se pidió --profile-otlp."""
+    if args.profile:
+        profiler.report(out)
+    if args.profile_otlp:
+        profiler.write_otlp(args.profile_otlp, service_name)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Generador reproducible de capturas sintéticas para benchmarks.
+
+Los atributos se toman de ``model/`` (HTTP, DB, mensajería y gen-ai): nombres,
+tipos, miembros de enums y ejemplos reales. Los valores de texto se eligen de
+un vocabulario de ``--cardinality`` valores por atributo con distribución Zipf,
+de modo que pocos valores concentran la mayor parte del tráfico, como en
+producción.
+
+Uso:
+  python synthetic_corpus.py spans capture.jsonl.gz --spans 1000000 --cardinality 10000
+  python synthetic_corpus.py spans capture.pb --spans 1000000
+  python synthetic_corpus.py violations analysis.json --violations 200000
+"""
+
+import argparse
+import bisect
+import gzip
+import itertools
+import json
+import random
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from deprecation_index import load_deprecation_index
+from otlp import encode_traces_request, is_protobuf_capture
+from semconv_model import DEFAULT_MODEL_DIR, load_registry
+
+DEFAULT_SEED = 42
+DEFAULT_CARDINALITY = 1000
+# Probabilidad de que un span lleve cada atributo según su posición en el dominio
+CORE_ATTRIBUTE_PROBABILITY = 0.95
+EXTRA_ATTRIBUTE_PROBABILITY = 0.25
+CORE_ATTRIBUTES = 4
+# Spans por ExportTraceServiceRequest en las capturas protobuf
+PROTOBUF_BATCH_SIZE = 512
+
+DOMAINS = {
+    'http': {
+        'namespaces': ('http.', 'url.', 'server.', 'network.protocol.', 'user_agent.'),
+        'core': ('http.request.method', 'url.path', 'http.response.status_code', 'server.address'),
+        'kinds': ('SERVER', 'CLIENT'),
+        'names': ('GET /api/users/{id}', 'POST /api/orders', 'GET /health', 'PUT /api/items/{id}'),
+    },
+    'db': {
+        'namespaces': ('db.', 'server.'),
+        'core': ('db.system.name', 'db.namespace', 'db.operation.name', 'db.query.text'),
+        'kinds': ('CLIENT',),
+        'names': ('SELECT orders', 'INSERT users', 'UPDATE items', 'SELECT inventory'),
+    },
+    'messaging': {
+        'namespaces': ('messaging.',),
+        'core': ('messaging.system', 'messaging.destination.name', 'messaging.operation.type',
+                 'messaging.message.id'),
+        'kinds': ('PRODUCER', 'CONSUMER'),
+        'names': ('send orders', 'process orders', 'receive notifications'),
+    },
+    'gen_ai': {
+        'namespaces': ('gen_ai.',),
+        'core': ('gen_ai.operation.name', 'gen_ai.provider.name', 'gen_ai.request.model',
+                 'gen_ai.usage.input_tokens'),
+        'kinds': ('CLIENT',),
+        'names': ('chat gpt-4o', 'embeddings text-embedding-3-small', 'chat claude'),
+    },
+}
+
+SCALAR_TYPES = ('string', 'int', 'double', 'boolean', 'string[]')
+REAL_VIOLATION_TYPES = ('missing_attribute', 'invalid_value', 'unknown_attribute', 'type_mismatch')
+
+
+class ZipfChooser:
+    """Elige índices en ``[0, n)`` con probabilidad proporcional a ``1 / (i + 1) ** s``."""
+
+    def __init__(self, n: int, s: float = 1.1):
+        weights = [1.0 / (i + 1) ** s for i in range(max(n, 1))]
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def __call__(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+def value_generator(attr_name: str, definition: Dict[str, Any], cardinality: int) -> Callable[[random.Random], Any]:
+    """Función que genera valores plausibles para un atributo del modelo."""
+    attr_type = definition.get('type')
+    examples = definition.get('examples')
+    if examples is not None and not isinstance(examples, list):
+        examples = [examples]
+    examples = [e for e in examples or [] if not isinstance(e, (list, dict))]
+    chooser = ZipfChooser(cardinality)
+
+    if isinstance(attr_type, dict):
+        members = [m.get('value') for m in attr_type.get('members') or [] if m.get('value') is not None]
+        member_chooser = ZipfChooser(len(members))
+        return lambda rng: members[member_chooser(rng)]
+    if attr_type == 'int':
+        return lambda rng: chooser(rng)
+    if attr_type == 'double':
+        return lambda rng: round(chooser(rng) * 0.01, 2)
+    if attr_type == 'boolean':
+        return lambda rng: rng.random() < 0.5
+    if attr_type == 'string[]':
+        return lambda rng: [f'{attr_name}-{chooser(rng)}' for _ in range(rng.randint(1, 3))]
+
+    base = [str(e) for e in examples] or [attr_name.rsplit('.', 1)[-1]]
+    return lambda rng: f'{base[0]}-{chooser(rng)}' if cardinality > len(base) else base[chooser(rng) % len(base)]
+
+
+def is_generatable(definition: Dict[str, Any]) -> bool:
+    """Atributos vigentes con un tipo para el que sabemos generar valores."""
+    if definition.get('deprecated'):
+        return False
+    attr_type = definition.get('type')
+    return isinstance(attr_type, dict) or attr_type in SCALAR_TYPES
+
+
+def build_domains(registry: Dict[str, Any], domains: List[str], cardinality: int) -> List[Dict[str, Any]]:
+    """Prepara, por dominio, la lista de atributos y generadores de valores."""
+    prepared = []
+    attributes = registry['attributes']
+    for domain in domains:
+        spec = DOMAINS[domain]
+        names = [name for name in spec['core'] if name in attributes]
+        names += sorted(name for name, definition in attributes.items()
+                        if name.startswith(spec['namespaces']) and name not in names
+                        and is_generatable(definition))
+        prepared.append({
+            'name': domain,
+            'kinds': spec['kinds'],
+            'span_names': spec['names'],
+            'attributes': [(name, value_generator(name, attributes[name], cardinality)) for name in names],
+        })
+    return prepared
+
+
+def generate_spans(count: int, seed: int = DEFAULT_SEED, cardinality: int = DEFAULT_CARDINALITY,
+                   domains: Optional[List[str]] = None, model_dir: str = DEFAULT_MODEL_DIR) -> Iterator[Dict[str, Any]]:
+    """Genera ``count`` spans planos (``name``, ``kind``, ``attributes``) de forma determinista."""
+    rng = random.Random(seed)
+    prepared = build_domains(load_registry(model_dir), domains or list(DOMAINS), cardinality)
+    id_chooser = ZipfChooser(cardinality)
+    for _ in range(count):
+        domain = rng.choice(prepared)
+        span_name = rng.choice(domain['span_names']).replace('{id}', str(id_chooser(rng)))
+        attributes = {'service.name': 'synthetic-service'}
+        for position, (attr_name, generate) in enumerate(domain['attributes']):
+            probability = CORE_ATTRIBUTE_PROBABILITY if position < CORE_ATTRIBUTES else EXTRA_ATTRIBUTE_PROBABILITY
+            if rng.random() < probability:
+                attributes[attr_name] = generate(rng)
+        yield {'name': span_name, 'kind': rng.choice(domain['kinds']), 'attributes': attributes}
+
+
+def generate_violations(count: int, seed: int = DEFAULT_SEED, unknown_ratio: float = 0.05,
+                        real_ratio: float = 0.2, model_dir: str = DEFAULT_MODEL_DIR) -> Iterator[Dict[str, Any]]:
+    """Genera violations con la forma que consume filter_sdk_lag.py."""
+    rng = random.Random(seed)
+    deprecated = sorted(load_deprecation_index(model_dir))
+    deprecated_chooser = ZipfChooser(len(deprecated))
+    current = sorted(name for name, definition in load_registry(model_dir)['attributes'].items()
+                     if not definition.get('deprecated'))
+    for _ in range(count):
+        roll = rng.random()
+        if roll < real_ratio:
+            yield {'type': rng.choice(REAL_VIOLATION_TYPES), 'attribute': rng.choice(current),
+                   'message': 'Synthetic violation', 'severity': 'error'}
+        elif roll < real_ratio + unknown_ratio:
+            yield {'type': 'deprecated_attribute', 'attribute': f'custom.legacy.attr_{rng.randint(0, 50)}',
+                   'message': 'Deprecated attribute'}
+        else:
+            attr_name = deprecated[deprecated_chooser(rng)]
+            yield {'type': 'deprecated_attribute', 'attribute': attr_name, 'message': 'Deprecated attribute'}
+
+
+def open_output(path: str):
+    if path == '-':
+        return sys.stdout
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def write_protobuf_spans(path: str, spans: Iterator[Dict[str, Any]]) -> int:
+    """Escribe spans como ``ExportTraceServiceRequest`` con prefijo de 4 bytes, como el file exporter."""
+    written = 0
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wb') as f:
+        while True:
+            batch = list(itertools.islice(spans, PROTOBUF_BATCH_SIZE))
+            if not batch:
+                return written
+            message = encode_traces_request(batch)
+            f.write(len(message).to_bytes(4, 'big') + message)
+            written += len(batch)
+
+
+def write_spans(path: str, spans: Iterator[Dict[str, Any]]) -> int:
+    """Escribe spans como JSON-lines (gzip si la ruta termina en .gz) u OTLP protobuf (.pb/.binpb)."""
+    if is_protobuf_capture(path):
+        return write_protobuf_spans(path, iter(spans))
+    written = 0
+    with open_output(path) as f:
+        for span in spans:
+            f.write(json.dumps(span, separators=(',', ':')) + '\n')
+            written += 1
+    return written
+
+
+def write_violations(path: str, violations: Iterator[Dict[str, Any]]) -> int:
+    """Escribe un análisis ``{"violations": [...]}`` como el de live-check."""
+    written = 0
+    with open_output(path) as f:
+        f.write('{"violations":[')
+        for violation in violations:
+            f.write((',' if written else '') + json.dumps(violation, separators=(',', ':')))
+            written += 1
+        f.write(']}\n')
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera capturas sintéticas reproducibles para benchmarks.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    spans_parser = subparsers.add_parser('spans', help="Spans planos en JSON-lines")
+    spans_parser.add_argument('output', help="Archivo de salida (.gz para comprimir, '-' para stdout)")
+    spans_parser.add_argument('--spans', type=int, default=100_000, help="Número de spans (default: 100000)")
+    spans_parser.add_argument('--cardinality', type=int, default=DEFAULT_CARDINALITY,
+                              help=f"Valores distintos por atributo de texto/numérico (default: {DEFAULT_CARDINALITY})")
+    spans_parser.add_argument('--domains', default=','.join(DOMAINS),
+                              help=f"Dominios separados por comas (default: {','.join(DOMAINS)})")
+
+    violations_parser = subparsers.add_parser('violations', help="Reporte de violations de live-check")
+    violations_parser.add_argument('output', help="Archivo de salida (.gz para comprimir, '-' para stdout)")
+    violations_parser.add_argument('--violations', type=int, default=100_000,
+                                   help="Número de violations (default: 100000)")
+
+    for subparser in (spans_parser, violations_parser):
+        subparser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f"Semilla (default: {DEFAULT_SEED})")
+        subparser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    args = parser.parse_args()
+
+    if args.command == 'spans':
+        domains = [d.strip() for d in args.domains.split(',') if d.strip()]
+        unknown = [d for d in domains if d not in DOMAINS]
+        if unknown:
+            print(f"Error: dominios desconocidos: {', '.join(unknown)}", file=sys.stderr)
+            sys.exit(1)
+        written = write_spans(args.output, generate_spans(args.spans, args.seed, args.cardinality,
+                                                          domains, args.model_dir))
+        print(f"Spans generados: {written} en {args.output}", file=sys.stderr)
+    else:
+        written = write_violations(args.output, generate_violations(args.violations, args.seed,
+                                                                    model_dir=args.model_dir))
+        print(f"Violations generadas: {written} en {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
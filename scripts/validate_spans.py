@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Validador offline de capturas de spans contra ``model/``, sin pasar por OTLP.
+
+Alternativa rápida a reproducir una captura con ``weaver registry live-check``
+para revalidar capturas archivadas. El modelo se compila una sola vez en
+tablas planas (atributo → tipo, miembros de enum, estabilidad y deprecación)
+y cada span se comprueba con búsquedas en diccionarios:
+
+- ``unknown_attribute``: el atributo no existe en el modelo
+- ``type_mismatch``: el valor no es del tipo declarado
+- ``undefined_enum_variant``: valor fuera de los miembros del enum
+- ``deprecated_attribute`` / ``deprecated_enum_variant``: atributo o miembro deprecado
+- ``not_stable`` (solo con --report-unstable): atributo no estable
+
+La salida es un análisis ``{"violations": [...]}`` con la forma que consume
+filter_sdk_lag.py, o JSON-lines con --jsonl (para live_violation_monitor.py).
+Con --jobs los spans se validan por lotes en varios procesos.
+
+Uso:
+  python validate_spans.py captura.jsonl.gz -o analysis.json
+  python validate_spans.py capturas/ --jobs 8 --jsonl | python live_violation_monitor.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from generate_registry_from_spans import expand_inputs, iter_spans
+from semconv_model import DEFAULT_MODEL_DIR, load_registry
+
+DEFAULT_CHUNK_SIZE = 10_000
+# Lotes o capturas en curso por proceso; acota la memoria con entradas grandes
+IN_FLIGHT_PER_JOB = 2
+TEMPLATE_PREFIX = 'template['
+
+# Tipo del modelo → comprobación del valor
+TYPE_CHECKS = {
+    'string': lambda v: type(v) is str,
+    'int': lambda v: type(v) is int,
+    'double': lambda v: type(v) in (float, int),
+    'boolean': lambda v: type(v) is bool,
+    'string[]': lambda v: type(v) is list and all(type(i) is str for i in v),
+    'int[]': lambda v: type(v) is list and all(type(i) is int for i in v),
+    'double[]': lambda v: type(v) is list and all(type(i) in (float, int) for i in v),
+    'boolean[]': lambda v: type(v) is list and all(type(i) is bool for i in v),
+    'any': lambda v: True,
+}
+
+
+class CompiledRegistry:
+    """Tablas planas del modelo para validar atributos en tiempo constante."""
+
+    def __init__(self, registry: Dict[str, Any], report_unstable: bool = False):
+        self.report_unstable = report_unstable
+        self.types: Dict[str, str] = {}
+        self.enums: Dict[str, frozenset] = {}
+        self.deprecated_members: Dict[str, Dict[Any, Optional[str]]] = {}
+        self.deprecated: Dict[str, Dict[str, Any]] = {}
+        self.stability: Dict[str, str] = {}
+        # Prefijo de atributos plantilla (``http.request.header``) → tipo del valor
+        self.templates: Dict[str, str] = {}
+
+        for attr_name, definition in registry['attributes'].items():
+            attr_type = definition.get('type')
+            if isinstance(attr_type, dict):
+                members = attr_type.get('members') or []
+                self.enums[attr_name] = frozenset(m.get('value') for m in members)
+                # renamed_to apunta al id del miembro; un valor solo está deprecado
+                # si ningún miembro vigente lo comparte (``completion`` → ``output``)
+                values_by_id = {m.get('id'): m.get('value') for m in members}
+                current_values = {m.get('value') for m in members if not m.get('deprecated')}
+                deprecated_members = {
+                    m.get('value'): values_by_id.get((m['deprecated'] or {}).get('renamed_to'))
+                    for m in members if m.get('deprecated') and m.get('value') not in current_values
+                }
+                if deprecated_members:
+                    self.deprecated_members[attr_name] = deprecated_members
+            elif isinstance(attr_type, str) and attr_type.startswith(TEMPLATE_PREFIX):
+                self.templates[attr_name] = attr_type[len(TEMPLATE_PREFIX):-1]
+            elif attr_type in TYPE_CHECKS:
+                self.types[attr_name] = attr_type
+            if definition.get('deprecated'):
+                self.deprecated[attr_name] = definition['deprecated']
+            self.stability[attr_name] = definition.get('stability') or 'development'
+
+    def template_for(self, attr_name: str) -> Optional[str]:
+        """Atributo plantilla que cubre ``attr_name`` (el prefijo más largo)."""
+        prefix = attr_name
+        while '.' in prefix:
+            prefix = prefix.rsplit('.', 1)[0]
+            if prefix in self.templates:
+                return prefix
+        return None
+
+    def check_attribute(self, attr_name: str, value: Any) -> Iterator[Dict[str, Any]]:
+        """Violations de un atributo (sin contexto de span)."""
+        if attr_name in self.enums:
+            members = self.enums[attr_name]
+            if type(value) not in (str, int) or value not in members:
+                yield violation('undefined_enum_variant', attr_name, 'information',
+                                f"Value {value!r} is not a member of enum {attr_name}", value)
+            elif value in self.deprecated_members.get(attr_name, ()):
+                replacement = self.deprecated_members[attr_name][value]
+                yield violation('deprecated_enum_variant', attr_name, 'warning',
+                                f"Enum value {value!r} is deprecated"
+                                + (f", use {replacement!r} instead" if replacement else ''), value)
+        elif attr_name in self.types:
+            attr_type = self.types[attr_name]
+            if not TYPE_CHECKS[attr_type](value):
+                yield violation('type_mismatch', attr_name, 'violation',
+                                f"Expected {attr_type}, got {type(value).__name__}", value)
+        else:
+            template = self.template_for(attr_name)
+            if template is None:
+                yield violation('unknown_attribute', attr_name, 'violation',
+                                "Attribute not defined in the registry")
+                return
+            check = TYPE_CHECKS.get(self.templates[template])
+            if check is not None and not check(value):
+                yield violation('type_mismatch', attr_name, 'violation',
+                                f"Expected {self.templates[template]}, got {type(value).__name__}", value)
+            attr_name = template
+
+        if attr_name in self.deprecated:
+            yield violation('deprecated_attribute', attr_name, 'warning', "Deprecated attribute")
+        elif self.report_unstable and self.stability.get(attr_name) != 'stable':
+            yield violation('not_stable', attr_name, 'information',
+                            f"Attribute stability is {self.stability.get(attr_name)}")
+
+    def validate_span(self, span: Dict[str, Any]) -> List[Dict[str, Any]]:
+        violations = []
+        span_name = span.get('name', 'unknown')
+        for attr_name, value in (span.get('attributes') or {}).items():
+            for found in self.check_attribute(attr_name, value):
+                found['span_name'] = span_name
+                violations.append(found)
+        return violations
+
+    def validate_spans(self, spans: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        violations = []
+        for span in spans:
+            violations.extend(self.validate_span(span))
+        return violations
+
+
+def violation(violation_type: str, attr_name: str, severity: str, message: str,
+              value: Any = None) -> Dict[str, Any]:
+    found = {'type': violation_type, 'attribute': attr_name, 'message': message, 'severity': severity}
+    if value is not None:
+        found['value'] = value if isinstance(value, (str, int, float, bool)) else str(value)
+    return found
+
+
+# Registry compilado de cada worker (se compila una vez por proceso)
+_worker_registry: Optional[CompiledRegistry] = None
+
+
+def init_worker(model_dir: str, report_unstable: bool) -> None:
+    global _worker_registry
+    _worker_registry = CompiledRegistry(load_registry(model_dir), report_unstable)
+
+
+def validate_chunk(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_registry.validate_spans(spans)
+
+
+def validate_file(path: str, out_dir: str) -> str:
+    """Valida una captura entera y escribe sus violations (JSON-lines) en ``out_dir``.
+
+    Las violations van a disco a medida que se encuentran para que ni el worker
+    ni el proceso principal tengan en memoria las de una captura grande.
+    """
+    fd, out_path = tempfile.mkstemp(suffix='.jsonl', dir=out_dir)
+    with os.fdopen(fd, 'w') as out:
+        for span in iter_spans(path):
+            for found in _worker_registry.validate_span(span):
+                out.write(json.dumps(found, separators=(',', ':')) + '\n')
+    return out_path
+
+
+def read_violations(path: str) -> Iterator[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            for line in f:
+                yield json.loads(line)
+    finally:
+        os.unlink(path)
+
+
+def iter_chunks(spans: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    spans_iter = iter(spans)
+    while True:
+        chunk = list(islice(spans_iter, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ordered_results(executor: Executor, fn: Callable, items: Iterable, window: int) -> Iterator[Any]:
+    """Como ``executor.map`` pero con a lo sumo ``window`` tareas en curso.
+
+    ``executor.map`` consume toda la entrada antes de devolver el primer
+    resultado; aquí solo se lee el siguiente lote cuando sale el más antiguo.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def validate_inputs(input_files: List[str], model_dir: str = DEFAULT_MODEL_DIR, jobs: int = 1,
+                    report_unstable: bool = False,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Valida las capturas y produce las violations en el orden de los spans."""
+    spans = (span for path in input_files for span in iter_spans(path))
+    if jobs <= 1:
+        compiled = CompiledRegistry(load_registry(model_dir), report_unstable)
+        for span in spans:
+            yield from compiled.validate_span(span)
+        return
+
+    window = IN_FLIGHT_PER_JOB * jobs
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(model_dir, report_unstable)) as executor:
+        # Con varias capturas cada worker lee la suya; con una sola se reparten lotes de spans
+        if len(input_files) > 1:
+            with tempfile.TemporaryDirectory(prefix='validate-spans-') as out_dir:
+                for out_path in ordered_results(executor, partial(validate_file, out_dir=out_dir),
+                                                input_files, window):
+                    yield from read_violations(out_path)
+        else:
+            for violations in ordered_results(executor, validate_chunk,
+                                              iter_chunks(spans, chunk_size), window):
+                yield from violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida capturas de spans contra model/ sin weaver live-check.")
+    parser.add_argument('inputs', nargs='+',
+                        help="Capturas de spans o directorios (JSON, JSON-lines, opcionalmente .gz; '-' para stdin)")
+    parser.add_argument('--output', '-o', default='-', help="Archivo de salida (default: stdout)")
+    parser.add_argument('--jsonl', action='store_true', help="Una violation por línea en vez de {\"violations\": [...]}")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directorio del modelo (default: model/)")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="Procesos de validación (default: 1)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Spans por lote enviado a cada proceso (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--report-unstable', action='store_true',
+                        help="Reporta también atributos con estabilidad distinta de stable")
+    args = parser.parse_args()
+
+    input_files = expand_inputs(args.inputs)
+    if not input_files:
+        print("Error: No se encontraron capturas de spans en las entradas indicadas", file=sys.stderr)
+        sys.exit(1)
+    missing = [path for path in input_files if path != '-' and not os.path.exists(path)]
+    if missing:
+        print(f"Error: No se puede encontrar el archivo {missing[0]}", file=sys.stderr)
+        sys.exit(1)
+
+    counts = Counter()
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        violations = validate_inputs(input_files, args.model_dir, args.jobs,
+                                     args.report_unstable, args.chunk_size)
+        if not args.jsonl:
+            out.write('{"violations":[')
+        for found in violations:
+            if args.jsonl:
+                out.write(json.dumps(found, separators=(',', ':')) + '\n')
+            else:
+                out.write((',' if counts else '') + json.dumps(found, separators=(',', ':')))
+            counts[found['type']] += 1
+        if not args.jsonl:
+            out.write(']}\n')
+    except FileNotFoundError as e:
+        print(f"Error: No se puede encontrar el archivo {e.filename}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: Captura de spans no válida: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Violations encontradas: {sum(counts.values())}", file=sys.stderr)
+    for violation_type, count in counts.most_common():
+        print(f"  {violation_type}: {count}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()